@@ -0,0 +1,253 @@
+"""Measure how long the server takes to return a large tool result.
+
+The benchmark calls `read_backtest` through the MCP request handler, with
+the API replaced by a synthetic backtest of the given size. It measures the
+time from the call until the serialized JSON-RPC result is ready:
+
+- default: FastMCP validates the result with the response model and the
+  MCP server validates it against the output schema.
+- fieldMask: The same, but with a field mask that only selects the
+  statistics of the backtest (see `field_masks.py`).
+- trusted: The result is passed through (see `ToolResults`).
+- compact: The result is returned as compact JSON text, with the floats
+  rounded to 6 (compact6) or 4 (compact4) significant digits (see
+  `compact_responses.py`).
+
+It then measures the latency of a light tool call (`list_backtests`)
+while `read_backtest` calls are in flight, with their results converted
+in a worker thread (like the large results are by default) and on the
+event loop.
+
+Usage (from the root of the repository):
+    python benchmarks/responses.py
+    python benchmarks/responses.py --trades 20000 --repeat 5
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+from mcp import types  # noqa: E402
+from mcp.server.fastmcp import FastMCP  # noqa: E402
+
+import tool_results  # noqa: E402
+import tools.backtests  # noqa: E402
+from api_connection import ResponseSize  # noqa: E402
+from tool_results import ToolResults  # noqa: E402
+
+MONTHS = 60
+LIGHT_CALL_INTERVAL = 0.01
+
+
+def _trade(i):
+    return {
+        'symbol': {'value': 'SPY', 'id': 'SPY R735QTJ8XC9X', 'permtick': 'SPY'},
+        'entryTime': '2020-01-02 14:31:00',
+        'entryPrice': 320 + random.random(),
+        'direction': i % 2,
+        'quantity': random.randint(1, 100),
+        'exitTime': '2020-01-03 14:31:00',
+        'exitPrice': 320 + random.random(),
+        'profitLoss': random.uniform(-100, 100),
+        'totalFees': 1.0,
+        'mae': -random.random(),
+        'mfe': random.random(),
+        'duration': '1.00:00:00',
+        'endTradeDrawdown': -random.random()
+    }
+
+
+def _performance(trades):
+    return {
+        'tradeStatistics': {
+            'startDateTime': '2020-01-02 14:31:00',
+            'endDateTime': '2024-12-31 16:00:00',
+            'totalNumberOfTrades': len(trades),
+            'totalProfitLoss': sum(trade['profitLoss'] for trade in trades),
+            'averageTradeDuration': '1.00:00:00',
+            'winRate': random.random(),
+            'sharpeRatio': random.random()
+        },
+        'portfolioStatistics': {
+            'startEquity': 100000.0,
+            'endEquity': 100000 + random.uniform(-10000, 10000),
+            'sharpeRatio': random.random(),
+            'drawdown': random.random(),
+            'winRate': random.random()
+        },
+        'closedTrades': trades
+    }
+
+
+def backtest_response(trade_count):
+    """Return a synthetic `/backtests/read` response."""
+    random.seed(0)
+    trades = [_trade(i) for i in range(trade_count)]
+    per_month = max(1, trade_count // MONTHS)
+    return {
+        'success': True,
+        'errors': [],
+        'backtest': {
+            'name': 'Benchmark',
+            'projectId': 1,
+            'backtestId': 'abc',
+            'status': 'Completed.',
+            'completed': True,
+            'backtestStart': '2020-01-01 00:00:00',
+            'backtestEnd': '2024-12-31 00:00:00',
+            'tradeableDates': 1258,
+            'charts': {name: {'name': name} for name in ('Strategy Equity', 'Benchmark')},
+            'statistics': {'Total Orders': str(trade_count), 'Net Profit': '5.2%'},
+            'runtimeStatistics': {'Equity': '$105,200.00', 'Fees': '-$1,000.00'},
+            'rollingWindow': {
+                f'M1_{2020 + month // 12}{month % 12 + 1:02}': _performance(
+                    trades[month * per_month:(month + 1) * per_month]
+                )
+                for month in range(MONTHS)
+            },
+            'totalPerformance': _performance(trades)
+        }
+    }
+
+
+def _server(response, trusted, compact=None):
+    size = len(json.dumps(response))
+
+    async def post(endpoint, model=None):
+        if endpoint == '/backtests/list':
+            return {'success': True, 'backtests': []}
+        ResponseSize.record(size)
+        return response
+    tools.backtests.post = post
+    mcp = FastMCP('benchmark')
+    tools.backtests.register_backtest_tools(mcp)
+    ToolResults.install(mcp, trusted=trusted, compact=compact or {})
+    return mcp
+
+
+async def _call(mcp, arguments, name='read_backtest'):
+    handler = mcp._mcp_server.request_handlers[types.CallToolRequest]
+    request = types.CallToolRequest(
+        method='tools/call',
+        params=types.CallToolRequestParams(name=name, arguments=arguments)
+    )
+    start = time.perf_counter()
+    result = await handler(request)
+    if result.root.isError:
+        raise RuntimeError(result.root.content[0].text)
+    message = result.model_dump_json(by_alias=True, exclude_none=True)
+    return time.perf_counter() - start, len(message)
+
+
+async def benchmark(trade_count, repeat):
+    response = backtest_response(trade_count)
+    arguments = {'model': {'projectId': 1, 'backtestId': 'abc'}}
+    modes = {
+        'default': (False, arguments, None),
+        'fieldMask': (False, arguments | {'fields': ['backtest.statistics']}, None),
+        'trusted': (True, arguments, None),
+        'compact6': (False, arguments, {'read_backtest': 6}),
+        'compact4': (False, arguments, {'read_backtest': 4})
+    }
+    results = {}
+    for mode, (trusted, mode_arguments, compact) in modes.items():
+        mcp = _server(response, trusted, compact)
+        # The first call builds the models and lists the tools.
+        await _call(mcp, mode_arguments)
+        runs = [await _call(mcp, mode_arguments) for _ in range(repeat)]
+        results[mode] = {
+            'milliseconds': round(statistics.median(run[0] for run in runs) * 1000, 3),
+            'bytes': runs[0][1]
+        }
+    return results
+
+
+async def light_call_latency(trade_count, heavy_calls, offload):
+    """Return the percentiles of the latency of the light calls, in
+    milliseconds, while `heavy_calls` reads of a large backtest run.
+
+    A light call starts every LIGHT_CALL_INTERVAL, and its latency counts
+    from the time it was due, so the time it waits for the event loop
+    counts too.
+    """
+    mcp = _server(backtest_response(trade_count), trusted=False)
+    arguments = {'model': {'projectId': 1, 'backtestId': 'abc'}}
+    light_arguments = {'model': {'projectId': 1}}
+    await _call(mcp, arguments)
+    await _call(mcp, light_arguments, 'list_backtests')
+    threshold = tool_results.LARGE_RESPONSE_BYTES
+    tool_results.LARGE_RESPONSE_BYTES = 0 if offload else float('inf')
+    try:
+        heavy = asyncio.gather(
+            *[_call(mcp, arguments) for _ in range(heavy_calls)]
+        )
+        latencies = []
+        start = time.perf_counter()
+        while not heavy.done():
+            due = start + len(latencies) * LIGHT_CALL_INTERVAL
+            await asyncio.sleep(max(0, due - time.perf_counter()))
+            await _call(mcp, light_arguments, 'list_backtests')
+            latencies.append(time.perf_counter() - due)
+        await heavy
+    finally:
+        tool_results.LARGE_RESPONSE_BYTES = threshold
+    latencies = sorted(latencies)
+    return {
+        'calls': len(latencies),
+        'p50': round(latencies[len(latencies) // 2] * 1000, 3),
+        'p99': round(latencies[int(len(latencies) * 0.99)] * 1000, 3),
+        'max': round(latencies[-1] * 1000, 3)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument(
+        '--trades', type=int, action='append',
+        help='Number of closed trades in the backtest (default: 1000 and 10000).'
+    )
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument(
+        '--heavy-calls', type=int, default=4,
+        help='Number of concurrent reads while measuring the light calls.'
+    )
+    args = parser.parse_args()
+
+    print(
+        f"{'trades':>8} {'mode':<10} {'ms':>10} {'bytes':>12} {'speedup':>8} "
+        f"{'smaller':>8}"
+    )
+    for trade_count in args.trades or [1000, 10000]:
+        results = asyncio.run(benchmark(trade_count, args.repeat))
+        baseline = results['default']
+        for mode, result in results.items():
+            print(
+                f"{trade_count:>8} {mode:<10} {result['milliseconds']:>10} "
+                f"{result['bytes']:>12} "
+                f"{baseline['milliseconds'] / result['milliseconds']:>7.1f}x "
+                f"{baseline['bytes'] / result['bytes']:>7.1f}x"
+            )
+
+    print()
+    print(f"{'trades':>8} {'offload':<8} {'calls':>6} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for trade_count in args.trades or [1000, 10000]:
+        for offload in (False, True):
+            latency = asyncio.run(
+                light_call_latency(trade_count, args.heavy_calls, offload)
+            )
+            print(
+                f"{trade_count:>8} {str(offload):<8} {latency['calls']:>6} "
+                f"{latency['p50']:>9} {latency['p99']:>9} {latency['max']:>9}"
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,330 @@
+"""Measure how long the MCP servers take to start.
+
+For each tool profile (all of them by default, see `ToolProfiles`), the
+benchmark runs every measurement in fresh Python processes and records
+the median of the runs:
+
+- importTime: The total import time of the server module and its
+  breakdown by top-level module (from `python -X importtime`).
+- registration: The time to register the tools.
+- schemaGeneration: The part of the registration spent generating the
+  JSON schemas of the tools.
+- listTools: The time to answer the first `tools/list` in-process.
+- stdioInitialize and stdioToolsList: The time from the process start
+  until the server answers `initialize` and then `tools/list` over
+  stdio.
+
+Each run appends one JSON line to the output file, so the results of
+different releases can be compared with `--compare`.
+
+Usage (from the root of the repository):
+    python benchmarks/startup.py --label v0.1.0
+    python benchmarks/startup.py --compare benchmarks/results/startup.jsonl
+"""
+
+import argparse
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+from tool_profiles import ToolProfiles  # noqa: E402
+DEFAULT_OUTPUT = os.path.join(ROOT, 'benchmarks', 'results', 'startup.jsonl')
+TOP_MODULES = 15
+
+# Run in a fresh process to time the tool registration. It wraps the
+# functions that FastMCP calls for each tool before importing the server.
+# The servers reuse the cached tool schemas (see `ToolSchemaCache`), so
+# pass --cold to measure a start without the cache.
+PROBE = '''
+import asyncio, json, sys, time
+sys.path.insert(0, 'src')
+from pydantic import BaseModel
+from mcp.server.fastmcp import FastMCP
+
+timings = {'registration': 0.0, 'schemaGeneration': 0.0}
+add_tool = FastMCP.add_tool
+model_json_schema = BaseModel.model_json_schema.__func__
+
+def timed_add_tool(self, *args, **kwargs):
+    start = time.perf_counter()
+    try:
+        return add_tool(self, *args, **kwargs)
+    finally:
+        timings['registration'] += time.perf_counter() - start
+
+def timed_model_json_schema(cls, *args, **kwargs):
+    start = time.perf_counter()
+    try:
+        return model_json_schema(cls, *args, **kwargs)
+    finally:
+        timings['schemaGeneration'] += time.perf_counter() - start
+
+FastMCP.add_tool = timed_add_tool
+BaseModel.model_json_schema = classmethod(timed_model_json_schema)
+import main as server
+start = time.perf_counter()
+tools = asyncio.run(server.mcp.list_tools())
+timings['listTools'] = time.perf_counter() - start
+timings['toolCount'] = len(tools)
+timings['toolsListBytes'] = len(json.dumps(
+    [tool.model_dump(mode='json', exclude_none=True) for tool in tools]
+))
+print(json.dumps(timings))
+'''
+
+IMPORT_TIME_LINE = re.compile(
+    r'import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)'
+)
+
+
+def _environment(profile, cold=False):
+    # Don't load a workspace or push files while benchmarking.
+    env = os.environ.copy()
+    env['MCP_TOOL_PROFILE'] = profile
+    if cold:
+        env['MCP_SCHEMA_CACHE'] = 'false'
+    env['MCP_TRANSPORT'] = 'stdio'
+    env['MOUNT_WATCH'] = 'off'
+    env['MOUNT_AUTO_PUSH'] = 'false'
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    return env
+
+
+def measure_import_time(profile, cold=False):
+    """Return the import time of the server module and its breakdown by
+    top-level module, in milliseconds."""
+    result = subprocess.run(
+        [
+            sys.executable, '-X', 'importtime', '-c',
+            "import sys; sys.path.insert(0, 'src'); import main"
+        ],
+        cwd=ROOT, env=_environment(profile, cold), capture_output=True, text=True,
+        check=True
+    )
+    total = 0
+    by_module = {}
+    for line in result.stderr.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if not match:
+            continue
+        self_time, cumulative, _, name = match.groups()
+        if name == 'main':
+            total = int(cumulative)
+        top_level = name.split('.')[0]
+        by_module[top_level] = by_module.get(top_level, 0) + int(self_time)
+    return {
+        'total': total / 1000,
+        'byModule': {name: us / 1000 for name, us in by_module.items()}
+    }
+
+
+def measure_registration(profile, cold=False):
+    """Return the registration, schema generation, and `tools/list`
+    timings of the server, in milliseconds."""
+    result = subprocess.run(
+        [sys.executable, '-c', PROBE], cwd=ROOT,
+        env=_environment(profile, cold), capture_output=True, text=True,
+        check=True
+    )
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    for key in ('registration', 'schemaGeneration', 'listTools'):
+        timings[key] *= 1000
+    return timings
+
+
+def _read_response(process, id_):
+    # The servers print some text to stdout, so skip the lines that
+    # aren't JSON-RPC messages.
+    while line := process.stdout.readline():
+        try:
+            message = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(message, dict) and message.get('id') == id_:
+            return message
+    raise RuntimeError('The server exited before it responded.')
+
+
+def _send(process, message):
+    process.stdin.write(json.dumps(message) + '\n')
+    process.stdin.flush()
+
+
+def measure_stdio(profile, cold=False):
+    """Return the time from the process start until the server answers
+    `initialize` and `tools/list` over stdio, in milliseconds."""
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, os.path.join('src', 'main.py')], cwd=ROOT,
+        env=_environment(profile, cold), stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL, text=True
+    )
+    try:
+        _send(process, {
+            'jsonrpc': '2.0', 'id': 1, 'method': 'initialize',
+            'params': {
+                'protocolVersion': '2025-06-18', 'capabilities': {},
+                'clientInfo': {'name': 'benchmark', 'version': '1.0'}
+            }
+        })
+        _read_response(process, 1)
+        initialized = time.perf_counter()
+        _send(process, {
+            'jsonrpc': '2.0', 'method': 'notifications/initialized'
+        })
+        _send(process, {'jsonrpc': '2.0', 'id': 2, 'method': 'tools/list'})
+        _read_response(process, 2)
+        listed = time.perf_counter()
+    finally:
+        process.kill()
+        process.wait()
+    return {
+        'stdioInitialize': (initialized - start) * 1000,
+        'stdioToolsList': (listed - start) * 1000
+    }
+
+
+def _median(values):
+    return round(statistics.median(values), 3)
+
+
+def benchmark(profile, repeat, cold=False):
+    """Run all the measurements of a profile `repeat` times and return the
+    medians."""
+    runs = [
+        measure_import_time(profile, cold)
+        | measure_registration(profile, cold) | measure_stdio(profile, cold)
+        for _ in range(repeat)
+    ]
+    result = {}
+    for key, value in runs[0].items():
+        if key == 'byModule':
+            continue
+        # The counts don't change between the runs.
+        result[key] = value if key.endswith(('Count', 'Bytes')) \
+            else _median([run[key] for run in runs])
+    by_module = {
+        name: _median([run['byModule'].get(name, 0) for run in runs])
+        for name in runs[0]['byModule']
+    }
+    result['importByModule'] = dict(
+        sorted(by_module.items(), key=lambda item: -item[1])[:TOP_MODULES]
+    )
+    result['importTime'] = result.pop('total')
+    return result
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _flatten(results):
+    # {'full': {'importTime': 1}} -> {'full.importTime': 1}
+    metrics = {}
+    for profile, values in results.items():
+        for key, value in values.items():
+            if isinstance(value, dict):
+                for name, sub_value in value.items():
+                    metrics[f'{profile}.{key}.{name}'] = sub_value
+            else:
+                metrics[f'{profile}.{key}'] = value
+    return metrics
+
+
+def compare(baseline, record, threshold):
+    """Print the change of each metric since the baseline record and
+    return the metrics that regressed by more than `threshold` percent."""
+    before = _flatten(baseline['results'])
+    after = _flatten(record['results'])
+    regressions = []
+    print(f"{'metric':<50} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name, value in after.items():
+        if name not in before:
+            continue
+        change = (value - before[name]) / before[name] * 100 \
+            if before[name] else 0
+        flag = ''
+        # Only the total timings can regress; the counts and the import
+        # breakdown explain the changes.
+        is_total = name.count('.') == 1 and \
+            not name.endswith(('Count', 'Bytes'))
+        if change > threshold and is_total:
+            regressions.append(name)
+            flag = ' !'
+        print(
+            f'{name:<50} {before[name]:>12} {value:>12} {change:>7.1f}%{flag}'
+        )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument(
+        '--profile', action='append', choices=list(ToolProfiles.PROFILES),
+        help='Tool profile to benchmark (default: all).'
+    )
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument(
+        '--cold', action='store_true',
+        help="Don't use the cached tool schemas."
+    )
+    parser.add_argument(
+        '--label', help='Name of the run (ex: the release version).'
+    )
+    parser.add_argument('--output', default=DEFAULT_OUTPUT)
+    parser.add_argument(
+        '--compare', metavar='FILE',
+        help='Results file with the baseline (its last record).'
+    )
+    parser.add_argument(
+        '--threshold', type=float, default=10,
+        help='Percent increase that counts as a regression.'
+    )
+    args = parser.parse_args()
+
+    record = {
+        'label': args.label,
+        'commit': _git_commit(),
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': args.repeat,
+        'cold': args.cold,
+        'results': {
+            profile: benchmark(profile, args.repeat, args.cold)
+            for profile in args.profile or ToolProfiles.PROFILES
+        }
+    }
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as file:
+            lines = [line for line in file if line.strip()]
+        baseline = json.loads(lines[-1])
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'a', encoding='utf-8') as file:
+        file.write(json.dumps(record) + '\n')
+    print(json.dumps(record['results'], indent=2))
+    if baseline:
+        regressions = compare(baseline, record, args.threshold)
+        if regressions:
+            print(f'{len(regressions)} metric(s) regressed.')
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
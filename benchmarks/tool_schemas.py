@@ -0,0 +1,65 @@
+"""Report how many bytes the schema compaction saves for each tool.
+
+The report lists the size of the input and output schemas of each tool
+(as `tools/list` returns them) before and after `compact_tools`, sorted by
+the bytes saved. See `schema_compaction.py` for the environment variables
+that enable the compaction on the servers.
+
+Usage (from the root of the repository):
+    python benchmarks/tool_schemas.py
+    python benchmarks/tool_schemas.py --profile minimal --no-output-schemas
+"""
+
+import argparse
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument(
+        '--profile', default='full',
+        help='Tool profile to report on (see `ToolProfiles`).'
+    )
+    parser.add_argument(
+        '--no-output-schemas', action='store_true',
+        help='Drop the output schemas too.'
+    )
+    parser.add_argument(
+        '--top', type=int, default=0,
+        help='Only list the tools that save the most bytes.'
+    )
+    args = parser.parse_args()
+
+    # Import the server with its schemas as they are by default.
+    os.environ['MCP_COMPACT_SCHEMAS'] = 'false'
+    os.environ['MCP_OUTPUT_SCHEMAS'] = 'true'
+    os.environ['MCP_TOOL_PROFILE'] = args.profile
+    os.chdir(ROOT)
+    sys.path.insert(0, os.path.join(ROOT, 'src'))
+    import main as server
+    from schema_compaction import compact_tools
+
+    report = compact_tools(
+        server.mcp, compact=True, output_schemas=not args.no_output_schemas
+    )
+    report.sort(key=lambda size: size['after'] - size['before'])
+    print(f"{'tool':<40} {'before':>9} {'after':>9} {'saved':>9} {'%':>6}")
+    for size in report[:args.top or None]:
+        saved = size['before'] - size['after']
+        print(
+            f"{size['name']:<40} {size['before']:>9} {size['after']:>9} "
+            f"{saved:>9} {saved / size['before'] * 100:>5.1f}%"
+        )
+    before = sum(size['before'] for size in report)
+    after = sum(size['after'] for size in report)
+    print(
+        f"{'total':<40} {before:>9} {after:>9} {before - after:>9} "
+        f"{(before - after) / before * 100:>5.1f}%"
+    )
+
+
+if __name__ == '__main__':
+    main()
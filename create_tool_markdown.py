@@ -60,7 +60,10 @@ def create_tool_details(tools):
                     elif name == 'format':
                         data_type = ''
                     else:
-                        data_type = meta['anyOf'][0]['type']
+                        # Optional enums reference their definition.
+                        option = meta['anyOf'][0]
+                        data_type = option.get('type') or \
+                            defs[option['$ref'].split("/")[-1]]['type']
                 elif '$ref' in meta:
                     model_name = meta['$ref'].split("/")[-1]
                     data_type = defs[model_name]['type']
@@ -258,7 +258,7 @@ User=ubuntu
 WorkingDirectory=/home/ubuntu/$DEPLOY_DIR
 Environment=PATH=/home/ubuntu/.local/bin:/home/ubuntu/$DEPLOY_DIR/.venv/bin
 EnvironmentFile=/home/ubuntu/$DEPLOY_DIR/.env
-ExecStart=/home/ubuntu/.local/bin/uv run src/main_minimal.py
+ExecStart=/home/ubuntu/.local/bin/uv run src/main.py --profile minimal
 Restart=always
 RestartSec=3
 StandardOutput=journal
@@ -22,6 +22,17 @@ content = content.replace('__root__', 'RootModel').replace('ResponseModel', 'Res
 content = content.replace('class Config:', "model_config = ConfigDict(extra='forbid')")\
     .replace('    extra = Extra.forbid', '')
 
+# Defer building the validators (and the schemas) of the models until
+# they're first used, so importing the module doesn't build the hundreds
+# of models that a session may never use (ex: the brokerage settings).
+content = content.replace(
+    'from pydantic import BaseModel, Field\n',
+    'from pydantic import BaseModel as PydanticBaseModel, Field\n\n\n'
+    'class BaseModel(PydanticBaseModel):\n'
+    "    model_config = ConfigDict(defer_build=True)\n",
+    1
+)
+
 # Save the new file content.
 with open(path, 'w', encoding='utf-8') as file:
     file.write(content)
@@ -2,10 +2,11 @@ from __init__ import __version__
 
 import httpx
 from base64 import b64encode
+from contextvars import ContextVar
 from hashlib import sha256
 from time import time
 import os
-from pydantic_core import to_jsonable_python
+from pydantic_core import from_json, to_jsonable_python
 
 BASE_URL = 'https://www.quantconnect.com/api/v2'
 
@@ -13,6 +14,43 @@ BASE_URL = 'https://www.quantconnect.com/api/v2'
 USER_ID = os.getenv('QUANTCONNECT_USER_ID')
 API_TOKEN = os.getenv('QUANTCONNECT_API_TOKEN')
 
+# The tool calls that receive a response larger than this (in bytes)
+# convert and validate their result in a worker thread (see `ToolResults`).
+LARGE_RESPONSE_BYTES = int(os.getenv('MCP_LARGE_RESPONSE_BYTES', '262144'))
+
+class ResponseSize:
+    """The size of the largest response that a tool call received.
+
+    The current tracker is kept in a context variable. The tasks that a
+    tool spawns (ex: with `asyncio.gather`) copy the context, so they
+    share the tracker of the tool call and their responses count too.
+
+    Usage:
+        size = ResponseSize.track()
+        # Call the tool.
+        size.bytes
+    """
+
+    _current = ContextVar('response_size', default=None)
+
+    def __init__(self):
+        self.bytes = 0
+
+    @classmethod
+    def track(cls):
+        """Start tracking the responses of the current context."""
+        size = cls()
+        cls._current.set(size)
+        return size
+
+    @classmethod
+    def record(cls, size):
+        """Record the size of a response, if it's tracked."""
+        current = cls._current.get()
+        if current is not None:
+            current.bytes = max(current.bytes, size)
+
+
 def get_headers():
     # Get timestamp
     timestamp = f'{int(time())}'
@@ -41,11 +79,18 @@ async def post(endpoint: str, model: object = None, timeout: float = 30.0):
         which is handled by the Server class.
     """
     async with httpx.AsyncClient() as client:
-        response = await client.post(
-            f'{BASE_URL}{endpoint}', 
-            headers=get_headers(), 
-            json=to_jsonable_python(model, exclude_none=True) if model else {}, 
-            timeout=timeout
-        )
-        response.raise_for_status()
-        return response.json()
+        async with client.stream(
+                'POST',
+                f'{BASE_URL}{endpoint}', 
+                headers=get_headers(), 
+                json=to_jsonable_python(model, exclude_none=True) if model else {}, 
+                timeout=timeout) as response:
+            response.raise_for_status()
+            # Read the body in chunks, so a large response doesn't hold a
+            # second copy in the response object.
+            body = bytearray()
+            async for chunk in response.aiter_bytes():
+                body += chunk
+    ResponseSize.record(len(body))
+    # `from_json` decodes about twice as fast as `json.loads`.
+    return from_json(body)
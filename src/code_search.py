@@ -0,0 +1,208 @@
+import re
+from collections import defaultdict
+
+# Characters with a special meaning in regular expressions.
+_META_CHARACTERS = set('.^$*+?{}[]()|\\')
+
+
+def _trigrams(text):
+    text = text.lower()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def required_literals(query, regex=False):
+    """Return strings that every match of the query contains, so the
+    index can skip the files that don't contain them.
+
+    The extraction is conservative: it returns no literals (so every
+    file is a candidate) for the patterns it doesn't understand.
+    """
+    if not regex:
+        return [query]
+    # Alternations and groups can make any part of the pattern optional.
+    if '|' in query or '(' in query:
+        return []
+    literals = []
+    current = ''
+    i = 0
+    while i < len(query):
+        char = query[i]
+        if char == '\\' and i + 1 < len(query):
+            escaped = query[i + 1]
+            i += 2
+            if escaped.isalnum():
+                # A class (ex: \d) or an anchor (ex: \b).
+                literals.append(current)
+                current = ''
+            else:
+                current += escaped
+            continue
+        i += 1
+        if char in '?*{':
+            # The previous character is optional.
+            literals.append(current[:-1])
+            current = ''
+            if char == '{':
+                i = query.find('}', i) + 1 or len(query)
+        elif char in _META_CHARACTERS:
+            literals.append(current)
+            current = ''
+            if char == '[':
+                i = query.find(']', i + 1) + 1 or len(query)
+        else:
+            current += char
+    literals.append(current)
+    return [literal for literal in literals if len(literal) >= 3]
+
+
+def compile_query(query, regex=False, case_sensitive=False):
+    """Compile a query into a regular expression. Throws a ValueError if
+    the query isn't a valid regular expression."""
+    flags = 0 if case_sensitive else re.IGNORECASE
+    try:
+        return re.compile(query if regex else re.escape(query), flags)
+    except re.error as e:
+        raise ValueError(f'Invalid regular expression: {e}') from e
+
+
+def find_matches(content, pattern, context_lines=0):
+    """Return the lines of `content` that match the compiled pattern,
+    with the surrounding lines."""
+    lines = content.splitlines()
+    matches = []
+    for i, line in enumerate(lines):
+        if pattern.search(line):
+            matches.append({
+                'line': i + 1,
+                'text': line,
+                'before': lines[max(0, i - context_lines):i],
+                'after': lines[i + 1:i + 1 + context_lines]
+            })
+    return matches
+
+
+class TrigramIndex:
+    """Inverted index from the trigrams of documents to their keys.
+
+    A query only has to scan the documents that contain all the
+    trigrams of its literals. The trigrams are case-insensitive, so the
+    same index serves case-sensitive and case-insensitive queries.
+    """
+
+    def __init__(self):
+        self._keys_by_trigram = defaultdict(set)
+        self._documents = {}  # key -> (version, content, trigrams)
+
+    def __len__(self):
+        return len(self._documents)
+
+    def keys(self):
+        return list(self._documents)
+
+    def version(self, key):
+        document = self._documents.get(key)
+        return None if document is None else document[0]
+
+    def content(self, key):
+        return self._documents[key][1]
+
+    def add(self, key, content, version=None):
+        """Index a document. Skip the document if it's already indexed
+        with the same version (its content by default)."""
+        version = content if version is None else version
+        if self.version(key) == version:
+            return
+        self.remove(key)
+        trigrams = _trigrams(content)
+        for trigram in trigrams:
+            self._keys_by_trigram[trigram].add(key)
+        self._documents[key] = (version, content, trigrams)
+
+    def remove(self, key):
+        document = self._documents.pop(key, None)
+        if document is None:
+            return
+        for trigram in document[2]:
+            keys = self._keys_by_trigram[trigram]
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_trigram[trigram]
+
+    def candidates(self, literals):
+        """Return the keys of the documents that contain the trigrams of
+        all the literals."""
+        trigrams = set().union(*[_trigrams(literal) for literal in literals])
+        if not trigrams:
+            return self.keys()
+        # Intersect the smallest sets first.
+        postings = sorted(
+            (self._keys_by_trigram.get(trigram, set()) for trigram in trigrams),
+            key=len
+        )
+        keys = set(postings[0])
+        for posting in postings[1:]:
+            keys &= posting
+            if not keys:
+                break
+        return list(keys)
+
+
+class ProjectCodeSearch:
+    """Search the files of a project with a `TrigramIndex` per project.
+
+    The indexes are updated incrementally from the files that the caller
+    passes, so only the files that changed are indexed again. The indexes
+    of the least recently searched projects are dropped once they hold
+    more than MAX_FILES files.
+    """
+
+    MAX_FILES = 2000
+
+    # project Id -> TrigramIndex, from the least to the most recently
+    # searched project.
+    _index_by_project = {}
+
+    @classmethod
+    def search(
+            cls, project_id, content_by_name, query, regex=False,
+            case_sensitive=False, context_lines=2, limit=50):
+        """Search the files of a project.
+
+        Returns:
+            A dictionary that respects the `CodeSearchResponse` model.
+            Throws a ValueError if the query is invalid.
+        """
+        pattern = compile_query(query, regex, case_sensitive)
+        index = cls._index_by_project.pop(project_id, None)
+        if index is None:
+            index = TrigramIndex()
+        cls._index_by_project[project_id] = index
+        for name in set(index.keys()) - set(content_by_name):
+            index.remove(name)
+        for name, content in content_by_name.items():
+            index.add(name, content)
+        cls._evict()
+        matches = []
+        for name in sorted(index.candidates(required_literals(query, regex))):
+            for match in find_matches(index.content(name), pattern, context_lines):
+                matches.append({'projectId': project_id, 'name': name} | match)
+        return {
+            'matches': matches[:limit],
+            'total': len(matches),
+            'filesSearched': len(index),
+            'success': True
+        }
+
+    @classmethod
+    def remove(cls, project_id):
+        """Drop the index of a project (ex: when it's deleted)."""
+        cls._index_by_project.pop(project_id, None)
+
+    @classmethod
+    def _evict(cls):
+        # Drop the least recently searched indexes, but keep the index of
+        # the current search.
+        files = sum(len(index) for index in cls._index_by_project.values())
+        while files > cls.MAX_FILES and len(cls._index_by_project) > 1:
+            evicted = next(iter(cls._index_by_project))
+            files -= len(cls._index_by_project.pop(evicted))
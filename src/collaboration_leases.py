@@ -0,0 +1,145 @@
+import asyncio
+import os
+import threading
+from time import monotonic
+
+from api_connection import post, httpx
+from code_source_id import AGENT_NAME
+from models import LockCollaboratorRequest
+from project_locks import ProjectLocks
+
+
+class CollaborationLeases:
+    """Hold the collaboration lock of the projects this server edits.
+
+    The first call that edits a project acquires its lock with
+    `/projects/collaboration/lock/acquire`. The lock is then considered
+    held for the length that the response reports ('ttl', in seconds), or
+    COLLABORATION_LOCK_TTL seconds if it doesn't, and a renewal is
+    scheduled on the event loop of the server before it expires, so the
+    next edits don't need another request. The renewals run inside
+    `ProjectLocks.write`, like the other requests that modify a project.
+    The renewals stop once the project hasn't been edited for
+    COLLABORATION_LOCK_IDLE seconds, so the server doesn't keep the
+    projects it's done with locked. The locks that the clients request
+    explicitly (see `lock`) are renewed the same way, with their code
+    source Id.
+    """
+
+    TTL = float(os.getenv('COLLABORATION_LOCK_TTL', '600'))
+    IDLE_TIMEOUT = float(os.getenv('COLLABORATION_LOCK_IDLE', '1800'))
+    # Renew the lock after this fraction of the TTL.
+    RENEW_RATIO = 0.8
+
+    _lock = threading.Lock()
+    # project Id -> {'expiresAt', 'usedAt', 'model', 'timer'} (monotonic
+    # times, the `LockCollaboratorRequest` to renew the lock with, and the
+    # `asyncio.TimerHandle` of the renewal)
+    _lease_by_project = {}
+    # The running renewals, so they aren't garbage collected.
+    _renewals = set()
+
+    @classmethod
+    async def acquire(cls, project_id):
+        """Acquire the lock of a project unless this server already
+        holds it.
+
+        Returns:
+            The response of the API, or a successful response if the lock
+            is already held.
+        """
+        with cls._lock:
+            lease = cls._lease_by_project.get(project_id)
+            if lease and monotonic() < lease['expiresAt']:
+                lease['usedAt'] = monotonic()
+                return {'success': True}
+        try:
+            return await cls.lock(
+                LockCollaboratorRequest(
+                    projectId=project_id, codeSourceId=AGENT_NAME
+                )
+            )
+        except httpx.HTTPError as e:
+            return {'success': False, 'errors': [f'{type(e).__name__}: {e}']}
+
+    @classmethod
+    async def lock(cls, model):
+        """Acquire the lock of a project with a `LockCollaboratorRequest`,
+        even if this server already holds it, and keep renewing it.
+
+        Returns:
+            The response of the API.
+        """
+        response = await cls._request(model)
+        if response.get('success'):
+            cls._record(model, response, used=True)
+        return response
+
+    @classmethod
+    def release(cls, project_id):
+        # Forget the lock of a project (ex: the project was deleted).
+        with cls._lock:
+            lease = cls._lease_by_project.pop(project_id, None)
+        if lease:
+            lease['timer'].cancel()
+
+    @classmethod
+    async def _request(cls, model):
+        return await post('/projects/collaboration/lock/acquire', model)
+
+    @classmethod
+    def _ttl(cls, response):
+        # Use the length of the lock if the API reports it.
+        ttl = response.get('ttl')
+        if isinstance(ttl, (int, float)) and ttl > 0:
+            return float(ttl)
+        return cls.TTL
+
+    @classmethod
+    def _record(cls, model, response, used):
+        project_id = model.projectId
+        ttl = cls._ttl(response)
+        now = monotonic()
+        with cls._lock:
+            lease = cls._lease_by_project.get(project_id)
+            if not used and lease is None:
+                # The lock was released during the renewal.
+                return
+            if lease:
+                lease['timer'].cancel()
+            cls._lease_by_project[project_id] = {
+                'expiresAt': now + ttl,
+                'usedAt': now if used or not lease else lease['usedAt'],
+                'model': model,
+                'timer': asyncio.get_running_loop().call_later(
+                    ttl * cls.RENEW_RATIO, cls._renew, project_id
+                )
+            }
+
+    @classmethod
+    def _renew(cls, project_id):
+        with cls._lock:
+            lease = cls._lease_by_project.get(project_id)
+            if lease is None:
+                return
+            if monotonic() - lease['usedAt'] > cls.IDLE_TIMEOUT:
+                # Let the lock expire.
+                del cls._lease_by_project[project_id]
+                return
+        task = asyncio.create_task(cls._renew_lease(lease['model']))
+        cls._renewals.add(task)
+        task.add_done_callback(cls._renewals.discard)
+
+    @classmethod
+    async def _renew_lease(cls, model):
+        try:
+            async with ProjectLocks.write(model.projectId):
+                response = await cls._request(model)
+        except httpx.HTTPError:
+            response = {}
+        if response.get('success'):
+            cls._record(model, response, used=False)
+        else:
+            # Acquire the lock again on the next edit.
+            with cls._lock:
+                cls._lease_by_project.pop(model.projectId, None)
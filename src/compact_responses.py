@@ -0,0 +1,95 @@
+import math
+import os
+
+# Select the tools that return their results in the compact encoding:
+#   MCP_COMPACT_RESPONSES: The names of the tools, separated by commas, or
+#       '*' for all the tools. Add ':<digits>' to a name to round the
+#       floats of that tool to another number of significant digits (ex:
+#       'read_backtest:4,list_backtests').
+#   MCP_COMPACT_DIGITS: The number of significant digits to round the
+#       floats to (default: 6).
+COMPACT_RESPONSES = os.getenv('MCP_COMPACT_RESPONSES', '')
+COMPACT_DIGITS = int(os.getenv('MCP_COMPACT_DIGITS', '6'))
+
+# The sentence that the compact tools add to their description, so the
+# clients can read the tables.
+COMPACT_DESCRIPTION = (
+    'The response is compact JSON: null fields are omitted, floats are '
+    'rounded, and lists of objects are tables of the form '
+    '{"columns": [<keys>], "rows": [[<values>], ...]}.'
+)
+
+
+def parse_compact_tools(spec, digits=None):
+    """Parse the value of MCP_COMPACT_RESPONSES.
+
+    'read_backtest:4,list_backtests' -> {'read_backtest': 4, 'list_backtests': 6}
+
+    Returns:
+        A dict with the number of significant digits of each tool. The '*'
+        key applies to the tools that aren't listed.
+    """
+    digits = COMPACT_DIGITS if digits is None else digits
+    digits_by_tool = {}
+    for entry in spec.split(','):
+        name, _, tool_digits = entry.strip().partition(':')
+        if not name:
+            continue
+        tool_digits = int(tool_digits) if tool_digits else digits
+        if tool_digits < 1:
+            raise ValueError(
+                f"Invalid number of digits for '{name}': {tool_digits}."
+            )
+        digits_by_tool[name] = tool_digits
+    return digits_by_tool
+
+
+def _round(number, digits):
+    if number == 0 or not math.isfinite(number):
+        return number
+    return round(number, digits - 1 - math.floor(math.log10(abs(number))))
+
+
+def _table(rows, digits):
+    # Return a list of dicts with the same keys as a table, or None.
+    if len(rows) < 2 or not all(isinstance(row, dict) for row in rows):
+        return None
+    keys = rows[0].keys()
+    if any(row.keys() != keys for row in rows):
+        return None
+    # The columns that are null in every row carry no information.
+    columns = [
+        key for key in keys if any(row[key] is not None for row in rows)
+    ]
+    return {
+        'columns': columns,
+        'rows': [
+            [compact_value(row[key], digits) for key in columns]
+            for row in rows
+        ]
+    }
+
+
+def compact_value(value, digits=None):
+    """Return the compact form of a JSON value:
+
+    - The null fields of the objects are dropped.
+    - The floats are rounded to `digits` significant digits.
+    - A list of objects that all have the same keys becomes a table:
+      {'columns': [<keys>], 'rows': [[<values>], ...]}. The null cells of
+      a table stay, since the cells are positional.
+    """
+    digits = COMPACT_DIGITS if digits is None else digits
+    if isinstance(value, dict):
+        return {
+            key: compact_value(item, digits)
+            for key, item in value.items() if item is not None
+        }
+    if isinstance(value, list):
+        table = _table(value, digits)
+        if table is not None:
+            return table
+        return [compact_value(item, digits) for item in value]
+    if isinstance(value, float):
+        return _round(value, digits)
+    return value
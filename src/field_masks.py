@@ -0,0 +1,204 @@
+import functools
+import inspect
+import types
+from typing import Annotated, List, Optional, Union, get_args, get_origin
+
+from pydantic import BaseModel, Field
+
+FIELDS_DESCRIPTION = (
+    "Paths of the response fields to return, separated by dots (ex: "
+    "'backtest.statistics' or 'backtest.runtimeStatistics.Equity'). Use "
+    "'*' for all the keys of a map. Omit it to return all the fields."
+)
+
+# The fields that every response keeps, so the caller can see if the
+# request failed.
+_STATUS_FIELDS = ('success', 'errors')
+
+
+def parse_fields(paths):
+    """Parse field paths into a tree.
+
+    ['backtest.status', 'backtest.statistics'] ->
+        {'backtest': {'status': {}, 'statistics': {}}}
+
+    An empty tree selects the whole value.
+    """
+    tree = {}
+    for path in paths:
+        node = tree
+        parts = path.split('.')
+        for i, part in enumerate(parts):
+            if not part:
+                raise ValueError(f"Invalid field path '{path}'.")
+            if i == len(parts) - 1:
+                # The path selects the whole field.
+                node[part] = {}
+            elif part in node and not node[part]:
+                # A shorter path already selects the whole field.
+                break
+            else:
+                node = node.setdefault(part, {})
+    return tree
+
+
+def _unwrap(annotation):
+    # Return ('model', class), ('list', item annotation), ('map', value
+    # annotation), or (None, None) for the annotation of a field.
+    while True:
+        origin = get_origin(annotation)
+        if origin is Annotated:
+            annotation = get_args(annotation)[0]
+        elif origin in (Union, types.UnionType):
+            arguments = [
+                argument for argument in get_args(annotation)
+                if argument is not type(None)
+            ]
+            if len(arguments) != 1:
+                return None, None
+            annotation = arguments[0]
+        else:
+            break
+    if origin in (list, List):
+        return 'list', get_args(annotation)[0]
+    if origin is dict:
+        return 'map', get_args(annotation)[1]
+    if inspect.isclass(annotation) and issubclass(annotation, BaseModel):
+        return 'model', annotation
+    return None, None
+
+
+def _field_annotations(model):
+    # alias -> annotation, and field name -> alias.
+    annotations = {}
+    alias_by_name = {}
+    for name, info in model.model_fields.items():
+        alias = info.alias or name
+        annotations[alias] = info.annotation
+        alias_by_name[name] = alias
+    return annotations, alias_by_name
+
+
+def _resolve(tree, annotation, path=''):
+    # Check the tree against the response model and return it with the
+    # field aliases the API uses (ex: 'Total_Orders' -> 'Total Orders').
+    if not tree:
+        return tree
+    kind, inner = _unwrap(annotation)
+    while kind == 'list':
+        kind, inner = _unwrap(inner)
+    if kind == 'map':
+        return {
+            key: _resolve(subtree, inner, f'{path}{key}.')
+            for key, subtree in tree.items()
+        }
+    if kind != 'model':
+        # The field isn't a model (ex: a plain dict), so any key is valid.
+        return tree
+    annotations, alias_by_name = _field_annotations(inner)
+    resolved = {}
+    for key, subtree in tree.items():
+        if key != '*':
+            key = alias_by_name.get(key, key)
+            if key not in annotations:
+                raise ValueError(
+                    f"Unknown field '{path}{key}'. The fields of "
+                    f"'{path.rstrip('.') or 'the response'}' are: "
+                    f"{', '.join(annotations)}."
+                )
+        resolved[key] = _resolve(
+            subtree, annotations.get(key), f'{path}{key}.'
+        )
+    return resolved
+
+
+def _project(value, tree, annotation):
+    if not tree or value is None:
+        return value
+    kind, inner = _unwrap(annotation)
+    if isinstance(value, list):
+        item_annotation = inner if kind == 'list' else annotation
+        return [_project(item, tree, item_annotation) for item in value]
+    if not isinstance(value, dict):
+        return value
+    annotations = {}
+    keys = set(tree)
+    if kind == 'model':
+        annotations, _ = _field_annotations(inner)
+        # Keep the required fields, so the response still validates.
+        keys.update(
+            info.alias or name for name, info in inner.model_fields.items()
+            if info.is_required()
+        )
+    projected = {}
+    for key, item in value.items():
+        if key not in keys and '*' not in keys:
+            continue
+        subtree = tree.get(key, tree.get('*', {}))
+        item_annotation = inner if kind == 'map' else annotations.get(key)
+        projected[key] = _project(item, subtree, item_annotation)
+    return projected
+
+
+def project_response(response, fields, model=None):
+    """Keep only some fields of a tool response.
+
+    Args:
+        response: The response (a dict or a Pydantic model).
+        fields: The paths of the fields to keep (see `parse_fields`).
+        model: The response model. It maps the field names to the API
+            aliases and rejects unknown fields. The required fields of
+            the models along the paths are always kept.
+
+    Returns:
+        The response with the selected fields. It also keeps the
+        `success` and `errors` fields, and an unsuccessful response is
+        returned unchanged.
+    """
+    if isinstance(response, BaseModel):
+        response = response.model_dump(by_alias=True, exclude_unset=True)
+    if not isinstance(response, dict) or response.get('success') is False:
+        return response
+    try:
+        tree = _resolve(parse_fields(fields), model)
+    except ValueError as e:
+        return {'success': False, 'errors': [str(e)]}
+    for key in _STATUS_FIELDS:
+        tree.setdefault(key, {})
+    return _project(response, tree, model)
+
+
+def field_mask(fn):
+    """Add a `fields` argument to a read tool, so the caller can select
+    the fields of the response.
+
+    FastMCP validates the result of a tool against its response model,
+    so the fields that the mask drops aren't validated either.
+
+    Usage:
+        @mcp.tool(annotations={'title': 'Read backtest', 'readOnlyHint': True})
+        @field_mask
+        async def read_backtest(model: ReadBacktestRequest) -> BacktestResponse:
+            ...
+    """
+    signature = inspect.signature(fn)
+    model = signature.return_annotation
+
+    @functools.wraps(fn)
+    async def wrapper(*args, fields=None, **kwargs):
+        response = await fn(*args, **kwargs)
+        if not fields:
+            return response
+        return project_response(response, fields, model)
+
+    fields = inspect.Parameter(
+        'fields', inspect.Parameter.KEYWORD_ONLY, default=None,
+        annotation=Annotated[
+            Optional[List[str]],
+            Field(description=FIELDS_DESCRIPTION)
+        ]
+    )
+    wrapper.__signature__ = signature.replace(
+        parameters=[*signature.parameters.values(), fields]
+    )
+    return wrapper
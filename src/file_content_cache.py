@@ -0,0 +1,125 @@
+import os
+import threading
+from hashlib import sha256
+from time import monotonic
+
+
+def _hash(content):
+    return sha256((content or '').encode('utf-8')).hexdigest()
+
+
+class FileContentCache:
+    """Content (and hash) of each project file in QuantConnect Cloud,
+    keyed by (project Id, file name).
+
+    The entries come from the responses of `/files/read` and from the
+    successful writes of this server, so `update_file_contents` can skip
+    the writes that wouldn't change the file and send a patch against
+    the previous content instead of the whole file. Since other clients 
+    (ex: the web IDE) can edit the files too, the entries expire after
+    FILE_CACHE_TTL seconds.
+
+    When a response has all the files of a project, the cache also
+    serves the whole project (ex: to search its files) until the entries
+    expire or a change it can't follow (ex: a patch) invalidates it.
+
+    The tool calls and the `WorkspaceSync` use the cache from different
+    threads, so the methods hold a lock.
+    """
+
+    TTL = float(os.getenv('FILE_CACHE_TTL', '300'))
+    MAX_FILES = 2000
+
+    skipped_writes = 0
+    _lock = threading.RLock()
+    # (project Id, name) -> (hash, content, monotonic time), from the 
+    # least to the most recently updated.
+    _entry_by_file = {}
+    # project Id -> monotonic time when all its files were cached
+    _complete_projects = {}
+
+    @classmethod
+    def update(cls, project_id, name, content):
+        key = (project_id, name)
+        entry = (_hash(content), content, monotonic())
+        with cls._lock:
+            cls._entry_by_file.pop(key, None)
+            cls._entry_by_file[key] = entry
+            # Evict the least recently updated files.
+            while len(cls._entry_by_file) > cls.MAX_FILES:
+                evicted = next(iter(cls._entry_by_file))
+                del cls._entry_by_file[evicted]
+                cls._complete_projects.pop(evicted[0], None)
+
+    @classmethod
+    def update_files(cls, response, project_id=None):
+        """Record the files of a `ProjectFilesResponse` dictionary. Pass
+        the project Id if the response has all the files of the project.
+        """
+        if not response.get('success'):
+            return
+        with cls._lock:
+            if project_id is not None:
+                cls.remove(project_id)
+            for file in response.get('files') or []:
+                if file.get('content') is not None and not file.get('isLibrary'):
+                    cls.update(file['projectId'], file['name'], file['content'])
+            if project_id is not None:
+                cls._complete_projects[project_id] = monotonic()
+
+    @classmethod
+    def rename(cls, project_id, name, new_name):
+        with cls._lock:
+            entry = cls._entry_by_file.pop((project_id, name), None)
+            if entry:
+                cls._entry_by_file[(project_id, new_name)] = entry
+
+    @classmethod
+    def remove(cls, project_id, name=None):
+        # Forget a file, or all the files of a project if no name is
+        # given.
+        with cls._lock:
+            if name is not None:
+                cls._entry_by_file.pop((project_id, name), None)
+                return
+            cls._complete_projects.pop(project_id, None)
+            for key in [k for k in cls._entry_by_file if k[0] == project_id]:
+                del cls._entry_by_file[key]
+
+    @classmethod
+    def _entry(cls, project_id, name):
+        entry = cls._entry_by_file.get((project_id, name))
+        if entry is None or monotonic() - entry[2] > cls.TTL:
+            return None
+        return entry
+
+    @classmethod
+    def is_unchanged(cls, project_id, name, content):
+        """Check if `content` is the current content of the file."""
+        entry = cls._entry(project_id, name)
+        return entry is not None and entry[0] == _hash(content)
+
+    @classmethod
+    def content(cls, project_id, name):
+        """Return the current content of the file, or None if it's not
+        cached."""
+        entry = cls._entry(project_id, name)
+        return None if entry is None else entry[1]
+
+    @classmethod
+    def project_files(cls, project_id):
+        """Return the content of all the files of a project by name, or
+        None if the project isn't fully cached."""
+        with cls._lock:
+            cached_at = cls._complete_projects.get(project_id)
+            if cached_at is None or monotonic() - cached_at > cls.TTL:
+                return None
+            return {
+                name: entry[1]
+                for (id_, name), entry in cls._entry_by_file.items()
+                if id_ == project_id
+            }
+
+    @classmethod
+    def cached_files(cls):
+        return len(cls._entry_by_file)
@@ -0,0 +1,112 @@
+from difflib import unified_diff
+
+from api_connection import post
+from code_source_id import add_code_source_id
+from file_content_cache import FileContentCache
+from models import (
+    CreateProjectFileRequest,
+    UpdateFileContentsRequest,
+    PatchFileRequest
+)
+
+# Send a patch instead of the whole file when the patch is smaller than
+# this fraction of the file.
+MAX_PATCH_RATIO = 0.5
+
+# Number of writes and request bytes since the server started.
+WRITE_STATISTICS = {
+    'patchedWrites': 0,
+    'fullWrites': 0,
+    'rejectedPatches': 0,
+    'bytesSent': 0,
+    'bytesSaved': 0
+}
+
+
+def make_patch(name, old_content, new_content):
+    """Create a patch in the format that `/files/patch` expects (the
+    format of `git diff`) to change a file from `old_content` to
+    `new_content`. Return an empty string if the contents are equal.
+    """
+    lines = []
+    for line in unified_diff(
+            old_content.splitlines(keepends=True),
+            new_content.splitlines(keepends=True),
+            f'a/{name}', f'b/{name}'):
+        if not line.endswith('\n'):
+            line += '\n\\ No newline at end of file\n'
+        lines.append(line)
+    if not lines:
+        return ''
+    return (
+        f'diff --git a/{name} b/{name}\n'
+        'index 0000000..0000000 100644\n'
+        + ''.join(lines)
+    )
+
+
+async def write_file(
+        project_id, name, content, previous_content=None, create=False):
+    """Save the content of a project file with the cheapest request.
+
+    If the previous content of the file is known and the diff is much
+    smaller than the file, this function sends a patch. If the API
+    rejects the patch (ex: the file changed in the meantime), it sends 
+    the whole file instead. If `create` is True and the file doesn't 
+    exist, it creates the file. The successful writes update the 
+    `FileContentCache`.
+
+    Returns:
+        A tuple with the response of the API and the method that saved
+        the file ('patch', 'update', or 'create').
+    """
+    response, method = await _write_file(
+        project_id, name, content, previous_content, create
+    )
+    if response.get('success'):
+        FileContentCache.update(project_id, name, content)
+    return response, method
+
+
+async def _write_file(project_id, name, content, previous_content, create):
+    size = len(content.encode('utf-8'))
+    if previous_content is not None:
+        patch = make_patch(name, previous_content, content)
+        if not patch:
+            return {'success': True}, 'patch'
+        patch_size = len(patch.encode('utf-8'))
+        if patch_size < MAX_PATCH_RATIO * size:
+            response = await post(
+                '/files/patch',
+                add_code_source_id(
+                    PatchFileRequest(projectId=project_id, patch=patch)
+                )
+            )
+            WRITE_STATISTICS['bytesSent'] += patch_size
+            if response.get('success'):
+                WRITE_STATISTICS['patchedWrites'] += 1
+                WRITE_STATISTICS['bytesSaved'] += size - patch_size
+                return response, 'patch'
+            WRITE_STATISTICS['rejectedPatches'] += 1
+    response = await post(
+        '/files/update',
+        add_code_source_id(
+            UpdateFileContentsRequest(
+                projectId=project_id, name=name, content=content
+            )
+        )
+    )
+    WRITE_STATISTICS['bytesSent'] += size
+    WRITE_STATISTICS['fullWrites'] += 1
+    if response.get('success') or not create:
+        return response, 'update'
+    # The file may not exist yet.
+    created = await post(
+        '/files/create',
+        add_code_source_id(
+            CreateProjectFileRequest(
+                projectId=project_id, name=name, content=content
+            )
+        )
+    )
+    return (created, 'create') if created.get('success') else (response, 'update')
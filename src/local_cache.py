@@ -0,0 +1,36 @@
+import json
+import os
+
+# Load the directory where the server persists its indexes between
+# restarts from the environment variables.
+CACHE_DIRECTORY = os.getenv(
+    'MCP_CACHE_DIR',
+    os.path.join(os.path.expanduser('~'), '.cache', 'quantconnect-mcp')
+)
+
+
+def cache_path(name):
+    return os.path.join(CACHE_DIRECTORY, name)
+
+
+def load_json(name, default=None):
+    # A missing or corrupt cache file is the same as an empty cache.
+    try:
+        with open(cache_path(name), 'r', encoding='utf-8') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return default
+
+
+def save_json(name, data):
+    # Write to a temporary file first so a crash never leaves a
+    # truncated cache file behind.
+    path = cache_path(name)
+    try:
+        os.makedirs(CACHE_DIRECTORY, exist_ok=True)
+        with open(f'{path}.tmp', 'w', encoding='utf-8') as file:
+            json.dump(data, file)
+        os.replace(f'{path}.tmp', path)
+    except OSError:
+        # The cache is an optimization, so a read-only disk isn't fatal.
+        pass
@@ -1,23 +1,23 @@
+import asyncio
 import logging
 import os
+import sys
+from contextlib import asynccontextmanager
 from datetime import datetime
 from mcp.server.fastmcp import FastMCP
 
-from tools.account import register_account_tools
-from tools.project import register_project_tools
-from tools.project_collaboration import register_project_collaboration_tools
-from tools.project_nodes import register_project_node_tools
-from tools.compile import register_compile_tools
-from tools.files import register_file_tools
-from tools.backtests import register_backtest_tools
-from tools.optimizations import register_optimization_tools
-from tools.live import register_live_trading_tools
-from tools.live_commands import register_live_trading_command_tools
-from tools.object_store import register_object_store_tools
-from tools.lean_versions import register_lean_version_tools
-from tools.ai import register_ai_tools
-from tools.mcp_server_version import register_mcp_server_version_tools
 from organization_workspace import OrganizationWorkspace
+from workspace_watcher import WorkspaceWatcher
+from tool_profiles import ToolProfiles
+from tool_schema_cache import ToolSchemaCache
+from schema_compaction import compact_tools
+from tool_results import ToolResults
+from workspace_sync import WorkspaceSync
+
+# Select the tools to expose (see `ToolProfiles`).
+profile = ToolProfiles.resolve(sys.argv[1:] if __name__ == "__main__" else [])
+server_name = ToolProfiles.PROFILES[profile]["name"]
+log_name = "quantconnect-mcp" if profile == "full" else f"quantconnect-mcp-{profile}"
 
 # Configure logging before any other imports
 # Create logs directory if it doesn't exist
@@ -31,15 +31,16 @@ logging.basicConfig(
     handlers=[
         logging.StreamHandler(),  # Console output (captured by systemd)
         logging.FileHandler(
-            f"{log_dir}/quantconnect-mcp.log", mode="a"
+            f"{log_dir}/{log_name}.log", mode="a"
         ),  # Append to log file
     ],
 )
-logger = logging.getLogger("quantconnect-mcp")
+logger = logging.getLogger(log_name)
 
 # Log startup information (before any tool registration)
 logger.info("=" * 60)
 logger.info("🚀 QuantConnect MCP Server Starting Up")
+logger.info(f"🧰 Tool profile: {profile}")
 logger.info(f"⏰ Startup time: {datetime.now().isoformat()}")
 logger.info(f"🌐 Transport: {os.getenv('MCP_TRANSPORT', 'stdio')}")
 logger.info(f"📍 Host: {os.getenv('MCP_HOST', '127.0.0.1')}")
@@ -56,41 +57,49 @@ host = os.getenv("MCP_HOST", "127.0.0.1")
 port = int(os.getenv("MCP_PORT", "8000"))
 
 # Load the server instructions.
-with open("src/instructions.md", "r", encoding="utf-8") as file:
+instructions_file = ToolProfiles.PROFILES[profile]["instructions"]
+with open(f"src/{instructions_file}", "r", encoding="utf-8") as file:
     instructions = file.read()
 
 logger.info(f"🔧 Initializing FastMCP server with host={host}, port={port}")
 
+@asynccontextmanager
+async def lifespan(server):
+    # Push the workspace edits to QuantConnect Cloud, if enabled. The
+    # pushes run on the event loop of the server, like the tool calls.
+    WorkspaceSync.start(asyncio.get_running_loop())
+    yield {}
+
 # Initialize the FastMCP server with host and port configuration.
-mcp = FastMCP("quantconnect", instructions, host=host, port=port)
+mcp = FastMCP(server_name, instructions, host=host, port=port, lifespan=lifespan)
+# Reuse the tool schemas from the previous start if the code didn't change.
+ToolSchemaCache.install(mcp)
 
 logger.info("📋 Starting tool registration process...")
 
-# Register all the tools.
-registration_functions = [
-    register_account_tools,
-    register_project_tools,
-    register_project_collaboration_tools,
-    register_project_node_tools,
-    register_compile_tools,
-    register_file_tools,
-    register_backtest_tools,
-    register_optimization_tools,
-    register_live_trading_tools,
-    register_live_trading_command_tools,
-    register_object_store_tools,
-    register_lean_version_tools,
-    register_ai_tools,
-    register_mcp_server_version_tools,
-]
-for f in registration_functions:
-    f(mcp)
+# Register the tools of the profile.
+tool_count = ToolProfiles.register(mcp, profile)
+ToolSchemaCache.save()
+# Shrink the tool schemas that `tools/list` returns, if enabled.
+schema_sizes = compact_tools(mcp)
+before = sum(size["before"] for size in schema_sizes)
+after = sum(size["after"] for size in schema_sizes)
+if after < before:
+    logger.info(f"📦 Compacted the tool schemas from {before} to {after} bytes")
+# Validate the large tool results in a worker thread.
+if not ToolResults.install(mcp):
+    logger.warning(
+        "⚠️ ToolResults doesn't support this mcp version, "
+        "so the tool results are validated on the event loop"
+    )
 
-logger.info("✅ Tool registration process completed successfully")
+logger.info(f"✅ Registered {tool_count} tools")
 
 if __name__ == "__main__":
     # Load the organization workspace.
     OrganizationWorkspace.load()
+    # Keep the project index current while the server runs.
+    WorkspaceWatcher.start()
     # Run the server.
 
     if transport == "streamable-http" or transport == "http":
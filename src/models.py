@@ -9,7 +9,11 @@ from datetime import datetime, time
 from enum import Enum
 from typing import Annotated, Any, Dict, List, Optional, Union
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel as PydanticBaseModel, Field
+
+
+class BaseModel(PydanticBaseModel):
+    model_config = ConfigDict(defer_build=True)
 
 
 class Language(Enum):
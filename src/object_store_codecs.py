@@ -0,0 +1,128 @@
+"""Opt-in compression for Object Store payloads.
+
+A compressed object is stored under its key plus the suffix of its
+codec (ex: `data.csv` -> `data.csv.gz`), which both tags the object for
+`download_object_files` (with `decompress`) and lets algorithms open it with the usual
+tools (ex: `gzip.open` or `pandas.read_csv`).
+"""
+
+import zlib
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+_DECOMPRESSION_ERRORS = (zlib.error,) + (
+    (zstandard.ZstdError,) if zstandard else ()
+)
+
+CODECS = ['none', 'auto', 'gzip', 'zstd']
+SUFFIX_BY_CODEC = {'gzip': '.gz', 'zstd': '.zst'}
+MAGIC_BY_CODEC = {'gzip': b'\x1f\x8b', 'zstd': b'\x28\xb5\x2f\xfd'}
+
+# Signatures of formats that are already compressed, so compressing them
+# again only wastes CPU.
+_COMPRESSED_SIGNATURES = [
+    b'\x1f\x8b',              # gzip
+    b'\x28\xb5\x2f\xfd',      # zstd
+    b'PK\x03\x04',            # zip (and docx, xlsx, npz, ...)
+    b'BZh',                   # bzip2
+    b'\xfd7zXZ\x00',          # xz
+    b'7z\xbc\xaf\x27\x1c',    # 7z
+    b'\x89PNG',               # png
+    b'\xff\xd8\xff',          # jpeg
+    b'GIF8',                  # gif
+    b'PAR1',                  # parquet
+    b'\x04\x22\x4d\x18',      # lz4
+]
+
+# Compress a sample of the payload and only compress the whole payload if
+# the sample shrinks below this ratio.
+SAMPLE_SIZE = 64 * 1024
+MAX_COMPRESSION_RATIO = 0.9
+
+
+def choose_codec(sample, compression):
+    """Select the codec for a payload given its first bytes.
+
+    Args:
+        sample: The first bytes of the payload.
+        compression: One of `CODECS`.
+
+    Returns:
+        'gzip', 'zstd', or None for no compression. Throws a ValueError
+        if the requested codec isn't available.
+    """
+    if compression == 'none':
+        return None
+    if compression == 'zstd' and zstandard is None:
+        raise ValueError(
+            'zstd compression requires the zstandard package. Install it '
+            'or use gzip compression.'
+        )
+    if compression != 'auto':
+        return compression
+    if not sample or any(sample.startswith(s) for s in _COMPRESSED_SIGNATURES):
+        return None
+    sample = sample[:SAMPLE_SIZE]
+    if len(zlib.compress(sample, 1)) > MAX_COMPRESSION_RATIO * len(sample):
+        return None
+    return 'zstd' if zstandard else 'gzip'
+
+
+def encode_key(key, codec):
+    return key + SUFFIX_BY_CODEC[codec] if codec else key
+
+
+def decode_key(key):
+    # Return the original key and the codec of a tagged key.
+    for codec, suffix in SUFFIX_BY_CODEC.items():
+        if key.endswith(suffix) and len(key) > len(suffix):
+            return key[:-len(suffix)], codec
+    return key, None
+
+
+def _compressor(codec):
+    if codec == 'zstd':
+        return zstandard.ZstdCompressor().compressobj()
+    # wbits=31 writes a gzip header with a fixed modification time, so
+    # the same input always compresses to the same bytes.
+    return zlib.compressobj(6, zlib.DEFLATED, 31)
+
+
+def _decompressor(codec):
+    if codec == 'zstd':
+        if zstandard is None:
+            raise ValueError('Decompressing zstd requires the zstandard package.')
+        return zstandard.ZstdDecompressor().decompressobj()
+    return zlib.decompressobj(31)
+
+
+def compress_bytes(data, codec):
+    compressor = _compressor(codec)
+    return compressor.compress(data) + compressor.flush()
+
+
+def compress_file(source, target, codec, chunk_size):
+    # Stream `source` into `target` (binary file objects) one chunk at a
+    # time.
+    compressor = _compressor(codec)
+    while chunk := source.read(chunk_size):
+        target.write(compressor.compress(chunk))
+    target.write(compressor.flush())
+
+
+def decompress_file(source, target, codec, chunk_size):
+    # Stream `source` into `target` (binary file objects) one chunk at a
+    # time. Throws a ValueError if the data isn't valid for the codec.
+    decompressor = _decompressor(codec)
+    try:
+        while chunk := source.read(chunk_size):
+            target.write(decompressor.decompress(chunk))
+        if codec == 'gzip':
+            target.write(decompressor.flush())
+    except _DECOMPRESSION_ERRORS as e:
+        raise ValueError(f'The {codec} stream is invalid: {e}') from e
+    if codec == 'gzip' and not decompressor.eof:
+        raise ValueError('The gzip stream is truncated.')
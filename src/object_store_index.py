@@ -0,0 +1,201 @@
+import asyncio
+from collections import defaultdict
+from datetime import datetime, timezone
+from fnmatch import fnmatchcase
+from time import time
+
+from local_cache import load_json, save_json
+from object_store_transfer import list_files, normalize_key
+
+
+def _parse_datetime(value):
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _is_under(key, prefix):
+    return not prefix or key == prefix or key.startswith(prefix + '/')
+
+
+class ObjectStoreIndex:
+    """Local index of the `ObjectStoreSummary` entries of each
+    organization.
+
+    The index is persisted in the cache directory, populated with
+    concurrent recursive listing, and kept current by the tools that
+    write to the Object Store.
+    """
+
+    _objects_by_organization = {}
+    _indexed_at_by_organization = {}
+    _locks = defaultdict(asyncio.Lock)
+
+    @classmethod
+    def _file_name(cls, organization_id):
+        return f'object_store_index_{organization_id}.json'
+
+    @classmethod
+    def _objects(cls, organization_id):
+        if organization_id not in cls._objects_by_organization:
+            cached = load_json(cls._file_name(organization_id), {})
+            cls._objects_by_organization[organization_id] = \
+                cached.get('objects', {})
+            cls._indexed_at_by_organization[organization_id] = \
+                cached.get('indexedAt')
+        return cls._objects_by_organization[organization_id]
+
+    @classmethod
+    def _save(cls, organization_id):
+        save_json(
+            cls._file_name(organization_id),
+            {
+                'indexedAt': cls._indexed_at_by_organization.get(organization_id),
+                'objects': cls._objects(organization_id)
+            }
+        )
+
+    @classmethod
+    def indexed_at(cls, organization_id):
+        cls._objects(organization_id)
+        return cls._indexed_at_by_organization.get(organization_id)
+
+    @classmethod
+    async def refresh(
+            cls, organization_id, path='/', full=False, max_concurrency=8):
+        """Re-list a directory of the Object Store.
+
+        Unless `full` is True, the folders whose size and modification
+        time match the index aren't listed again.
+
+        Returns:
+            A dictionary that respects the
+            `RefreshObjectStoreIndexResponse` model.
+        """
+        start = time()
+        prefix = normalize_key(path or '')
+        async with cls._locks[organization_id]:
+            objects = cls._objects(organization_id)
+            skipped = set()
+
+            def skip_folder(summary):
+                cached = objects.get(summary['key'])
+                unchanged = (
+                    not full and cached is not None and
+                    summary.get('modified') is not None and
+                    summary.get('size') is not None and
+                    cached.get('modified') == summary['modified'] and
+                    cached.get('size') == summary['size']
+                )
+                if unchanged:
+                    skipped.add(summary['key'])
+                return unchanged
+
+            listed = await list_files(
+                organization_id, prefix or '/', max_concurrency,
+                include_folders=True, skip_folder=skip_folder
+            )
+            # Replace the entries under the directory, except the ones
+            # under the folders that were skipped.
+            for key in [key for key in objects if _is_under(key, prefix)]:
+                if key != prefix and not any(
+                        _is_under(key, folder) for folder in skipped):
+                    del objects[key]
+            objects.update(listed)
+            if not prefix:
+                cls._indexed_at_by_organization[organization_id] = \
+                    datetime.now(timezone.utc).isoformat()
+            cls._save(organization_id)
+        return {
+            'objects': len(listed),
+            'skippedFolders': len(skipped),
+            'elapsed': round(time() - start, 3),
+            'success': True
+        }
+
+    @classmethod
+    def upsert(cls, organization_id, key, size):
+        # Record a file that this server wrote to the Object Store.
+        key = normalize_key(key)
+        objects = cls._objects(organization_id)
+        now = datetime.now(timezone.utc).replace(tzinfo=None).isoformat()
+        objects[key] = {
+            'key': key, 'name': key.split('/')[-1], 'modified': now,
+            'folder': False, 'size': size
+        }
+        # Make the parent folders visible to prefix queries.
+        parts = key.split('/')[:-1]
+        for i in range(1, len(parts) + 1):
+            folder = '/'.join(parts[:i])
+            objects.setdefault(
+                folder, {'key': folder, 'name': parts[i - 1], 'folder': True}
+            )
+        cls._save(organization_id)
+
+    @classmethod
+    def remove(cls, organization_id, key):
+        # Forget a file or a directory (and its contents) that this
+        # server deleted from the Object Store.
+        key = normalize_key(key)
+        objects = cls._objects(organization_id)
+        for k in [k for k in objects if _is_under(k, key)]:
+            del objects[k]
+        cls._save(organization_id)
+
+    @classmethod
+    def query(
+            cls, organization_id, prefix=None, pattern=None, min_size=None,
+            max_size=None, modified_after=None, modified_before=None):
+        """Return the indexed files that match all the given filters,
+        sorted by key.
+
+        `pattern` is a glob (ex: 'models/*.pkl') that's matched against
+        the full key.
+        """
+        prefix = normalize_key(prefix or '')
+        modified_after = _parse_datetime(modified_after)
+        modified_before = _parse_datetime(modified_before)
+        matches = []
+        for key, obj in cls._objects(organization_id).items():
+            if obj.get('folder') or not _is_under(key, prefix):
+                continue
+            if pattern and not fnmatchcase(key, normalize_key(pattern)):
+                continue
+            size = obj.get('size') or 0
+            if min_size is not None and size < min_size:
+                continue
+            if max_size is not None and size > max_size:
+                continue
+            if modified_after or modified_before:
+                modified = _parse_datetime(obj.get('modified'))
+                if modified is None:
+                    continue
+                if modified_after and modified < modified_after:
+                    continue
+                if modified_before and modified > modified_before:
+                    continue
+            matches.append(obj)
+        return sorted(matches, key=lambda obj: obj['key'])
+
+    @classmethod
+    def usage(cls, organization_id, prefix=None, depth=1):
+        """Sum the size and number of files under each directory that's
+        `depth` levels below the prefix, largest first.
+        """
+        prefix = normalize_key(prefix or '')
+        sizes = defaultdict(lambda: {'size': 0, 'files': 0})
+        for obj in cls.query(organization_id, prefix):
+            relative = obj['key'][len(prefix):].strip('/').split('/')
+            group = '/'.join(
+                ([prefix] if prefix else []) + relative[:depth]
+            )
+            sizes[group]['size'] += int(obj.get('size') or 0)
+            sizes[group]['files'] += 1
+        return sorted(
+            [{'prefix': group} | usage for group, usage in sizes.items()],
+            key=lambda usage: usage['size'], reverse=True
+        )
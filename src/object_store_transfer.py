@@ -0,0 +1,692 @@
+import asyncio
+import mimetypes
+import os
+import shutil
+import tempfile
+from hashlib import md5
+from time import time, monotonic
+from uuid import uuid4
+from zipfile import ZipFile, BadZipFile
+
+from api_connection import post, httpx, get_headers, BASE_URL
+from organization_workspace import OrganizationWorkspace
+from object_store_codecs import (
+    MAGIC_BY_CODEC,
+    SAMPLE_SIZE,
+    SUFFIX_BY_CODEC,
+    choose_codec,
+    encode_key,
+    decode_key,
+    compress_file,
+    decompress_file
+)
+from models import (
+    ListObjectStoreRequest,
+    GetObjectStorePropertiesRequest,
+    GetObjectStoreJobIdRequest,
+    GetObjectStoreURLRequest,
+    DeleteObjectStoreRequest
+)
+
+# Size of the chunks that are read from disk and sent over the network.
+CHUNK_SIZE = 1024 * 1024
+
+
+class RateLimiter:
+    """Space out API requests so they don't exceed a maximum rate."""
+
+    def __init__(self, requests_per_second):
+        self._interval = 1 / requests_per_second
+        self._next_slot = 0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self._lock:
+            now = monotonic()
+            delay = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self._interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+def normalize_key(key):
+    # The API returns some keys with a leading slash (ex: '/dir/file').
+    return key.strip('/')
+
+
+def _field_header(boundary, name, file_name=None, content_type=None):
+    header = f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"'
+    if file_name is not None:
+        header += f'; filename="{file_name.replace(chr(34), "%22")}"'
+    if content_type is not None:
+        header += f'\r\nContent-Type: {content_type}'
+    return (header + '\r\n\r\n').encode('utf-8')
+
+
+async def _read_chunks(path):
+    # Read the file in a worker thread so large files don't block the
+    # event loop.
+    with open(path, 'rb') as file:
+        while chunk := await asyncio.to_thread(file.read, CHUNK_SIZE):
+            yield chunk
+
+
+def _multipart_body(boundary, data, file_field, file_name, path, on_chunk):
+    """Build a streaming `multipart/form-data` body for one file.
+
+    Returns the body length and an async iterator over the body, which
+    only holds one chunk of the file in memory at a time.
+    """
+    preamble = b''.join(
+        _field_header(boundary, name) + f'{value}\r\n'.encode('utf-8')
+        for name, value in data.items()
+    )
+    preamble += _field_header(
+        boundary, file_field, file_name,
+        mimetypes.guess_type(file_name)[0] or 'application/octet-stream'
+    )
+    epilogue = f'\r\n--{boundary}--\r\n'.encode('utf-8')
+    length = len(preamble) + os.path.getsize(path) + len(epilogue)
+
+    async def body():
+        yield preamble
+        async for chunk in _read_chunks(path):
+            yield chunk
+            if on_chunk:
+                await on_chunk(len(chunk))
+        yield epilogue
+
+    return length, body()
+
+
+async def upload_file(client, organization_id, key, path, on_chunk=None):
+    """Stream a file from the local disk to the Object Store.
+
+    Args:
+        client: The `httpx.AsyncClient` to send the request with.
+        organization_id: Id of the organization that owns the Object
+            Store.
+        key: Key to store the file under.
+        path: Absolute path of the file.
+        on_chunk: Optional coroutine function that's called with the
+            size of each chunk after it's sent.
+
+    Returns:
+        Response JSON. Throws an exception if the request fails.
+    """
+    boundary = uuid4().hex
+    length, body = _multipart_body(
+        boundary, {'organizationId': organization_id, 'key': key},
+        'objectData', os.path.basename(key), path, on_chunk
+    )
+    response = await client.post(
+        f'{BASE_URL}/object/set',
+        headers=get_headers() | {
+            'Content-Type': f'multipart/form-data; boundary={boundary}',
+            'Content-Length': str(length)
+        },
+        content=body,
+        timeout=30.0
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+def _read_sample(path):
+    with open(path, 'rb') as file:
+        return file.read(SAMPLE_SIZE)
+
+
+def _compress_to_temporary_file(path, codec):
+    with open(path, 'rb') as source, tempfile.NamedTemporaryFile(
+            suffix=SUFFIX_BY_CODEC[codec], delete=False) as target:
+        compress_file(source, target, codec, CHUNK_SIZE)
+    return target.name
+
+
+async def upload_files(
+        organization_id, files, max_concurrency=4, on_progress=None, 
+        rate_limiter=None, on_uploaded=None, compression='none'):
+    """Concurrently stream files from the organization workspace to the
+    Object Store.
+
+    Args:
+        organization_id: Id of the organization that owns the Object
+            Store.
+        files: List of `(key, path)` pairs. Relative paths are resolved
+            against the workspace mount.
+        max_concurrency: Maximum number of simultaneous uploads.
+        on_progress: Optional coroutine function that's called with the
+            number of bytes sent so far and the total number of bytes.
+        rate_limiter: Optional `RateLimiter` to space out the requests.
+        on_uploaded: Optional function that's called with the key and
+            size of each file after it's stored.
+        compression: Codec to compress the files with (see
+            `object_store_codecs.CODECS`). Each compressed file is 
+            compressed into a temporary file first, so it can still be 
+            streamed with a known length.
+
+    Returns:
+        A dictionary that respects the `ObjectStoreTransferResponse`
+        model.
+    """
+    start = time()
+    results = []
+    jobs = []
+    for key, path in files:
+        resolved = OrganizationWorkspace.resolve_path(path)
+        result = {'key': key, 'path': resolved or path, 'size': 0}
+        results.append(result)
+        if not OrganizationWorkspace.MOUNT_DESTINATION:
+            result['errors'] = [
+                "The organization workspace isn't mounted. Set the "
+                'MOUNT_SOURCE_PATH and MOUNT_DST_PATH environment variables.'
+            ]
+        elif resolved is None:
+            result['errors'] = [f'{path} is outside the organization workspace.']
+        elif not os.path.isfile(resolved):
+            result['errors'] = [f'{path} is not a file.']
+        else:
+            jobs.append(result)
+    total = sum(os.path.getsize(result['path']) for result in jobs)
+    sent = 0
+
+    async def on_chunk(size):
+        nonlocal sent
+        sent += size
+        if on_progress:
+            await on_progress(sent, total)
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+    limits = httpx.Limits(max_connections=max_concurrency)
+    async with httpx.AsyncClient(limits=limits) as client:
+
+        async def upload(result):
+            nonlocal total
+            async with semaphore:
+                if rate_limiter:
+                    await rate_limiter.wait()
+                upload_path = result['path']
+                try:
+                    sample = await asyncio.to_thread(_read_sample, upload_path)
+                    if codec := choose_codec(sample, compression):
+                        upload_path = await asyncio.to_thread(
+                            _compress_to_temporary_file, result['path'], codec
+                        )
+                        result['key'] = encode_key(result['key'], codec)
+                        result['codec'] = codec
+                        total += os.path.getsize(upload_path) \
+                            - os.path.getsize(result['path'])
+                    response = await upload_file(
+                        client, organization_id, result['key'],
+                        upload_path, on_chunk
+                    )
+                    result['size'] = os.path.getsize(upload_path)
+                    result['success'] = response.get('success', True)
+                    result['errors'] = response.get('errors') or []
+                    if result['success'] and on_uploaded:
+                        on_uploaded(result['key'], result['size'])
+                except (httpx.HTTPError, OSError, ValueError) as e:
+                    result['errors'] = [f'{type(e).__name__}: {e}']
+                finally:
+                    if upload_path != result['path']:
+                        os.remove(upload_path)
+
+        await asyncio.gather(*[upload(result) for result in jobs])
+
+    for result in results:
+        result.setdefault('success', False)
+    return {
+        'results': results,
+        'bytesTransferred': sum(
+            result['size'] for result in results if result['success']
+        ),
+        'elapsed': round(time() - start, 3),
+        'success': all(result['success'] for result in results),
+        'errors': [
+            f"{result['key']}: {error}"
+            for result in results for error in result['errors']
+        ]
+    }
+
+
+async def list_files(
+        organization_id, path='/', max_concurrency=4, rate_limiter=None,
+        include_folders=False, skip_folder=None):
+    """Recursively list the files under a directory of the Object Store.
+
+    `/object/list` only returns one level of the tree, so this function
+    lists the sub-directories concurrently.
+
+    Args:
+        organization_id: Id of the organization that owns the Object
+            Store.
+        path: Directory to list.
+        max_concurrency: Maximum number of simultaneous requests.
+        rate_limiter: Optional `RateLimiter` to space out the requests.
+        include_folders: Include the folders in the result.
+        skip_folder: Optional function that receives the summary of a
+            folder and returns True if its contents shouldn't be listed.
+
+    Returns:
+        A dictionary that maps each key (without a leading slash) to its
+        `ObjectStoreSummary` dictionary. Throws an exception if a 
+        request fails.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    objects = {}
+
+    async def list_directory(directory):
+        async with semaphore:
+            if rate_limiter:
+                await rate_limiter.wait()
+            response = await post(
+                '/object/list', 
+                ListObjectStoreRequest(
+                    organizationId=organization_id, path=directory
+                )
+            )
+        if not response.get('success', True):
+            raise RuntimeError(
+                f"Failed to list '{directory}': {response.get('errors')}"
+            )
+        sub_directories = []
+        for obj in response.get('objects') or []:
+            key = normalize_key(obj['key'])
+            if obj.get('folder'):
+                if include_folders:
+                    objects[key] = obj | {'key': key}
+                if not (skip_folder and skip_folder(obj | {'key': key})):
+                    sub_directories.append(key)
+            else:
+                objects[key] = obj | {'key': key}
+        await asyncio.gather(*[list_directory(d) for d in sub_directories])
+
+    await list_directory(path)
+    return objects
+
+
+def _md5(path):
+    hash_ = md5()
+    with open(path, 'rb') as file:
+        while chunk := file.read(CHUNK_SIZE):
+            hash_.update(chunk)
+    return hash_.hexdigest()
+
+
+async def _is_missing(organization_id, key, rate_limiter):
+    # Return True if the Object Store doesn't have the key, by listing the
+    # nearest parent directory that exists. Return False if it has the
+    # key or if even the root can't be listed.
+    parts = key.split('/')
+    for depth in range(len(parts) - 1, -1, -1):
+        await rate_limiter.wait()
+        response = await post(
+            '/object/list',
+            ListObjectStoreRequest(
+                organizationId=organization_id,
+                path='/'.join(parts[:depth]) or '/'
+            )
+        )
+        if response.get('success', True):
+            child = '/'.join(parts[:depth + 1])
+            return all(
+                normalize_key(obj['key']) != child
+                for obj in response.get('objects') or []
+            )
+    return False
+
+
+async def sync_directory(
+        organization_id, path, prefix=None, delete_orphans=False, 
+        dry_run=False, max_concurrency=4, max_requests_per_second=10, 
+        on_progress=None, on_uploaded=None, on_deleted=None):
+    """Upload the new and changed files of a workspace directory to the
+    Object Store.
+
+    A file is unchanged if the Object Store has a file with the same 
+    size and MD5 hash under the same key. The hashes are only compared 
+    when the sizes match. `on_uploaded` and `on_deleted` are called with
+    the key (and size) of each file that the sync changes.
+
+    Returns:
+        A dictionary that respects the `ObjectStoreSyncResponse` model.
+    """
+    start = time()
+    prefix = normalize_key(prefix or '')
+    if delete_orphans and not prefix:
+        # Without a prefix, every file of the Object Store that isn't in
+        # the local directory would be deleted.
+        return {
+            'success': False,
+            'errors': ['Deleting the orphans requires a prefix.']
+        }
+    root = OrganizationWorkspace.resolve_path(path)
+    if root is None or not os.path.isdir(root):
+        return {
+            'success': False, 
+            'errors': [f'{path} is not a directory in the organization workspace.']
+        }
+    # Walk the local directory.
+    local_files = {}
+    for dir_path, _, file_names in os.walk(root):
+        for file_name in file_names:
+            file_path = os.path.join(dir_path, file_name)
+            relative_path = os.path.relpath(file_path, root).replace(os.sep, '/')
+            key = f'{prefix}/{relative_path}' if prefix else relative_path
+            local_files[key] = file_path
+    # List the remote files.
+    rate_limiter = RateLimiter(max_requests_per_second)
+    try:
+        try:
+            remote_files = await list_files(
+                organization_id, prefix or '/', max_concurrency, rate_limiter
+            )
+        except RuntimeError as e:
+            if not prefix or not await _is_missing(
+                    organization_id, prefix, rate_limiter):
+                return {'success': False, 'errors': [str(e)]}
+            # The prefix doesn't exist in the Object Store yet.
+            remote_files = {}
+    except httpx.HTTPError as e:
+        return {'success': False, 'errors': [f'{type(e).__name__}: {e}']}
+    # Find the changed files. Only compare the hashes of the files that
+    # have the same size.
+    changed = []
+    same_size = []
+    for key, file_path in local_files.items():
+        remote = remote_files.get(key)
+        if remote is None or remote.get('size') != os.path.getsize(file_path):
+            changed.append(key)
+        else:
+            same_size.append(key)
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def compare_hashes(key):
+        async with semaphore:
+            await rate_limiter.wait()
+            try:
+                response = await post(
+                    '/object/properties', 
+                    GetObjectStorePropertiesRequest(
+                        organizationId=organization_id, key=key
+                    )
+                )
+            except httpx.HTTPError:
+                # Without the remote hash, assume the file changed.
+                response = {}
+        remote_md5 = (response.get('metadata') or {}).get('md5')
+        local_md5 = await asyncio.to_thread(_md5, local_files[key])
+        if remote_md5 != local_md5:
+            changed.append(key)
+
+    await asyncio.gather(*[compare_hashes(key) for key in same_size])
+    changed.sort()
+    orphans = sorted(set(remote_files) - set(local_files)) \
+        if delete_orphans else []
+    result = {
+        'uploaded': changed,
+        'deleted': orphans,
+        'unchanged': len(local_files) - len(changed),
+        'bytesTransferred': 0,
+        'success': True,
+        'errors': []
+    }
+    if not dry_run:
+        # Upload the changed files.
+        upload = await upload_files(
+            organization_id, [(key, local_files[key]) for key in changed],
+            max_concurrency, on_progress, rate_limiter, on_uploaded
+        )
+        result['uploaded'] = [
+            r['key'] for r in upload['results'] if r['success']
+        ]
+        result['bytesTransferred'] = upload['bytesTransferred']
+        result['errors'] += upload['errors']
+
+        # Delete the orphans.
+        async def delete(key):
+            async with semaphore:
+                await rate_limiter.wait()
+                try:
+                    response = await post(
+                        '/object/delete', 
+                        DeleteObjectStoreRequest(
+                            organizationId=organization_id, key=key
+                        )
+                    )
+                except httpx.HTTPError as e:
+                    response = {
+                        'success': False, 'errors': [f'{type(e).__name__}: {e}']
+                    }
+            if response.get('success', True):
+                if on_deleted:
+                    on_deleted(key)
+            else:
+                result['deleted'].remove(key)
+                result['errors'] += [
+                    f'{key}: {error}' for error in response.get('errors') or []
+                ]
+
+        await asyncio.gather(*[delete(key) for key in orphans])
+        result['success'] = not result['errors']
+    result['elapsed'] = round(time() - start, 3)
+    return result
+
+
+async def _wait_for_download_url(organization_id, job_id, timeout):
+    # Poll the download job with exponential backoff until the URL is
+    # ready.
+    deadline = monotonic() + timeout
+    delay = 1
+    while True:
+        response = await post(
+            '/object/get', 
+            GetObjectStoreURLRequest(organizationId=organization_id, jobId=job_id)
+        )
+        if response.get('url'):
+            return response['url']
+        if not response.get('success', True):
+            raise RuntimeError(
+                f"Download job {job_id} failed: {response.get('errors')}"
+            )
+        if monotonic() + delay > deadline:
+            raise TimeoutError(
+                f"Download job {job_id} wasn't ready after {timeout} seconds."
+            )
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, 10)
+
+
+async def _stream_to_file(client, url, file, on_chunk):
+    async with client.stream('GET', url, timeout=30.0) as response:
+        response.raise_for_status()
+        async for chunk in response.aiter_bytes(CHUNK_SIZE):
+            await asyncio.to_thread(file.write, chunk)
+            if on_chunk:
+                await on_chunk(len(chunk))
+
+
+def _has_signature(archive, info, codec):
+    magic = MAGIC_BY_CODEC[codec]
+    with archive.open(info) as member:
+        return member.read(len(magic)) == magic
+
+
+async def _stored_sizes(organization_id, keys):
+    # Return the size of each file under the keys in the Object Store, by
+    # listing the parent directories of the keys and the folders that
+    # are keys themselves.
+    def skip_folder(folder):
+        return not any(
+            folder['key'] == key or folder['key'].startswith(key + '/')
+            for key in keys
+        )
+
+    listings = await asyncio.gather(*[
+        list_files(organization_id, parent, skip_folder=skip_folder)
+        for parent in {key.rpartition('/')[0] or '/' for key in keys}
+    ])
+    return {
+        key: int(obj['size'])
+        for listing in listings for key, obj in listing.items()
+        if obj.get('size') is not None
+    }
+
+
+def _extract_archive(archive_file, root, decompress, stored_sizes):
+    # Extract the archive member by member, so only one chunk is held
+    # in memory at a time, and verify the size of each file against the
+    # size of the object in the Object Store.
+    results = []
+    with ZipFile(archive_file) as archive:
+        for info in archive.infolist():
+            if info.is_dir():
+                continue
+            key = normalize_key(info.filename)
+            file_key, codec = decode_key(key) if decompress else (key, None)
+            if codec and not _has_signature(archive, info, codec):
+                # The suffix is part of the original key (ex: a gzip
+                # file that an algorithm created), not a tag.
+                file_key, codec = key, None
+            destination = os.path.realpath(os.path.join(root, file_key))
+            result = {
+                'key': key, 'path': destination, 'size': 0, 'codec': codec, 
+                'errors': []
+            }
+            results.append(result)
+            if os.path.commonpath([root, destination]) != root:
+                result['errors'].append('The key is outside the destination.')
+                continue
+            try:
+                os.makedirs(os.path.dirname(destination), exist_ok=True)
+                # Reading the whole member validates its CRC.
+                with archive.open(info) as source, \
+                        open(destination, 'wb') as target:
+                    if codec:
+                        decompress_file(source, target, codec, CHUNK_SIZE)
+                    else:
+                        shutil.copyfileobj(source, target, CHUNK_SIZE)
+                result['size'] = os.path.getsize(destination)
+            except (BadZipFile, OSError, ValueError) as e:
+                result['errors'].append(f'{type(e).__name__}: {e}')
+                continue
+            # A decompressed file is larger than its object, so compare
+            # the compressed member instead. Reading the whole member
+            # verified that it has `info.file_size` bytes.
+            size = info.file_size if codec else result['size']
+            stored_size = stored_sizes.get(key)
+            if stored_size is not None and size != stored_size:
+                result['errors'].append(
+                    f'The Object Store has {stored_size} bytes but the '
+                    f'download has {size}.'
+                )
+    for result in results:
+        result['success'] = not result['errors']
+    return results
+
+
+async def download_files(
+        organization_id, keys, path, batch_size=100, max_concurrency=4,
+        timeout=300, on_progress=None, decompress=False):
+    """Download files from the Object Store to the organization 
+    workspace.
+
+    The keys are split into batches. For each batch, this function 
+    creates a download job, polls it until the archive is ready, streams
+    the archive to a temporary file, and then extracts it under `path`.
+    The batches run concurrently. The size of each file is verified
+    against the listing of the Object Store. If `decompress` is True, the
+    files that `upload_files` compressed are saved decompressed, without the
+    codec suffix. A file is only decompressed if its key has the suffix
+    of a codec and its content starts with the signature of that codec,
+    but a gzip or zstd file that an algorithm stored under such a key is
+    decompressed too, so it's off by default.
+
+    Returns:
+        A dictionary that respects the `ObjectStoreTransferResponse`
+        model.
+    """
+    start = time()
+    root = OrganizationWorkspace.resolve_path(path)
+    if root is None:
+        return {
+            'success': False, 
+            'errors': [f'{path} is not in the organization workspace.']
+        }
+    keys = [normalize_key(key) for key in keys]
+    batches = [
+        keys[i:i + batch_size] for i in range(0, len(keys), batch_size)
+    ]
+    semaphore = asyncio.Semaphore(max_concurrency)
+    results = []
+    errors = []
+    received = 0
+
+    async def on_chunk(size):
+        nonlocal received
+        received += size
+        if on_progress:
+            await on_progress(received, None)
+
+    async with httpx.AsyncClient() as client:
+
+        async def download(batch):
+            async with semaphore:
+                try:
+                    response = await post(
+                        '/object/get', 
+                        GetObjectStoreJobIdRequest(
+                            organizationId=organization_id, keys=batch
+                        )
+                    )
+                    if not response.get('jobId'):
+                        raise RuntimeError(
+                            f"Failed to create a download job: {response.get('errors')}"
+                        )
+                    # List the sizes while the archive is prepared.
+                    url, stored_sizes = await asyncio.gather(
+                        _wait_for_download_url(
+                            organization_id, response['jobId'], timeout
+                        ),
+                        _stored_sizes(organization_id, batch)
+                    )
+                    with tempfile.TemporaryFile() as archive:
+                        await _stream_to_file(client, url, archive, on_chunk)
+                        os.makedirs(root, exist_ok=True)
+                        batch_results = await asyncio.to_thread(
+                            _extract_archive, archive, root, decompress,
+                            stored_sizes
+                        )
+                except (httpx.HTTPError, BadZipFile, OSError, 
+                        RuntimeError, TimeoutError) as e:
+                    batch_results = [
+                        {
+                            'key': key, 'size': 0, 'success': False,
+                            'errors': [f'{type(e).__name__}: {e}']
+                        }
+                        for key in batch
+                    ]
+            # Report the keys that aren't in the archive. A key can
+            # also be a directory that contains several files.
+            for key in batch:
+                if not any(
+                        r['key'] == key or r['key'].startswith(key + '/')
+                        for r in batch_results):
+                    batch_results.append({
+                        'key': key, 'size': 0, 'success': False,
+                        'errors': ["The key isn't in the Object Store."]
+                    })
+            results.extend(batch_results)
+
+        await asyncio.gather(*[download(batch) for batch in batches])
+
+    for result in results:
+        errors += [f"{result['key']}: {error}" for error in result['errors']]
+    return {
+        'results': results,
+        'bytesTransferred': sum(r['size'] for r in results if r['success']),
+        'elapsed': round(time() - start, 3),
+        'success': not errors,
+        'errors': errors
+    }
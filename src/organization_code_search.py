@@ -0,0 +1,212 @@
+import asyncio
+import math
+import re
+
+from api_connection import post, httpx
+from code_source_id import add_code_source_id
+from code_search import (
+    TrigramIndex, compile_query, required_literals, find_matches
+)
+from models import ReadFilesRequest
+from workspace_files import (
+    file_versions, project_directory, read_workspace_files
+)
+
+
+def _tokens(query):
+    return list(dict.fromkeys(query.split()))
+
+
+class OrganizationCodeSearch:
+    """Search the files of all the projects in the organization.
+
+    The files of every project are kept in one `TrigramIndex`, keyed by
+    (project Id, file name). Each search lists the projects and only
+    fetches the files of the projects that were modified since they were
+    indexed (concurrently, and from the disk for the projects in the
+    organization workspace), so the first search is the only slow one.
+    The projects in the workspace are also read again when the
+    modification time or the size of one of their files changed.
+
+    The search doesn't fill the `FileContentCache`, so an organization-wide
+    search doesn't evict the files that the edits rely on.
+    """
+
+    MAX_CONCURRENCY = 8
+
+    _index = TrigramIndex()
+    # project Id -> modified date of the project when it was indexed
+    _modified_by_project = {}
+    # project Id -> `file_versions` of the project directory when it was
+    # indexed, for the projects in the organization workspace
+    _versions_by_project = {}
+    _name_by_project = {}
+
+    @classmethod
+    async def refresh(cls):
+        """Index the projects that changed since the last refresh.
+
+        Returns:
+            A list of errors for the projects that couldn't be read.
+        """
+        response = await post('/projects/read')
+        if not response.get('success'):
+            return response.get('errors') or ['Failed to list the projects.']
+        projects = response.get('projects') or []
+        cls._name_by_project = {p['projectId']: p['name'] for p in projects}
+        # Forget the deleted projects.
+        for project_id in list(cls._modified_by_project):
+            if project_id not in cls._name_by_project:
+                cls._remove_project(project_id)
+        # The files on the disk can change without changing the project
+        # in QuantConnect Cloud, so compare their modification times too.
+        directory_by_project = {
+            p['projectId']: project_directory(p['projectId'])
+            for p in projects
+        }
+        versions_by_project = await asyncio.to_thread(
+            lambda: {
+                project_id: file_versions(directory)
+                for project_id, directory in directory_by_project.items()
+                if directory is not None
+            }
+        )
+        changed = [
+            p for p in projects
+            if cls._modified_by_project.get(p['projectId']) != p['modified']
+            or versions_by_project.get(p['projectId'])
+            != cls._versions_by_project.get(p['projectId'])
+        ]
+        semaphore = asyncio.Semaphore(cls.MAX_CONCURRENCY)
+        errors = []
+
+        async def index(project):
+            async with semaphore:
+                try:
+                    error = await cls._index_project(project)
+                except httpx.HTTPError as e:
+                    error = f'{type(e).__name__}: {e}'
+            if error:
+                errors.append(f"{project['projectId']}: {error}")
+            else:
+                project_id = project['projectId']
+                cls._modified_by_project[project_id] = project['modified']
+                cls._versions_by_project[project_id] = \
+                    versions_by_project.get(project_id)
+
+        await asyncio.gather(*[index(project) for project in changed])
+        return errors
+
+    @classmethod
+    async def _index_project(cls, project):
+        # Replace the files of a project in the index. Return an error
+        # message if the files can't be read.
+        project_id = project['projectId']
+        response = await read_workspace_files(project_id)
+        if not response:
+            response = await post(
+                '/files/read',
+                add_code_source_id(ReadFilesRequest(projectId=project_id))
+            )
+            if not response.get('success'):
+                return ', '.join(response.get('errors') or []) or \
+                    'Failed to read the files.'
+        files = [
+            file for file in response.get('files') or []
+            if file.get('content') is not None and not file.get('isLibrary')
+        ]
+        names = {file['name'] for file in files}
+        for key in cls._index.keys():
+            if key[0] == project_id and key[1] not in names:
+                cls._index.remove(key)
+        for file in files:
+            cls._index.add((project_id, file['name']), file['content'])
+
+    @classmethod
+    def _remove_project(cls, project_id):
+        cls._modified_by_project.pop(project_id, None)
+        cls._versions_by_project.pop(project_id, None)
+        for key in cls._index.keys():
+            if key[0] == project_id:
+                cls._index.remove(key)
+
+    @classmethod
+    async def search(
+            cls, query, regex=False, case_sensitive=False, context_lines=2,
+            limit=50):
+        """Search the files of all the projects.
+
+        A regular expression query matches the lines that match the
+        expression and ranks the files by the number of matching lines.
+        Otherwise, the query is a list of tokens: the files must contain
+        all the tokens, the lines that contain any token match, and the
+        files are ranked by the frequency of the tokens, weighted by how
+        rare they are in the organization (TF-IDF).
+
+        Returns:
+            A dictionary that respects the `CodeSearchResponse` model.
+            Throws a ValueError if the query is invalid.
+        """
+        if regex:
+            pattern = compile_query(query, True, case_sensitive)
+            literals = required_literals(query, True)
+            token_patterns = []
+        else:
+            tokens = _tokens(query)
+            if not tokens:
+                raise ValueError('The query has no tokens.')
+            token_patterns = [
+                compile_query(token, False, case_sensitive) for token in tokens
+            ]
+            pattern = compile_query(
+                '|'.join(re.escape(token) for token in tokens), True,
+                case_sensitive
+            )
+            literals = tokens
+        errors = await cls.refresh()
+        total_files = max(len(cls._index), 1)
+        # The number of files that may contain each token.
+        document_frequencies = [
+            len(cls._index.candidates([token])) for token in literals
+        ] if not regex else []
+        results = []
+        for key in cls._index.candidates(literals):
+            content = cls._index.content(key)
+            if regex:
+                matches = find_matches(content, pattern, context_lines)
+                score = len(matches)
+            else:
+                counts = [len(p.findall(content)) for p in token_patterns]
+                if not all(counts):
+                    continue
+                matches = find_matches(content, pattern, context_lines)
+                score = sum(
+                    (1 + math.log(count))
+                    * math.log(1 + total_files / max(frequency, 1))
+                    for count, frequency in zip(counts, document_frequencies)
+                )
+            if matches:
+                results.append((round(score, 3), key, matches))
+        results.sort(
+            key=lambda r: (-r[0], cls._name_by_project.get(r[1][0], ''), r[1])
+        )
+        matches = [
+            {
+                'projectId': project_id,
+                'projectName': cls._name_by_project.get(project_id),
+                'name': name,
+                'score': score
+            } | match
+            for score, (project_id, name), file_matches in results
+            for match in file_matches
+        ]
+        response = {
+            'matches': matches[:limit],
+            'total': len(matches),
+            'filesSearched': len(cls._index),
+            'projectsSearched': len(cls._modified_by_project),
+            'success': True
+        }
+        if errors:
+            response['errors'] = errors
+        return response
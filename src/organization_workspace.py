@@ -1,5 +1,9 @@
 import os
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from local_cache import load_json, save_json
 
 
 class OrganizationWorkspace:
@@ -7,35 +11,201 @@ class OrganizationWorkspace:
     # Load mount destination and source from environment variables.
     MOUNT_SOURCE = os.getenv('MOUNT_SOURCE_PATH')
     MOUNT_DESTINATION = os.getenv('MOUNT_DST_PATH')
-    
+
+    # Directories that never contain projects, so the scan doesn't walk
+    # them. Hidden directories (ex: '.QuantConnect', '.git') are always
+    # skipped. Extend the list with a comma-separated MOUNT_SKIP_DIRS
+    # environment variable.
+    SKIPPED_DIRECTORIES = {
+        'data', 'storage', 'node_modules', '__pycache__', 'venv'
+    } | {
+        name.strip() for name in os.getenv('MOUNT_SKIP_DIRS', '').split(',')
+        if name.strip()
+    }
+    MAX_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+    INDEX_FILE_NAME = 'organization_workspace_index.json'
+
     available = False  # Indicate if local disk access is available
     project_id_by_path = {}
+    path_by_project_id = {}
+    _directories = {}  # Index entry of each directory that was scanned
+    _lock = threading.Lock()
 
     @classmethod
-    def load(cls):
+    def load(cls, full=False):
+        """Find the projects in the mount and save their Id and path.
+
+        The directories are scanned in parallel, and the result of the
+        scan is persisted in the cache directory with the modification
+        time of each directory, so a restart only lists the directories
+        that changed and only parses the `config.json` files that
+        changed. Set `full` to True to ignore the persisted index.
+        """
         if not (cls.MOUNT_SOURCE and cls.MOUNT_DESTINATION):
             return
         if not os.path.exists(cls.MOUNT_DESTINATION):
             return
-        for name in os.listdir(cls.MOUNT_DESTINATION):
-            if name in ['.QuantConnect', 'data', 'lean.json']:
-                continue
-            cls._process_directory(os.path.join(cls.MOUNT_DESTINATION, name))
+        with cls._lock:
+            cached = {} if full else cls._load_index()
+            cls._set_directories(cls._scan(cached, cls.MOUNT_DESTINATION))
         cls.available = True
 
     @classmethod
-    def _process_directory(cls, path):
-        # If the current directory contains a config.json file, then 
-        # it's a project, so save it's Id and path.
-        config_path = os.path.join(path, 'config.json')
-        if os.path.isfile(config_path):
-            with open(config_path, 'r') as f:
-                config_data = json.load(f)
-                if 'cloud-id' in config_data:
-                    cls.project_id_by_path[path] = config_data['cloud-id']
+    def refresh(cls, path):
+        """Rescan the indexed directory that contains `path`.
+
+        Only the directories that changed since the last scan are listed
+        again, so this is cheap enough to call on every change that the
+        `WorkspaceWatcher` reports.
+        """
+        if not cls.available:
+            return
+        with cls._lock:
+            root = cls._indexed_ancestor(path)
+            if root is None:
+                return
+            scanned = cls._scan(cls._directories, root)
+            directories = {
+                p: entry for p, entry in cls._directories.items()
+                if not cls._is_under(p, root)
+            }
+            directories.update(scanned)
+            if directories != cls._directories:
+                cls._set_directories(directories)
+
+    @classmethod
+    def resolve_path(cls, path):
+        # Resolve a (relative or absolute) path inside the mount. Return
+        # None if nothing is mounted or if the path escapes the mount.
+        if not cls.MOUNT_DESTINATION:
+            return None
+        root = os.path.realpath(cls.MOUNT_DESTINATION)
+        resolved = os.path.realpath(os.path.join(root, path))
+        if os.path.commonpath([root, resolved]) != root:
+            return None
+        return resolved
+
+    @classmethod
+    def _set_directories(cls, directories):
+        # Replace the indexes instead of mutating them, so readers on
+        # other threads never see a partial update.
+        cls._directories = directories
+        cls.project_id_by_path = {
+            path: entry['cloudId'] for path, entry in directories.items()
+            if entry.get('cloudId') is not None
+        }
+        cls.path_by_project_id = {
+            project_id: path
+            for path, project_id in cls.project_id_by_path.items()
+        }
+        save_json(
+            cls.INDEX_FILE_NAME,
+            {'root': cls.MOUNT_DESTINATION, 'directories': directories}
+        )
+
+    @staticmethod
+    def _is_under(path, root):
+        return path == root or path.startswith(root.rstrip(os.sep) + os.sep)
+
+    @classmethod
+    def _indexed_ancestor(cls, path):
+        # Return the closest directory of the index that contains `path`.
+        root = os.path.normpath(cls.MOUNT_DESTINATION)
+        path = os.path.normpath(path)
+        while cls._is_under(path, root):
+            if path == root:
+                return cls.MOUNT_DESTINATION
+            if path in cls._directories:
+                return path
+            path = os.path.dirname(path)
+        return None
+
+    @classmethod
+    def _load_index(cls):
+        index = load_json(cls.INDEX_FILE_NAME, {})
+        # An index of another mount is useless.
+        if index.get('root') != cls.MOUNT_DESTINATION:
+            return {}
+        return index.get('directories', {})
+
+    @classmethod
+    def _is_skipped(cls, name):
+        return name.startswith('.') or name in cls.SKIPPED_DIRECTORIES
+
+    @classmethod
+    def _scan(cls, cached, root):
+        # Walk the directory tree breadth-first with a pool of threads,
+        # since the walk is bound by the latency of the disk (or of the
+        # file sharing layer of Docker).
+        directories = {}
+        with ThreadPoolExecutor(cls.MAX_WORKERS) as executor:
+            pending = {
+                executor.submit(
+                    cls._process_directory, root, cached.get(root, {})
+                )
+            }
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path, entry = future.result()
+                    if entry is None:
+                        continue
+                    directories[path] = entry
+                    for name in entry['directories']:
+                        sub_path = os.path.join(path, name)
+                        pending.add(executor.submit(
+                            cls._process_directory, sub_path,
+                            cached.get(sub_path, {})
+                        ))
+        return directories
+
+    @classmethod
+    def _process_directory(cls, path, cached):
+        # Return the index entry of a directory. The entry is reused if
+        # the directory and its `config.json` file didn't change.
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return path, None
+        if cached.get('mtime') == mtime:
+            if cached.get('configMtime') is None:
+                return path, cached
+            config_mtime = cls._mtime(os.path.join(path, 'config.json'))
+            if cached['configMtime'] == config_mtime:
+                return path, cached
+        entry = {'mtime': mtime, 'directories': []}
+        try:
+            entries = list(os.scandir(path))
+        except OSError:
+            return path, entry
+        # If the current directory contains a config.json file, then
+        # it's a project, so save it's Id.
+        config = next(
+            (e for e in entries if e.name == 'config.json' and e.is_file()),
+            None
+        )
+        if config:
+            entry['configMtime'] = config.stat().st_mtime_ns
+            entry['cloudId'] = cls._read_cloud_id(config.path)
         # Otherwise, it's a directory of projects, so recurse.
         else:
-            for dir_name in os.listdir(path):
-                sub_path = os.path.join(path, dir_name)
-                if os.path.isdir(sub_path):
-                    cls._process_directory(sub_path)
+            entry['directories'] = sorted(
+                e.name for e in entries
+                if not cls._is_skipped(e.name) and e.is_dir()
+            )
+        return path, entry
+
+    @staticmethod
+    def _mtime(path):
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    @staticmethod
+    def _read_cloud_id(config_path):
+        try:
+            with open(config_path, 'r') as f:
+                return json.load(f).get('cloud-id')
+        except (OSError, ValueError, AttributeError):
+            return None
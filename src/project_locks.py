@@ -0,0 +1,86 @@
+import asyncio
+import threading
+from collections import deque
+from contextlib import asynccontextmanager
+
+
+class ProjectLocks:
+    """Serialize the calls that modify a project.
+
+    Concurrent writes to the same project race each other in QuantConnect
+    Cloud (ex: a compile can start before the file update it depends on
+    finishes). The tools that modify a project run inside
+    `ProjectLocks.write(project_id)`, which runs the calls of each
+    project one at a time, in the order they arrive. The calls that only
+    read a project and the calls for other projects don't wait.
+
+    Each project has a single lock, shared by all the threads and event
+    loops of the server, so the background writers (ex: the
+    `WorkspaceSync`) wait for the tool calls and the other way around.
+    """
+
+    _guard = threading.Lock()
+    # project Id -> {'held', 'waiters': deque of (loop, future), 'calls'}
+    _entry_by_project = {}
+
+    @classmethod
+    @asynccontextmanager
+    async def write(cls, project_id):
+        with cls._guard:
+            entry = cls._entry_by_project.setdefault(
+                project_id, {'held': False, 'waiters': deque(), 'calls': 0}
+            )
+            entry['calls'] += 1
+        try:
+            await cls._acquire(entry)
+            try:
+                yield
+            finally:
+                cls._release(entry)
+        finally:
+            # Forget the lock once no call uses it.
+            with cls._guard:
+                entry['calls'] -= 1
+                if not entry['calls']:
+                    del cls._entry_by_project[project_id]
+
+    @classmethod
+    async def _acquire(cls, entry):
+        loop = asyncio.get_running_loop()
+        with cls._guard:
+            if not entry['held']:
+                entry['held'] = True
+                return
+            # asyncio futures are bound to a loop, so each waiter is woken
+            # up on its own loop.
+            waiter = (loop, loop.create_future())
+            entry['waiters'].append(waiter)
+        try:
+            await waiter[1]
+        except asyncio.CancelledError:
+            with cls._guard:
+                if waiter in entry['waiters']:
+                    entry['waiters'].remove(waiter)
+                    raise
+            # The lock was handed to this call. If the future was
+            # cancelled first, `_wake` passes the lock on instead.
+            if not waiter[1].cancelled():
+                cls._release(entry)
+            raise
+
+    @classmethod
+    def _release(cls, entry):
+        with cls._guard:
+            if not entry['waiters']:
+                entry['held'] = False
+                return
+            # Hand the lock to the next call, so it stays held.
+            loop, future = entry['waiters'].popleft()
+        loop.call_soon_threadsafe(cls._wake, entry, future)
+
+    @classmethod
+    def _wake(cls, entry, future):
+        if future.cancelled():
+            cls._release(entry)
+        else:
+            future.set_result(None)
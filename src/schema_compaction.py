@@ -0,0 +1,128 @@
+import json
+import os
+import re
+
+# Select how the server lists the schemas of its tools:
+#   MCP_COMPACT_SCHEMAS: 'true' to merge the identical definitions of a
+#       schema, drop the titles, and keep the first sentence of the
+#       descriptions.
+#   MCP_OUTPUT_SCHEMAS: 'false' to drop the output schemas, for the
+#       clients that don't use them. The tools still return structured
+#       content.
+COMPACT_SCHEMAS = os.getenv('MCP_COMPACT_SCHEMAS', 'false').lower() == 'true'
+OUTPUT_SCHEMAS = os.getenv('MCP_OUTPUT_SCHEMAS', 'true').lower() == 'true'
+
+# The keywords whose values are schemas, maps of schemas, or lists of
+# schemas.
+_SCHEMA_KEYWORDS = {
+    'items', 'additionalProperties', 'not', 'if', 'then', 'else',
+    'contains', 'propertyNames'
+}
+_SCHEMA_MAP_KEYWORDS = {'properties', '$defs', 'definitions', 'patternProperties'}
+_SCHEMA_LIST_KEYWORDS = {'anyOf', 'allOf', 'oneOf', 'prefixItems'}
+
+# The end of the first sentence: a period followed by whitespace (so
+# "e.g." and version numbers like "2.0" don't count).
+_SENTENCE_END = re.compile(r'(?<![A-Za-z]\.[A-Za-z])\.\s')
+
+
+def first_sentence(text):
+    """Return the first sentence of a description."""
+    match = _SENTENCE_END.search(text)
+    return ' '.join((text[:match.start() + 1] if match else text).split())
+
+
+def _map_schemas(schema, function):
+    # Apply `function` to a schema and, recursively, to its subschemas.
+    if not isinstance(schema, dict):
+        return schema
+    result = {}
+    for key, value in schema.items():
+        if key in _SCHEMA_KEYWORDS:
+            value = _map_schemas(value, function)
+        elif key in _SCHEMA_MAP_KEYWORDS and isinstance(value, dict):
+            value = {
+                name: _map_schemas(subschema, function)
+                for name, subschema in value.items()
+            }
+        elif key in _SCHEMA_LIST_KEYWORDS and isinstance(value, list):
+            value = [_map_schemas(subschema, function) for subschema in value]
+        result[key] = value
+    return function(result)
+
+
+def _shorten(schema):
+    schema = {key: value for key, value in schema.items() if key != 'title'}
+    if isinstance(schema.get('description'), str):
+        schema['description'] = first_sentence(schema['description'])
+    return schema
+
+
+def _replace_references(schema, new_name_by_name):
+    def replace(node):
+        reference = node.get('$ref', '')
+        name = reference.removeprefix('#/$defs/')
+        if name != reference and name in new_name_by_name:
+            node = node | {'$ref': f'#/$defs/{new_name_by_name[name]}'}
+        return node
+    return _map_schemas(schema, replace)
+
+
+def _merge_definitions(schema):
+    # Merge the definitions that are identical (ex: the `Id` enums of the
+    # brokerages) until no definitions are identical anymore, since
+    # merging some definitions can make others identical.
+    while True:
+        definitions = schema.get('$defs') or {}
+        name_by_content = {}
+        new_name_by_name = {}
+        for name, definition in definitions.items():
+            content = json.dumps(definition, sort_keys=True)
+            if content in name_by_content:
+                new_name_by_name[name] = name_by_content[content]
+            else:
+                name_by_content[content] = name
+        if not new_name_by_name:
+            return schema
+        schema = _replace_references(schema, new_name_by_name)
+        schema['$defs'] = {
+            name: definition for name, definition in schema['$defs'].items()
+            if name not in new_name_by_name
+        }
+
+
+def compact_schema(schema):
+    """Return a smaller copy of a JSON schema that validates the same
+    documents."""
+    if not schema:
+        return schema
+    return _merge_definitions(_map_schemas(schema, _shorten))
+
+
+def _size(tool):
+    return len(json.dumps(
+        {'inputSchema': tool.parameters, 'outputSchema': tool.output_schema}
+    ))
+
+
+def compact_tools(mcp, compact=None, output_schemas=None):
+    """Compact the schemas that a FastMCP server lists for its tools.
+    Call this after registering the tools.
+
+    Returns:
+        A list with the name of each tool and the size of its schemas
+        (in bytes) before and after the compaction.
+    """
+    compact = COMPACT_SCHEMAS if compact is None else compact
+    output_schemas = OUTPUT_SCHEMAS if output_schemas is None \
+        else output_schemas
+    report = []
+    for tool in mcp._tool_manager.list_tools():
+        before = _size(tool)
+        output_schema = tool.output_schema if output_schemas else None
+        if compact:
+            tool.parameters = compact_schema(tool.parameters)
+            output_schema = compact_schema(output_schema)
+        tool.output_schema = output_schema
+        report.append({'name': tool.name, 'before': before, 'after': _size(tool)})
+    return report
@@ -0,0 +1,625 @@
+"""Models for the tools that this server implements on top of the
+QuantConnect API.
+
+`models.py` is generated from the API specification (see
+`.github/workflows/update_models.yml`), so the models of the tools that
+don't map 1:1 to an API endpoint live here instead.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from enum import Enum
+from typing import Annotated, List, Optional
+
+from pydantic import BaseModel, Field
+
+from models import ObjectStoreBinaryFile, ObjectStoreSummary, ReadFilesRequest
+
+
+class Compression(Enum):
+    none = 'none'
+    auto = 'auto'
+    gzip = 'gzip'
+    zstd = 'zstd'
+
+
+COMPRESSION_DESCRIPTION = (
+    "Compress the files before storing them. Compressed files are stored "
+    "under their key plus the '.gz' or '.zst' suffix. 'auto' only "
+    "compresses the files that are compressible and picks zstd when it's "
+    "installed."
+)
+
+
+class UploadObjectStoreFileRequest(ObjectStoreBinaryFile):
+    compression: Annotated[
+        Compression, Field(description=COMPRESSION_DESCRIPTION)
+    ] = Compression.none
+
+
+class ObjectStoreLocalFile(BaseModel):
+    key: Annotated[
+        str,
+        Field(
+            description='Key to store the file under in the Object Store.',
+            examples=['models/model.pkl'],
+        ),
+    ]
+    path: Annotated[
+        str,
+        Field(
+            description='Path of the file in the organization workspace. Relative paths are resolved against the workspace mount.',
+            examples=['data/model.pkl'],
+        ),
+    ]
+
+
+class UploadObjectStoreFilesRequest(BaseModel):
+    organizationId: Annotated[
+        str,
+        Field(
+            description='Id of the organization that owns the Object Store.',
+            examples=['5cad178b20a1d52567b534553413b691'],
+        ),
+    ]
+    files: Annotated[
+        List[ObjectStoreLocalFile],
+        Field(description='Local files to upload.', min_length=1),
+    ]
+    compression: Annotated[
+        Compression, Field(description=COMPRESSION_DESCRIPTION)
+    ] = Compression.none
+    maxConcurrency: Annotated[
+        int,
+        Field(
+            description='Maximum number of files to upload at the same time.',
+            ge=1,
+            le=16,
+        ),
+    ] = 4
+
+
+class ObjectStoreTransferResult(BaseModel):
+    key: Annotated[Optional[str], Field(description='Object Store key.')] = None
+    path: Annotated[
+        Optional[str], Field(description='Path of the file on the local disk.')
+    ] = None
+    size: Annotated[
+        Optional[int], Field(description='Number of bytes transferred.')
+    ] = None
+    codec: Annotated[
+        Optional[str],
+        Field(description='Compression codec of the object in the Object Store.'),
+    ] = None
+    success: Annotated[
+        Optional[bool], Field(description='Indicate if the transfer was successful.')
+    ] = None
+    errors: Annotated[
+        Optional[List[str]], Field(description='List of errors with the transfer.')
+    ] = None
+
+
+class ObjectStoreTransferResponse(BaseModel):
+    results: Annotated[
+        Optional[List[ObjectStoreTransferResult]],
+        Field(description='Result of each file transfer.'),
+    ] = None
+    bytesTransferred: Annotated[
+        Optional[int], Field(description='Total number of bytes transferred.')
+    ] = None
+    elapsed: Annotated[
+        Optional[float], Field(description='Duration of the transfers in seconds.')
+    ] = None
+    success: Annotated[
+        Optional[bool], Field(description='Indicate if all the transfers were successful.')
+    ] = None
+    errors: Annotated[
+        Optional[List[str]], Field(description='List of errors with the transfers.')
+    ] = None
+
+
+class SyncObjectStoreDirectoryRequest(BaseModel):
+    organizationId: Annotated[
+        str,
+        Field(
+            description='Id of the organization that owns the Object Store.',
+            examples=['5cad178b20a1d52567b534553413b691'],
+        ),
+    ]
+    path: Annotated[
+        str,
+        Field(
+            description='Path of the directory in the organization workspace. Relative paths are resolved against the workspace mount.',
+            examples=['models'],
+        ),
+    ]
+    prefix: Annotated[
+        Optional[str],
+        Field(
+            description='Object Store directory to sync the local directory with. The local directory is synced with the root of the Object Store if you omit this property.',
+            examples=['models/momentum'],
+        ),
+    ] = None
+    deleteOrphans: Annotated[
+        Optional[bool],
+        Field(
+            description="Delete the Object Store files under the prefix that don't exist in the local directory. It requires a prefix."
+        ),
+    ] = False
+    dryRun: Annotated[
+        Optional[bool],
+        Field(description='Report the changes without applying them.'),
+    ] = False
+    maxConcurrency: Annotated[
+        int,
+        Field(
+            description='Maximum number of API requests to run at the same time.',
+            ge=1,
+            le=16,
+        ),
+    ] = 4
+    maxRequestsPerSecond: Annotated[
+        Optional[float],
+        Field(description='Maximum number of API requests to send per second.', gt=0),
+    ] = 10
+
+
+class ObjectStoreSyncResponse(BaseModel):
+    uploaded: Annotated[
+        Optional[List[str]],
+        Field(description='Keys of the new or changed files that were uploaded.'),
+    ] = None
+    deleted: Annotated[
+        Optional[List[str]],
+        Field(description='Keys of the orphaned files that were deleted.'),
+    ] = None
+    unchanged: Annotated[
+        Optional[int], Field(description="Number of files that didn't change.")
+    ] = None
+    bytesTransferred: Annotated[
+        Optional[int], Field(description='Total number of bytes uploaded.')
+    ] = None
+    elapsed: Annotated[
+        Optional[float], Field(description='Duration of the sync in seconds.')
+    ] = None
+    success: Annotated[
+        Optional[bool], Field(description='Indicate if the sync was successful.')
+    ] = None
+    errors: Annotated[
+        Optional[List[str]], Field(description='List of errors with the sync.')
+    ] = None
+
+
+class DownloadObjectStoreFilesRequest(BaseModel):
+    organizationId: Annotated[
+        str,
+        Field(
+            description='Id of the organization that owns the Object Store.',
+            examples=['5cad178b20a1d52567b534553413b691'],
+        ),
+    ]
+    keys: Annotated[
+        List[str],
+        Field(
+            description='Keys of the Object Store files to download.',
+            examples=[['key1', 'models/key2']],
+            min_length=1,
+        ),
+    ]
+    path: Annotated[
+        str,
+        Field(
+            description='Directory in the organization workspace to save the files in. Each file is saved under its key.',
+            examples=['object_store'],
+        ),
+    ]
+    batchSize: Annotated[
+        Optional[int],
+        Field(
+            description='Maximum number of keys in each download job.', ge=1, le=1000
+        ),
+    ] = 100
+    maxConcurrency: Annotated[
+        int,
+        Field(
+            description='Maximum number of download jobs to run at the same time.',
+            ge=1,
+            le=16,
+        ),
+    ] = 4
+    timeout: Annotated[
+        Optional[float],
+        Field(
+            description='Maximum time to wait for each download job to be ready, in seconds.',
+            gt=0,
+            le=1800,
+        ),
+    ] = 300
+    decompress: Annotated[
+        Optional[bool],
+        Field(
+            description="Decompress the files that were uploaded with compression (a '.gz' or '.zst' suffix and the matching file signature) and save them without the suffix. The other files are saved as is."
+        ),
+    ] = False
+
+
+class RefreshObjectStoreIndexRequest(BaseModel):
+    organizationId: Annotated[
+        str,
+        Field(
+            description='Id of the organization that owns the Object Store.',
+            examples=['5cad178b20a1d52567b534553413b691'],
+        ),
+    ]
+    path: Annotated[
+        Optional[str],
+        Field(
+            description='Directory of the Object Store to refresh. The whole Object Store is refreshed if you omit this property.',
+            examples=['/', 'folder1/models'],
+        ),
+    ] = None
+    full: Annotated[
+        Optional[bool],
+        Field(
+            description="Re-list every folder, even the ones whose size and modification time didn't change."
+        ),
+    ] = False
+
+
+class RefreshObjectStoreIndexResponse(BaseModel):
+    objects: Annotated[
+        Optional[int],
+        Field(description='Number of files and folders that were listed.'),
+    ] = None
+    skippedFolders: Annotated[
+        Optional[int],
+        Field(description="Number of unchanged folders that weren't listed again."),
+    ] = None
+    elapsed: Annotated[
+        Optional[float], Field(description='Duration of the refresh in seconds.')
+    ] = None
+    success: Annotated[
+        Optional[bool], Field(description='Indicate if the refresh was successful.')
+    ] = None
+    errors: Annotated[
+        Optional[List[str]], Field(description='List of errors with the refresh.')
+    ] = None
+
+
+class SearchObjectStoreIndexRequest(BaseModel):
+    organizationId: Annotated[
+        str,
+        Field(
+            description='Id of the organization that owns the Object Store.',
+            examples=['5cad178b20a1d52567b534553413b691'],
+        ),
+    ]
+    prefix: Annotated[
+        Optional[str],
+        Field(
+            description='Only return the files under this directory.',
+            examples=['folder1/models'],
+        ),
+    ] = None
+    pattern: Annotated[
+        Optional[str],
+        Field(
+            description='Glob pattern that the full key must match.',
+            examples=['models/*.pkl', '*.csv'],
+        ),
+    ] = None
+    minSize: Annotated[
+        Optional[int], Field(description='Minimum file size in bytes.', ge=0)
+    ] = None
+    maxSize: Annotated[
+        Optional[int], Field(description='Maximum file size in bytes.', ge=0)
+    ] = None
+    modifiedAfter: Annotated[
+        Optional[datetime],
+        Field(description='Only return the files modified after this time (UTC).'),
+    ] = None
+    modifiedBefore: Annotated[
+        Optional[datetime],
+        Field(description='Only return the files modified before this time (UTC).'),
+    ] = None
+    limit: Annotated[
+        Optional[int],
+        Field(description='Maximum number of files to return.', ge=1, le=1000),
+    ] = 100
+
+
+class ObjectStoreIndexResponse(BaseModel):
+    objects: Annotated[
+        Optional[List[ObjectStoreSummary]],
+        Field(description='Files that match the query, sorted by key.'),
+    ] = None
+    total: Annotated[
+        Optional[int],
+        Field(description='Number of files that match the query, including the ones beyond the limit.'),
+    ] = None
+    totalSize: Annotated[
+        Optional[int],
+        Field(description='Size of all the files that match the query in bytes.'),
+    ] = None
+    indexedAt: Annotated[
+        Optional[datetime],
+        Field(description='Last time the whole Object Store was listed.'),
+    ] = None
+    success: Annotated[
+        Optional[bool], Field(description='Indicate if the query was successful.')
+    ] = None
+    errors: Annotated[
+        Optional[List[str]], Field(description='List of errors with the query.')
+    ] = None
+
+
+class ReadObjectStoreUsageRequest(BaseModel):
+    organizationId: Annotated[
+        str,
+        Field(
+            description='Id of the organization that owns the Object Store.',
+            examples=['5cad178b20a1d52567b534553413b691'],
+        ),
+    ]
+    prefix: Annotated[
+        Optional[str],
+        Field(
+            description='Directory to break down. The whole Object Store is broken down if you omit this property.',
+            examples=['folder1'],
+        ),
+    ] = None
+    depth: Annotated[
+        Optional[int],
+        Field(
+            description='Number of directory levels below the prefix to group the files by.',
+            ge=1,
+            le=10,
+        ),
+    ] = 1
+    limit: Annotated[
+        Optional[int],
+        Field(description='Maximum number of groups to return.', ge=1, le=1000),
+    ] = 50
+
+
+class ObjectStoreUsage(BaseModel):
+    prefix: Annotated[
+        Optional[str], Field(description='Directory (or file) of the group.')
+    ] = None
+    size: Annotated[
+        Optional[int], Field(description='Size of the files in the group in bytes.')
+    ] = None
+    files: Annotated[
+        Optional[int], Field(description='Number of files in the group.')
+    ] = None
+
+
+class ObjectStoreUsageResponse(BaseModel):
+    usage: Annotated[
+        Optional[List[ObjectStoreUsage]],
+        Field(description='Storage used by each group, largest first.'),
+    ] = None
+    totalSize: Annotated[
+        Optional[int],
+        Field(description='Size of all the files under the prefix in bytes.'),
+    ] = None
+    indexedAt: Annotated[
+        Optional[datetime],
+        Field(description='Last time the whole Object Store was listed.'),
+    ] = None
+    success: Annotated[
+        Optional[bool], Field(description='Indicate if the request was successful.')
+    ] = None
+    errors: Annotated[
+        Optional[List[str]], Field(description='List of errors with the request.')
+    ] = None
+
+
+class WorkspaceSyncStatusResponse(BaseModel):
+    enabled: Annotated[
+        Optional[bool],
+        Field(description='Indicate if the workspace edits are pushed automatically.'),
+    ] = None
+    disabledReason: Annotated[
+        Optional[str],
+        Field(description="Reason the workspace edits aren't pushed automatically."),
+    ] = None
+    pendingChanges: Annotated[
+        Optional[int],
+        Field(description='Number of changed paths that are waiting for the debounce window to close.'),
+    ] = None
+    pushedFiles: Annotated[
+        Optional[int],
+        Field(description='Number of files pushed since the server started.'),
+    ] = None
+    patchedFiles: Annotated[
+        Optional[int],
+        Field(description='Number of the pushed files that were sent as a patch.'),
+    ] = None
+    failedFiles: Annotated[
+        Optional[int],
+        Field(description='Number of files that failed to push.'),
+    ] = None
+    lastPushAt: Annotated[
+        Optional[datetime], Field(description='Time of the last push (UTC).')
+    ] = None
+    lastLag: Annotated[
+        Optional[float],
+        Field(description='Seconds between the last edit and the push of the last file pushed.'),
+    ] = None
+    maxLag: Annotated[
+        Optional[float],
+        Field(description='Largest lag between an edit and its push, in seconds.'),
+    ] = None
+    success: Annotated[
+        Optional[bool], Field(description='Indicate if the request was successful.')
+    ] = None
+    errors: Annotated[
+        Optional[List[str]], Field(description='Most recent errors with the pushes.')
+    ] = None
+
+
+class FileWriteStatisticsResponse(BaseModel):
+    cachedFiles: Annotated[
+        Optional[int],
+        Field(description='Number of files whose content hash is cached.'),
+    ] = None
+    skippedWrites: Annotated[
+        Optional[int],
+        Field(description="Number of file updates that were skipped because they wouldn't change the file."),
+    ] = None
+    patchedWrites: Annotated[
+        Optional[int],
+        Field(description='Number of file updates that were sent as a patch.'),
+    ] = None
+    fullWrites: Annotated[
+        Optional[int],
+        Field(description='Number of file updates that sent the whole file.'),
+    ] = None
+    rejectedPatches: Annotated[
+        Optional[int],
+        Field(description='Number of patches that the API rejected, so the whole file was sent instead.'),
+    ] = None
+    bytesSent: Annotated[
+        Optional[int],
+        Field(description='Number of content bytes sent by the file updates.'),
+    ] = None
+    bytesSaved: Annotated[
+        Optional[int],
+        Field(description='Number of content bytes that the patches saved compared to sending the whole files.'),
+    ] = None
+    success: Annotated[
+        Optional[bool], Field(description='Indicate if the request was successful.')
+    ] = None
+    errors: Annotated[
+        Optional[List[str]], Field(description='List of errors with the request.')
+    ] = None
+
+
+class SearchProjectFilesRequest(BaseModel):
+    projectId: Annotated[
+        int,
+        Field(description='Id of the project to search.', examples=[23456789]),
+    ]
+    query: Annotated[
+        str,
+        Field(
+            description='Text (or regular expression) to search for.',
+            examples=['SimpleMovingAverage', r'self\.sma\w*'],
+            min_length=1,
+        ),
+    ]
+    regex: Annotated[
+        Optional[bool],
+        Field(description='Interpret the query as a regular expression.'),
+    ] = False
+    caseSensitive: Annotated[
+        Optional[bool], Field(description='Match the case of the query.')
+    ] = False
+    contextLines: Annotated[
+        Optional[int],
+        Field(
+            description='Number of lines to return before and after each matching line.',
+            ge=0,
+            le=10,
+        ),
+    ] = 2
+    limit: Annotated[
+        Optional[int],
+        Field(description='Maximum number of matches to return.', ge=1, le=500),
+    ] = 50
+
+
+class SearchOrganizationFilesRequest(BaseModel):
+    query: Annotated[
+        str,
+        Field(
+            description='Tokens (or regular expression) to search for. Without `regex`, the files must contain all the space-separated tokens.',
+            examples=['SimpleMovingAverage SetBrokerageModel', r'set_brokerage_model\(.*Binance'],
+            min_length=1,
+        ),
+    ]
+    regex: Annotated[
+        Optional[bool],
+        Field(description='Interpret the query as a regular expression.'),
+    ] = False
+    caseSensitive: Annotated[
+        Optional[bool], Field(description='Match the case of the query.')
+    ] = False
+    contextLines: Annotated[
+        Optional[int],
+        Field(
+            description='Number of lines to return before and after each matching line.',
+            ge=0,
+            le=10,
+        ),
+    ] = 2
+    limit: Annotated[
+        Optional[int],
+        Field(description='Maximum number of matches to return.', ge=1, le=500),
+    ] = 50
+
+
+class CodeSearchMatch(BaseModel):
+    projectId: Annotated[
+        Optional[int], Field(description='Id of the project that contains the file.')
+    ] = None
+    projectName: Annotated[
+        Optional[str], Field(description='Name of the project that contains the file.')
+    ] = None
+    name: Annotated[Optional[str], Field(description='Name of the file.')] = None
+    line: Annotated[
+        Optional[int], Field(description='Line number of the match (1-based).')
+    ] = None
+    text: Annotated[Optional[str], Field(description='Matching line.')] = None
+    before: Annotated[
+        Optional[List[str]], Field(description='Lines before the matching line.')
+    ] = None
+    after: Annotated[
+        Optional[List[str]], Field(description='Lines after the matching line.')
+    ] = None
+    score: Annotated[
+        Optional[float],
+        Field(description='Relevance of the file. The matches are sorted by this score.'),
+    ] = None
+
+
+class CodeSearchResponse(BaseModel):
+    matches: Annotated[
+        Optional[List[CodeSearchMatch]], Field(description='Matching lines.')
+    ] = None
+    total: Annotated[
+        Optional[int],
+        Field(description='Number of matching lines, including the ones beyond the limit.'),
+    ] = None
+    filesSearched: Annotated[
+        Optional[int], Field(description='Number of files in the index.')
+    ] = None
+    projectsSearched: Annotated[
+        Optional[int], Field(description='Number of projects in the index.')
+    ] = None
+    success: Annotated[
+        Optional[bool], Field(description='Indicate if the search was successful.')
+    ] = None
+    errors: Annotated[
+        Optional[List[str]], Field(description='List of errors with the search.')
+    ] = None
+
+
+class ReadProjectFilesRequest(ReadFilesRequest):
+    names: Annotated[
+        Optional[List[str]],
+        Field(
+            description='Names or glob patterns of the files to read.',
+            examples=[['main.py', 'alpha/*.py']],
+        ),
+    ] = None
+    startLine: Annotated[
+        Optional[int],
+        Field(description='First line to read from each file (1-based).', ge=1),
+    ] = None
+    endLine: Annotated[
+        Optional[int],
+        Field(description='Last line to read from each file (inclusive).', ge=1),
+    ] = None
@@ -0,0 +1,137 @@
+import argparse
+import os
+from importlib import import_module
+
+# The modules that register the tools, in the order the server registers
+# them: module -> registration function.
+REGISTRATION_FUNCTIONS = {
+    'tools.account': 'register_account_tools',
+    'tools.project': 'register_project_tools',
+    'tools.project_collaboration': 'register_project_collaboration_tools',
+    'tools.project_nodes': 'register_project_node_tools',
+    'tools.compile': 'register_compile_tools',
+    'tools.files': 'register_file_tools',
+    'tools.backtests': 'register_backtest_tools',
+    'tools.optimizations': 'register_optimization_tools',
+    'tools.live': 'register_live_trading_tools',
+    'tools.live_commands': 'register_live_trading_command_tools',
+    'tools.object_store': 'register_object_store_tools',
+    'tools.lean_versions': 'register_lean_version_tools',
+    'tools.ai': 'register_ai_tools',
+    'tools.mcp_server_version': 'register_mcp_server_version_tools',
+    'tools.workspace': 'register_workspace_tools',
+}
+
+
+class _ProfileServer:
+    # Let a registration function register only some of its tools.
+
+    def __init__(self, mcp, tool_names):
+        self._mcp = mcp
+        self._tool_names = tool_names
+        self.registered = set()
+
+    def tool(self, name=None, **kwargs):
+        def decorator(fn):
+            tool_name = name or fn.__name__
+            if tool_name not in self._tool_names:
+                return fn
+            self.registered.add(tool_name)
+            return self._mcp.tool(name=name, **kwargs)(fn)
+        return decorator
+
+    def __getattr__(self, name):
+        return getattr(self._mcp, name)
+
+
+class ToolProfiles:
+    """Named sets of tools, so the server can expose fewer tools to the
+    clients that need a small `tools/list`.
+
+    Select a profile with the MCP_TOOL_PROFILE environment variable or
+    the `--profile` argument of `main.py` (default: 'full'). The server
+    only imports the tool modules of the profile, so it also starts
+    faster.
+    """
+
+    # profile -> {
+    #     'name': The name of the server (it also names the log file and
+    #         the schema cache),
+    #     'instructions': The file with the server instructions,
+    #     'tools': tool module -> names of its tools to register, or None
+    #         to register all the tools.
+    # }
+    PROFILES = {
+        'full': {
+            'name': 'quantconnect',
+            'instructions': 'instructions.md',
+            'tools': None
+        },
+        'minimal': {
+            'name': 'quantconnect-minimal',
+            'instructions': 'instructions_minimal.md',
+            'tools': {
+                'tools.project': ['create_project'],
+                'tools.compile': ['create_compile', 'read_compile'],
+                'tools.files': ['read_file', 'update_file_contents'],
+                'tools.backtests': [
+                    'create_backtest_brief', 'read_backtest_brief',
+                    'read_backtest_statistics'
+                ],
+                'tools.ai': ['search_quantconnect'],
+            }
+        },
+    }
+
+    @classmethod
+    def resolve(cls, argv=()):
+        """Return the name of the selected profile.
+
+        Args:
+            argv: The command line arguments of the server.
+        """
+        parser = argparse.ArgumentParser(add_help=False)
+        parser.add_argument(
+            '--profile', choices=list(cls.PROFILES),
+            default=os.getenv('MCP_TOOL_PROFILE', 'full')
+        )
+        profile = parser.parse_known_args(list(argv))[0].profile
+        if profile not in cls.PROFILES:
+            raise ValueError(
+                f"Unknown tool profile '{profile}'. "
+                f"Use one of: {', '.join(cls.PROFILES)}."
+            )
+        return profile
+
+    @classmethod
+    def register(cls, mcp, profile):
+        """Register the tools of a profile.
+
+        Returns:
+            The number of tools registered.
+        """
+        tools = cls.PROFILES[profile]['tools']
+        modules = REGISTRATION_FUNCTIONS if tools is None else [
+            module for module in REGISTRATION_FUNCTIONS if module in tools
+        ]
+        count = 0
+        for module in modules:
+            register = getattr(
+                import_module(module), REGISTRATION_FUNCTIONS[module]
+            )
+            before = len(mcp._tool_manager.list_tools())
+            if tools is None:
+                register(mcp)
+            else:
+                # Fail on a tool that was renamed or removed, so the
+                # profile doesn't silently lose it.
+                server = _ProfileServer(mcp, set(tools[module]))
+                register(server)
+                missing = set(tools[module]) - server.registered
+                if missing:
+                    raise ValueError(
+                        f"The tool profile '{profile}' has tools that "
+                        f"{module} doesn't register: {sorted(missing)}"
+                    )
+            count += len(mcp._tool_manager.list_tools()) - before
+        return count
@@ -0,0 +1,202 @@
+import asyncio
+import inspect
+import os
+from functools import partial
+
+import jsonschema
+import pydantic_core
+from mcp.server.fastmcp.exceptions import ToolError
+from mcp.server.fastmcp.tools import Tool
+from mcp.server.fastmcp.utilities.func_metadata import FuncMetadata
+from mcp.types import TextContent
+
+from api_connection import LARGE_RESPONSE_BYTES, ResponseSize
+from compact_responses import (
+    COMPACT_DESCRIPTION, COMPACT_RESPONSES, compact_value, parse_compact_tools
+)
+from tool_schema_cache import CachedSchemaTool
+
+
+class ToolResults:
+    """Convert and validate the results of the tools off the critical path.
+
+    FastMCP validates the result of every tool with its Pydantic response
+    model and dumps the model to build the structured content. The MCP
+    server then validates the structured content against the output
+    schema with jsonschema, which checks the schema itself on every call.
+    For the large responses of the API (ex: a backtest with its rolling
+    window and closed trades), that costs more CPU on the event loop than
+    the request itself.
+
+    Once installed, the server validates the output of each tool with a
+    cached jsonschema validator instead. The calls that received a
+    response larger than MCP_LARGE_RESPONSE_BYTES (default: 256 KiB) convert
+    and validate their result in a worker thread, so the light calls of
+    the other sessions don't wait for them. The small results stay on the
+    event loop.
+
+    When MCP_TRUSTED_RESPONSES is 'true', the tools that return a dict
+    send it as their structured content as is: the server trusts the API
+    to return the documented schema. To validate fewer fields instead of
+    none, select them with a field mask (see `field_masks.py`).
+
+    The tools that MCP_COMPACT_RESPONSES lists return their result as
+    compact JSON text instead (see `compact_responses.py`), without
+    structured content or an output schema. Their results are still
+    validated with the response model.
+
+    Usage:
+        # Register the tools.
+        ToolResults.install(mcp)
+    """
+
+    TRUSTED = os.getenv('MCP_TRUSTED_RESPONSES', 'false').lower() == 'true'
+
+    # tool name -> (output schema, jsonschema validator)
+    _validator_by_tool = {}
+
+    @classmethod
+    def install(cls, mcp, trusted=None, compact=None):
+        """Make a FastMCP server convert and validate the results of its
+        tools with `ToolResults`.
+
+        Args:
+            mcp: The FastMCP server. Call this after registering the tools.
+            trusted: Trust the results of the API (default:
+                MCP_TRUSTED_RESPONSES).
+            compact: The number of significant digits of each tool that
+                returns compact results (see `parse_compact_tools`).
+                Default: MCP_COMPACT_RESPONSES.
+
+        Returns:
+            False if the version of mcp isn't supported (see `supported`),
+            in which case the server keeps converting and validating the
+            results itself.
+        """
+        if not cls.supported(mcp):
+            return False
+        trusted = cls.TRUSTED if trusted is None else trusted
+        if compact is None:
+            compact = parse_compact_tools(COMPACT_RESPONSES)
+        tool_manager = mcp._tool_manager
+        digits_by_tool = {}
+        for tool in tool_manager.list_tools():
+            digits = compact.get(tool.name, compact.get('*'))
+            output_schema, wrap_output = cls._structured_output(tool)
+            # The wrapped results (ex: a str) are already compact.
+            if digits is None or output_schema is None or wrap_output:
+                continue
+            digits_by_tool[tool.name] = digits
+            tool.output_schema = None
+            tool.description = '\n\n'.join(
+                filter(None, [tool.description, COMPACT_DESCRIPTION])
+            )
+        server = mcp._mcp_server
+        call_tool = tool_manager.call_tool
+        get_tool_definition = server._get_cached_tool_definition
+
+        async def convert_and_call_tool(
+                name, arguments, context=None, convert_result=False):
+            tool = tool_manager.get_tool(name)
+            if tool is None or not convert_result:
+                return await call_tool(
+                    name, arguments, context, convert_result
+                )
+            size = ResponseSize.track()
+            result = await tool.run(arguments, context, convert_result=False)
+            convert = partial(
+                cls.convert_result, tool, result, trusted,
+                digits_by_tool.get(name)
+            )
+            if size.bytes > LARGE_RESPONSE_BYTES:
+                return await asyncio.to_thread(convert)
+            return convert()
+
+        async def tool_definition(name):
+            # The MCP server validates the structured content against the
+            # output schema of the tool, unless the tool has none.
+            tool = await get_tool_definition(name)
+            if tool is None or tool.outputSchema is None:
+                return tool
+            return tool.model_copy(update={'outputSchema': None})
+
+        tool_manager.call_tool = convert_and_call_tool
+        server._get_cached_tool_definition = tool_definition
+        return True
+
+    @staticmethod
+    def supported(mcp):
+        """Return True if the FastMCP server has the internals that
+        `install` replaces (mcp 1.10 and later)."""
+        return hasattr(mcp._mcp_server, '_get_cached_tool_definition') \
+            and hasattr(mcp._tool_manager, 'call_tool') \
+            and 'convert_result' in inspect.signature(Tool.run).parameters \
+            and hasattr(FuncMetadata, 'convert_result')
+
+    @classmethod
+    def convert_result(cls, tool, result, trusted=False, digits=None):
+        """Return the content and the structured content of a result,
+        like FastMCP and the MCP server do. With `digits`, return only the
+        compact content of the result, with the floats rounded to `digits`
+        significant digits.
+
+        Raises:
+            ToolError: The result doesn't match the response model or the
+                output schema of the tool.
+        """
+        metadata = tool.fn_metadata
+        if trusted and metadata.output_schema is not None \
+                and not metadata.wrap_output and isinstance(result, dict):
+            if digits is not None:
+                return cls._compact(result, digits)
+            text = pydantic_core.to_json(
+                result, fallback=str, indent=2
+            ).decode()
+            return [TextContent(type='text', text=text)], result
+        try:
+            converted = metadata.convert_result(result)
+        except Exception as e:
+            raise ToolError(f'Error executing tool {tool.name}: {e}') from e
+        if digits is not None and isinstance(converted, tuple):
+            return cls._compact(converted[1], digits)
+        if tool.output_schema is None:
+            return converted
+        if not isinstance(converted, tuple):
+            raise ToolError(
+                'Output validation error: outputSchema defined but no '
+                'structured output returned'
+            )
+        # Report the same error as `jsonschema.validate`.
+        error = jsonschema.exceptions.best_match(
+            cls._validator(tool).iter_errors(converted[1])
+        )
+        if error is not None:
+            raise ToolError(f'Output validation error: {error.message}')
+        return converted
+
+    @staticmethod
+    def _structured_output(tool):
+        # Return the output schema of a tool, as registered, and whether
+        # its result is wrapped, without building the models of the tools
+        # registered from the `ToolSchemaCache`.
+        if isinstance(tool, CachedSchemaTool):
+            return tool.cached_output_schema, tool.cached_wrap_output
+        return tool.fn_metadata.output_schema, tool.fn_metadata.wrap_output
+
+    @staticmethod
+    def _compact(structured_content, digits):
+        text = pydantic_core.to_json(
+            compact_value(structured_content, digits), fallback=str
+        ).decode()
+        return [TextContent(type='text', text=text)]
+
+    @classmethod
+    def _validator(cls, tool):
+        schema, validator = cls._validator_by_tool.get(tool.name, (None, None))
+        if schema is not tool.output_schema:
+            schema = tool.output_schema
+            validator_class = jsonschema.validators.validator_for(schema)
+            validator_class.check_schema(schema)
+            validator = validator_class(schema)
+            cls._validator_by_tool[tool.name] = (schema, validator)
+        return validator
@@ -0,0 +1,184 @@
+import glob
+import inspect
+import os
+from functools import cached_property
+from hashlib import sha256
+from importlib.metadata import version
+from typing import Any, get_origin
+
+from mcp.server.fastmcp import Context
+from mcp.server.fastmcp.tools import Tool, ToolManager
+from mcp.server.fastmcp.utilities.func_metadata import (
+    FuncMetadata, func_metadata
+)
+
+import local_cache
+
+SOURCE_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+
+def _context_kwarg(fn):
+    # Find the argument that receives the MCP context, like
+    # `Tool.from_function` does.
+    for name, parameter in inspect.signature(fn).parameters.items():
+        annotation = parameter.annotation
+        if get_origin(annotation) is None and inspect.isclass(annotation) \
+                and issubclass(annotation, Context):
+            return name
+    return None
+
+
+class CachedSchemaTool(Tool):
+    """A tool registered with the schemas from the `ToolSchemaCache`.
+
+    FastMCP builds the Pydantic models that validate the arguments and
+    the result of a tool at registration. This tool builds them the first
+    time its `fn_metadata` is read instead (usually on its first call), so
+    the server starts without building the models of the tools that a
+    session never calls.
+    """
+
+    fn_metadata: FuncMetadata | None = None
+    cached_output_schema: dict[str, Any] | None = None
+    # Whether FastMCP wraps the result in {'result': ...} (ex: a str).
+    cached_wrap_output: bool = False
+    structured_output: bool | None = None
+
+    @cached_property
+    def output_schema(self):
+        return self.cached_output_schema
+
+    def _get_fn_metadata(self):
+        if self.__dict__['fn_metadata'] is None:
+            self.__dict__['fn_metadata'] = func_metadata(
+                self.fn,
+                skip_names=[self.context_kwarg] if self.context_kwarg else [],
+                structured_output=self.structured_output
+            )
+        return self.__dict__['fn_metadata']
+
+    def _set_fn_metadata(self, fn_metadata):
+        self.__dict__['fn_metadata'] = fn_metadata
+
+
+# Pydantic keeps `fn_metadata` as a field (with the None default above),
+# and the property builds it when it's read, so it's never None like on
+# the other tools. The property is set after the class is created since
+# a property in the class body would replace the field.
+CachedSchemaTool.fn_metadata = property(
+    CachedSchemaTool._get_fn_metadata, CachedSchemaTool._set_fn_metadata
+)
+
+
+class CachedToolManager(ToolManager):
+    """Register the tools with the cached schemas when they're fresh."""
+
+    def add_tool(
+            self, fn, name=None, title=None, description=None,
+            annotations=None, structured_output=None):
+        name = name or fn.__name__
+        schemas = ToolSchemaCache.get(name)
+        if schemas is None:
+            tool = super().add_tool(
+                fn, name, title, description, annotations, structured_output
+            )
+            ToolSchemaCache.record(tool)
+            return tool
+        if name in self._tools:
+            return super().add_tool(
+                fn, name, title, description, annotations, structured_output
+            )
+        tool = CachedSchemaTool(
+            fn=fn,
+            name=name,
+            title=title,
+            description=description or fn.__doc__ or '',
+            parameters=schemas['inputSchema'],
+            cached_output_schema=schemas['outputSchema'],
+            cached_wrap_output=schemas.get('wrapOutput', False),
+            structured_output=structured_output,
+            is_async=inspect.iscoroutinefunction(fn),
+            context_kwarg=_context_kwarg(fn),
+            annotations=annotations
+        )
+        self._tools[name] = tool
+        return tool
+
+
+class ToolSchemaCache:
+    """Cache of the input and output schemas of the tools, so the server
+    doesn't generate them at every start.
+
+    The cache is keyed by a hash of the server code (including the
+    generated models) and the versions of the packages that generate the
+    schemas, so any change to the tools regenerates it. Set the
+    MCP_SCHEMA_CACHE environment variable to 'false' to disable it.
+
+    Usage:
+        ToolSchemaCache.install(mcp)
+        # Register the tools.
+        ToolSchemaCache.save()
+    """
+
+    ENABLED = os.getenv('MCP_SCHEMA_CACHE', 'true').lower() == 'true'
+
+    _file_name = None
+    _key = None
+    # tool name -> {'inputSchema': ..., 'outputSchema': ..., 'wrapOutput': ...}
+    _schemas_by_tool = {}
+    _changed = False
+
+    @classmethod
+    def key(cls):
+        """Return the hash of the code that defines the tool schemas."""
+        digest = sha256()
+        for package in ('mcp', 'pydantic'):
+            digest.update(f'{package}=={version(package)}\n'.encode())
+        paths = glob.glob(os.path.join(SOURCE_DIRECTORY, '*.py')) \
+            + glob.glob(os.path.join(SOURCE_DIRECTORY, 'tools', '*.py'))
+        for path in sorted(paths):
+            digest.update(os.path.relpath(path, SOURCE_DIRECTORY).encode())
+            with open(path, 'rb') as file:
+                digest.update(file.read())
+        return digest.hexdigest()
+
+    @classmethod
+    def install(cls, mcp):
+        """Make a FastMCP server register its tools with the cache. Call
+        this before registering the tools."""
+        if not cls.ENABLED:
+            return
+        # The servers register different tools with the same names.
+        cls._file_name = f'tool_schemas_{mcp.name}.json'
+        cls._key = cls.key()
+        cached = local_cache.load_json(cls._file_name, {})
+        cls._schemas_by_tool = cached.get('tools', {}) \
+            if cached.get('key') == cls._key else {}
+        cls._changed = False
+        mcp._tool_manager = CachedToolManager(
+            warn_on_duplicate_tools=mcp._tool_manager.warn_on_duplicate_tools
+        )
+
+    @classmethod
+    def get(cls, name):
+        return cls._schemas_by_tool.get(name)
+
+    @classmethod
+    def record(cls, tool):
+        cls._schemas_by_tool[tool.name] = {
+            'inputSchema': tool.parameters,
+            'outputSchema': tool.output_schema,
+            'wrapOutput': tool.fn_metadata.wrap_output
+        }
+        cls._changed = True
+
+    @classmethod
+    def save(cls):
+        """Save the schemas of the tools that weren't cached. Call this
+        after registering the tools."""
+        if not cls.ENABLED or not cls._changed:
+            return
+        local_cache.save_json(
+            cls._file_name, {'key': cls._key, 'tools': cls._schemas_by_tool}
+        )
+        cls._changed = False
@@ -1,4 +1,6 @@
 from api_connection import post
+from field_masks import field_mask
+from project_locks import ProjectLocks
 from models import (
     CreateCompileRequest,
     ReadCompileRequest,
@@ -14,10 +16,13 @@ def register_compile_tools(mcp):
     async def create_compile(
             model: CreateCompileRequest) -> CreateCompileResponse:
         """Asynchronously create a compile job request for a project."""
-        return await post('/compile/create', model)
+        # Wait for the pending writes so the compile has the latest code.
+        async with ProjectLocks.write(model.projectId):
+            return await post('/compile/create', model)
 
     # Read
     @mcp.tool(annotations={'title': 'Read compile', 'readOnlyHint': True})
+    @field_mask
     async def read_compile(model: ReadCompileRequest) -> ReadCompileResponse:
         """Read a compile packet job result."""
         return await post('/compile/read', model)
@@ -1,5 +1,15 @@
+from contextlib import asynccontextmanager
+from fnmatch import fnmatchcase
+
 from api_connection import post
 from code_source_id import add_code_source_id
+from workspace_files import read_workspace_files
+from file_content_cache import FileContentCache
+from file_writes import write_file, WRITE_STATISTICS
+from project_locks import ProjectLocks
+from collaboration_leases import CollaborationLeases
+from code_search import ProjectCodeSearch
+from organization_code_search import OrganizationCodeSearch
 from models import (
     CreateProjectFileRequest,
     ReadFilesRequest,
@@ -10,6 +20,98 @@ from models import (
     RestResponse,
     ProjectFilesResponse
 )
+from server_models import (
+    ReadProjectFilesRequest,
+    SearchProjectFilesRequest,
+    SearchOrganizationFilesRequest,
+    FileWriteStatisticsResponse,
+    CodeSearchResponse
+)
+
+
+async def _read_files(project_id, name=None, cached=False):
+    # Read a file, or all the files of a project if no name is given.
+    # Read the files from the organization workspace if it's mounted
+    # since it's much faster than a network round-trip.
+    response = await read_workspace_files(project_id, name)
+    if response:
+        return response
+    # The cache only has the name and the content of the files.
+    content_by_name = FileContentCache.project_files(project_id) \
+        if cached and name is None else None
+    if content_by_name is not None:
+        return {
+            'files': [
+                {'projectId': project_id, 'name': file_name, 'content': content}
+                for file_name, content in content_by_name.items()
+            ],
+            'success': True
+        }
+    response = await post(
+        '/files/read', 
+        add_code_source_id(ReadFilesRequest(projectId=project_id, name=name))
+    )
+    # Only cache the content from the API since the workspace can be 
+    # ahead of (or behind) QuantConnect Cloud.
+    FileContentCache.update_files(response, project_id if name is None else None)
+    return response
+
+
+async def _read_project_files(project_id):
+    # Return the content of all the files of a project by name, or the
+    # error response if the API can't read the files.
+    response = await _read_files(project_id, cached=True)
+    if not response.get('success'):
+        return None, response
+    return {
+        file['name']: file['content'] for file in response.get('files') or []
+        if file.get('content') is not None
+    }, None
+
+
+@asynccontextmanager
+async def _edit(project_id):
+    # Edit a project after the previous calls that modify it, holding its
+    # collaboration lock. If the lock can't be acquired, the edit still
+    # runs so its response explains the error.
+    async with ProjectLocks.write(project_id):
+        await CollaborationLeases.acquire(project_id)
+        yield
+
+
+def _is_glob(name):
+    return any(char in name for char in '*?[')
+
+
+def _select_files(response, names, start_line, end_line):
+    # Keep the files that match the names (or glob patterns) and the
+    # lines in the range.
+    files = response.get('files') or []
+    if names:
+        missing = [
+            name for name in names if not _is_glob(name) 
+            and all(file['name'] != name for file in files)
+        ]
+        if missing:
+            return {
+                'success': False, 
+                'errors': [f"File not found: {', '.join(missing)}"]
+            }
+        files = [
+            file for file in files 
+            if any(fnmatchcase(file['name'], name) for name in names)
+        ]
+    if start_line is not None or end_line is not None:
+        start = (start_line or 1) - 1
+        files = [
+            file | {
+                'content': ''.join(
+                    file['content'].splitlines(keepends=True)[start:end_line]
+                )
+            } if file.get('content') is not None else file
+            for file in files
+        ]
+    return response | {'files': files}
 
 
 def register_file_tools(mcp):
@@ -24,15 +126,43 @@ def register_file_tools(mcp):
     async def create_file(
             model: CreateProjectFileRequest) -> RestResponse:
         """Add a file to a given project."""
-        return await post('/files/create', add_code_source_id(model))
+        async with _edit(model.projectId):
+            response = await post('/files/create', add_code_source_id(model))
+        if response.get('success'):
+            FileContentCache.update(model.projectId, model.name, model.content)
+        return response
 
     # Read
     @mcp.tool(annotations={'title': 'Read file', 'readOnlyHint': True})
-    async def read_file(model: ReadFilesRequest) -> ProjectFilesResponse:
+    async def read_file(model: ReadProjectFilesRequest) -> ProjectFilesResponse:
         """Read a file from a project, or all files in the project if 
         no file name is provided.
+
+        To reduce the response size, pass `names` to read a subset of the
+        files (ex: `alpha/*.py`) and `startLine`/`endLine` to read a 
+        range of lines.
         """
-        return await post('/files/read', add_code_source_id(model))
+        if (model.startLine is not None and model.endLine is not None
+                and model.endLine < model.startLine):
+            return {
+                'success': False, 
+                'errors': ['endLine must be greater than or equal to startLine.']
+            }
+        names = ([model.name] if model.name else []) + (model.names or [])
+        selected = model.names or model.startLine or model.endLine
+        if not selected:
+            return await _read_files(model.projectId, model.name)
+        # Read a single file on its own. Otherwise, read the whole project
+        # once and select the files locally. The `FileContentCache` isn't
+        # used since it doesn't have the library files or the `modified`
+        # and `isLibrary` fields.
+        if len(names) == 1 and not _is_glob(names[0]):
+            response = await _read_files(model.projectId, names[0])
+        else:
+            response = await _read_files(model.projectId)
+        if not response.get('success'):
+            return response
+        return _select_files(response, names, model.startLine, model.endLine)
     
     # Update name
     @mcp.tool(
@@ -40,7 +170,11 @@ def register_file_tools(mcp):
     )
     async def update_file_name(model: UpdateFileNameRequest) -> RestResponse:
         """Update the name of a file."""
-        return await post('/files/update', add_code_source_id(model))
+        async with _edit(model.projectId):
+            response = await post('/files/update', add_code_source_id(model))
+        if response.get('success'):
+            FileContentCache.rename(model.projectId, model.name, model.newName)
+        return response
 
     # Update contents
     @mcp.tool(
@@ -48,8 +182,38 @@ def register_file_tools(mcp):
     )
     async def update_file_contents(
             model: UpdateFileContentsRequest) -> ProjectFilesResponse:
-        """Update the contents of a file."""
-        return await post('/files/update', add_code_source_id(model))
+        """Update the contents of a file.
+
+        The response has the updated file. Its `modified` time is only
+        set if the whole file was sent.
+        """
+        async with _edit(model.projectId):
+            # Skip the request if the file already has this content.
+            if FileContentCache.is_unchanged(
+                    model.projectId, model.name, model.content):
+                FileContentCache.skipped_writes += 1
+                response, method = {'success': True}, 'skip'
+            else:
+                # Send a patch instead of the whole file if the previous
+                # content is cached and the change is small.
+                response, method = await write_file(
+                    model.projectId, model.name, model.content,
+                    FileContentCache.content(model.projectId, model.name)
+                )
+        if method == 'update' or not response.get('success'):
+            return response
+        # `/files/patch` doesn't return the file, so return the content
+        # that the file now has, like `/files/update` does.
+        return {
+            'files': [
+                {
+                    'projectId': model.projectId,
+                    'name': model.name,
+                    'content': model.content
+                }
+            ],
+            'success': True
+        }
 
     # Update lines (patch)
     @mcp.tool(
@@ -57,10 +221,81 @@ def register_file_tools(mcp):
     )
     async def patch_file(model: PatchFileRequest) -> RestResponse:
         """Apply a patch (unified diff) to a file in a project."""
-        return await post('/files/patch', add_code_source_id(model))
+        async with _edit(model.projectId):
+            # The patch can change several files, so forget the project.
+            FileContentCache.remove(model.projectId)
+            return await post('/files/patch', add_code_source_id(model))
         
     # Delete
     @mcp.tool(annotations={'title': 'Delete file', 'idempotentHint': True})
     async def delete_file(model: DeleteFileRequest) -> RestResponse:
         """Delete a file in a project."""
-        return await post('/files/delete', add_code_source_id(model))
+        async with _edit(model.projectId):
+            response = await post('/files/delete', add_code_source_id(model))
+        if response.get('success'):
+            FileContentCache.remove(model.projectId, model.name)
+        return response
+
+    # Search
+    @mcp.tool(
+        annotations={'title': 'Search project files', 'readOnlyHint': True}
+    )
+    async def search_project_files(
+            model: SearchProjectFilesRequest) -> CodeSearchResponse:
+        """Search the files of a project and return the matching lines 
+        with context.
+
+        The files are cached and indexed locally, so use this tool 
+        instead of reading all the files of a project to find code.
+        """
+        content_by_name, error = await _read_project_files(model.projectId)
+        if error:
+            return error
+        try:
+            return ProjectCodeSearch.search(
+                model.projectId, content_by_name, model.query, model.regex,
+                model.caseSensitive, model.contextLines, model.limit
+            )
+        except ValueError as e:
+            return {'success': False, 'errors': [str(e)]}
+
+    # Search (all projects)
+    @mcp.tool(
+        annotations={
+            'title': 'Search organization files', 'readOnlyHint': True
+        }
+    )
+    async def search_organization_files(
+            model: SearchOrganizationFilesRequest) -> CodeSearchResponse:
+        """Search the files of all the projects and return the matching 
+        lines, ranked by relevance.
+
+        Use this tool to find the projects that use some code (ex: an 
+        indicator or a brokerage model). The files are indexed locally and
+        only the projects that changed are read again, so the first search
+        is the slowest.
+        """
+        try:
+            return await OrganizationCodeSearch.search(
+                model.query, model.regex, model.caseSensitive,
+                model.contextLines, model.limit
+            )
+        except ValueError as e:
+            return {'success': False, 'errors': [str(e)]}
+
+    # Read write statistics
+    @mcp.tool(
+        annotations={
+            'title': 'Read file write statistics', 'readOnlyHint': True,
+            'openWorldHint': False
+        }
+    )
+    async def read_file_write_statistics() -> FileWriteStatisticsResponse:
+        """Read the number of file updates that were skipped or sent 
+        as a patch.
+        """
+        return WRITE_STATISTICS | {
+            'cachedFiles': FileContentCache.cached_files(),
+            'skippedWrites': FileContentCache.skipped_writes,
+            'success': True
+        }
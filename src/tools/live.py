@@ -2,6 +2,7 @@ from pydantic_core import to_jsonable_python
 import webbrowser
 
 from api_connection import post, httpx, get_headers, BASE_URL
+from field_masks import field_mask
 from models import (
     AuthorizeExternalConnectionRequest,
     CreateLiveAlgorithmRequest,
@@ -81,6 +82,7 @@ def register_live_trading_tools(mcp):
 
     # Read (singular)
     @mcp.tool(annotations={'title': 'Read live algorithm', 'readOnly': True})
+    @field_mask
     async def read_live_algorithm(
             model: ReadLiveAlgorithmRequest) -> LiveAlgorithmResults:
         """Read details of a live algorithm."""
@@ -88,6 +90,7 @@ def register_live_trading_tools(mcp):
 
     # Read (all).
     @mcp.tool(annotations={'title': 'List live algorithms', 'readOnly': True})
+    @field_mask
     async def list_live_algorithms(
             model: ListLiveAlgorithmsRequest) -> LiveAlgorithmListResponse:
         """List all your past and current live trading deployments."""
@@ -113,6 +116,7 @@ def register_live_trading_tools(mcp):
 
     # Read the portfolio state.
     @mcp.tool(annotations={'title': 'Read live portfolio', 'readOnly': True})
+    @field_mask
     async def read_live_portfolio(
             model: ReadLivePortfolioRequest) -> LivePortfolioResponse:
         """Read out the portfolio state of a live algorithm.
@@ -122,6 +126,7 @@ def register_live_trading_tools(mcp):
 
     # Read the orders.
     @mcp.tool(annotations={'title': 'Read live orders', 'readOnly': True})
+    @field_mask
     async def read_live_orders(
             model: ReadLiveOrdersRequest) -> LiveOrdersResponse:
         """Read out the orders of a live algorithm.
@@ -133,6 +138,7 @@ def register_live_trading_tools(mcp):
 
     # Read the insights.
     @mcp.tool(annotations={'title': 'Read live insights', 'readOnly': True})
+    @field_mask
     async def read_live_insights(
             model: ReadLiveInsightsRequest) -> LiveInsightsResponse:
         """Read out the insights of a live algorithm.
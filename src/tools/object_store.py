@@ -1,6 +1,12 @@
+from mcp.server.fastmcp import Context
+
 from api_connection import post, httpx, get_headers, BASE_URL
+from object_store_transfer import upload_files, sync_directory, download_files
+from object_store_index import ObjectStoreIndex
+from object_store_codecs import (
+    SAMPLE_SIZE, choose_codec, encode_key, compress_bytes
+)
 from models import (
-    ObjectStoreBinaryFile,
     GetObjectStorePropertiesRequest,
     GetObjectStoreJobIdRequest,
     GetObjectStoreURLRequest,
@@ -11,6 +17,42 @@ from models import (
     ListObjectStoreResponse,
     RestResponse
 )
+from server_models import (
+    UploadObjectStoreFileRequest,
+    UploadObjectStoreFilesRequest,
+    SyncObjectStoreDirectoryRequest,
+    DownloadObjectStoreFilesRequest,
+    RefreshObjectStoreIndexRequest,
+    SearchObjectStoreIndexRequest,
+    ReadObjectStoreUsageRequest,
+    ObjectStoreTransferResponse,
+    ObjectStoreSyncResponse,
+    RefreshObjectStoreIndexResponse,
+    ObjectStoreIndexResponse,
+    ObjectStoreUsageResponse
+)
+
+
+async def _report_progress(ctx, progress, total):
+    try:
+        await ctx.report_progress(progress, total)
+    except ValueError:
+        # The tool was called outside of an MCP request (ex: in tests).
+        pass
+
+
+async def _build_index(organization_id):
+    # Build the index of the organization on first use. Return the
+    # error response if the Object Store can't be listed.
+    if ObjectStoreIndex.indexed_at(organization_id) is not None:
+        return None
+    try:
+        await ObjectStoreIndex.refresh(organization_id)
+    except RuntimeError as e:
+        return {'success': False, 'errors': [str(e)]}
+    except httpx.HTTPError as e:
+        return {'success': False, 'errors': [f'{type(e).__name__}: {e}']}
+
 
 def register_object_store_tools(mcp):
     # Create
@@ -19,9 +61,19 @@ def register_object_store_tools(mcp):
             'title': 'Upload Object Store file', 'idempotentHint': True
         }
     )
-    async def upload_object(
-            model: ObjectStoreBinaryFile) -> RestResponse:
-        """Upload files to the Object Store."""
+    async def upload_object(model: UploadObjectStoreFileRequest) -> RestResponse:
+        """Upload files to the Object Store.
+
+        Compressed files are stored under their key plus the '.gz' or 
+        '.zst' suffix.
+        """
+        key, data = model.key, model.objectData
+        try:
+            codec = choose_codec(data[:SAMPLE_SIZE], model.compression.value)
+        except ValueError as e:
+            return {'success': False, 'errors': [str(e)]}
+        if codec:
+            key, data = encode_key(key, codec), compress_bytes(data, codec)
         # This endpoint is unique because post request requires `data` 
         # and `files` arguments.
         async with httpx.AsyncClient() as client:
@@ -30,13 +82,77 @@ def register_object_store_tools(mcp):
                 headers=get_headers(), 
                 data={
                     'organizationId': model.organizationId,
-                    'key': model.key
+                    'key': key
                 }, 
-                files={'objectData': model.objectData},
+                files={'objectData': data},
                 timeout=30.0
             )
             response.raise_for_status()
-            return response.json()
+            result = response.json()
+            if result.get('success'):
+                ObjectStoreIndex.upsert(model.organizationId, key, len(data))
+            return result
+
+    # Create from local files
+    @mcp.tool(
+        annotations={
+            'title': 'Upload Object Store files from the workspace',
+            'idempotentHint': True
+        }
+    )
+    async def upload_object_files(
+            model: UploadObjectStoreFilesRequest,
+            ctx: Context) -> ObjectStoreTransferResponse:
+        """Upload files from the mounted organization workspace to the 
+        Object Store.
+
+        The files are streamed from the disk in chunks, so use this tool 
+        instead of `upload_object` for large files or for many keys.
+        """
+        return await upload_files(
+            model.organizationId, 
+            [(file.key, file.path) for file in model.files],
+            model.maxConcurrency,
+            lambda sent, total: _report_progress(ctx, sent, total),
+            on_uploaded=lambda key, size: ObjectStoreIndex.upsert(
+                model.organizationId, key, size
+            ),
+            compression=model.compression.value
+        )
+
+    # Sync a directory
+    @mcp.tool(
+        annotations={
+            'title': 'Sync Object Store directory',
+            'idempotentHint': True
+        }
+    )
+    async def sync_object_store_directory(
+            model: SyncObjectStoreDirectoryRequest,
+            ctx: Context) -> ObjectStoreSyncResponse:
+        """Upload the new and changed files of a directory in the 
+        mounted organization workspace to the Object Store.
+
+        Files with the same size and MD5 hash as the Object Store copy 
+        are skipped. Optionally delete the Object Store files that no 
+        longer exist in the local directory.
+        """
+        return await sync_directory(
+            model.organizationId,
+            model.path,
+            model.prefix,
+            model.deleteOrphans,
+            model.dryRun,
+            model.maxConcurrency,
+            model.maxRequestsPerSecond,
+            lambda sent, total: _report_progress(ctx, sent, total),
+            on_uploaded=lambda key, size: ObjectStoreIndex.upsert(
+                model.organizationId, key, size
+            ),
+            on_deleted=lambda key: ObjectStoreIndex.remove(
+                model.organizationId, key
+            )
+        )
 
     # Read file metadata
     @mcp.tool(
@@ -79,6 +195,36 @@ def register_object_store_tools(mcp):
         """Get the URL for downloading files from the Object Store."""
         return await post('/object/get', model)
 
+    # Download files
+    @mcp.tool(
+        annotations={
+            'title': 'Download Object Store files to the workspace',
+            'destructiveHint': False,
+            'idempotentHint': True
+        }
+    )
+    async def download_object_files(
+            model: DownloadObjectStoreFilesRequest,
+            ctx: Context) -> ObjectStoreTransferResponse:
+        """Download files from the Object Store to a directory in the 
+        mounted organization workspace.
+
+        This tool creates the download jobs, waits for them to complete, 
+        and saves each file under its key, so you don't need to call 
+        `read_object_store_file_job_id` and 
+        `read_object_store_file_download_url`.
+        """
+        return await download_files(
+            model.organizationId,
+            model.keys,
+            model.path,
+            model.batchSize,
+            model.maxConcurrency,
+            model.timeout,
+            lambda received, total: _report_progress(ctx, received, total),
+            model.decompress
+        )
+
     # Read all files
     @mcp.tool(
         annotations={'title': 'List Object Store files', 'readOnlyHint': True}
@@ -90,6 +236,86 @@ def register_object_store_tools(mcp):
         """
         return await post('/object/list', model)
 
+    # Refresh the local index
+    @mcp.tool(
+        annotations={
+            'title': 'Refresh Object Store index', 'readOnlyHint': True
+        }
+    )
+    async def refresh_object_store_index(
+            model: RefreshObjectStoreIndexRequest
+        ) -> RefreshObjectStoreIndexResponse:
+        """Update the local index of the Object Store files that 
+        `search_object_store_index` and `read_object_store_usage` use.
+
+        Only the folders that changed since the last refresh are listed 
+        again.
+        """
+        try:
+            return await ObjectStoreIndex.refresh(
+                model.organizationId, model.path, model.full
+            )
+        except RuntimeError as e:
+            return {'success': False, 'errors': [str(e)]}
+        except httpx.HTTPError as e:
+            return {'success': False, 'errors': [f'{type(e).__name__}: {e}']}
+
+    # Search the local index
+    @mcp.tool(
+        annotations={
+            'title': 'Search Object Store index', 'readOnlyHint': True
+        }
+    )
+    async def search_object_store_index(
+            model: SearchObjectStoreIndexRequest) -> ObjectStoreIndexResponse:
+        """Find Object Store files by prefix, glob pattern, size, and 
+        modification time without listing each directory.
+
+        The first search of an organization builds the index. Call 
+        `refresh_object_store_index` to pick up changes made outside of 
+        this server.
+        """
+        organization_id = model.organizationId
+        if error := await _build_index(organization_id):
+            return error
+        matches = ObjectStoreIndex.query(
+            organization_id, model.prefix, model.pattern, model.minSize, 
+            model.maxSize, model.modifiedAfter, model.modifiedBefore
+        )
+        return {
+            'objects': matches[:model.limit],
+            'total': len(matches),
+            'totalSize': sum(int(obj.get('size') or 0) for obj in matches),
+            'indexedAt': ObjectStoreIndex.indexed_at(organization_id),
+            'success': True
+        }
+
+    # Read storage usage from the local index
+    @mcp.tool(
+        annotations={
+            'title': 'Read Object Store usage', 'readOnlyHint': True
+        }
+    )
+    async def read_object_store_usage(
+            model: ReadObjectStoreUsageRequest) -> ObjectStoreUsageResponse:
+        """Break down the Object Store storage used under a directory 
+        by sub-directory, largest first.
+
+        The first call for an organization builds the local index.
+        """
+        organization_id = model.organizationId
+        if error := await _build_index(organization_id):
+            return error
+        usage = ObjectStoreIndex.usage(
+            organization_id, model.prefix, model.depth
+        )
+        return {
+            'usage': usage[:model.limit],
+            'totalSize': sum(group['size'] for group in usage),
+            'indexedAt': ObjectStoreIndex.indexed_at(organization_id),
+            'success': True
+        }
+
     # Delete
     @mcp.tool(
         annotations={
@@ -102,4 +328,7 @@ def register_object_store_tools(mcp):
         """Delete the Object Store file of a specific organization and 
         key.
         """
-        return await post('/object/delete', model)
+        result = await post('/object/delete', model)
+        if result.get('success'):
+            ObjectStoreIndex.remove(model.organizationId, model.key)
+        return result
@@ -1,4 +1,5 @@
 from api_connection import post
+from field_masks import field_mask
 from models import (
     EstimateOptimizationRequest,
     CreateOptimizationRequest,
@@ -44,6 +45,7 @@ def register_optimization_tools(mcp):
     @mcp.tool(
         annotations={'title': 'Read optimization', 'readOnlyHint': True}
     )
+    @field_mask
     async def read_optimization(
             model: ReadOptimizationRequest) -> ReadOptimizationResponse:
         """Read an optimization."""
@@ -53,6 +55,7 @@ def register_optimization_tools(mcp):
     @mcp.tool(
         annotations={'title': 'List optimizations', 'readOnlyHint': True}
     )
+    @field_mask
     async def list_optimizations(
             model: ListOptimizationRequest) -> ListOptimizationResponse:
         """List all the optimizations for a project."""
@@ -1,4 +1,8 @@
 from api_connection import post
+from field_masks import field_mask
+from file_content_cache import FileContentCache
+from collaboration_leases import CollaborationLeases
+from code_search import ProjectCodeSearch
 from models import (
     CreateProjectRequest, 
     ReadProjectRequest, 
@@ -23,12 +27,14 @@ def register_project_tools(mcp):
 
     # Read (singular)
     @mcp.tool(annotations={'title': 'Read project', 'readOnlyHint': True})
+    @field_mask
     async def read_project(model: ReadProjectRequest) -> ProjectListResponse:
         """List the details of a project or a set of recent projects."""
         return await post('/projects/read', model)
     
     # Read (all)
     @mcp.tool(annotations={'title': 'List projects', 'readOnlyHint': True})
+    @field_mask
     async def list_projects() -> ProjectListResponse:
         """List the details of all projects."""
         return await post('/projects/read')
@@ -43,4 +49,7 @@ def register_project_tools(mcp):
     @mcp.tool(annotations={'title': 'Delete project', 'idempotentHint': True})
     async def delete_project(model: DeleteProjectRequest) -> RestResponse:
         """Delete a project."""
+        FileContentCache.remove(model.projectId)
+        ProjectCodeSearch.remove(model.projectId)
+        CollaborationLeases.release(model.projectId)
         return await post('/projects/delete', model)
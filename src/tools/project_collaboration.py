@@ -1,5 +1,6 @@
 from api_connection import post
-from code_source_id import add_code_source_id
+from collaboration_leases import CollaborationLeases
+from project_locks import ProjectLocks
 from models import (
     CreateCollaboratorRequest, 
     ReadCollaboratorsRequest,
@@ -75,8 +76,10 @@ def register_project_collaboration_tools(mcp):
         """Lock a project so you can edit it. 
 
         This is necessary when the project has collaborators or when an 
-        LLM is editing files on your behalf via our MCP Server."""
-        return await post(
-            '/projects/collaboration/lock/acquire', add_code_source_id(model)
-        )
+        LLM is editing files on your behalf via our MCP Server. The file 
+        tools acquire the lock automatically and keep it until the project 
+        is idle. This tool always requests the lock, with your code source 
+        Id, and keeps renewing it the same way."""
+        async with ProjectLocks.write(model.projectId):
+            return await CollaborationLeases.lock(model)
 
@@ -0,0 +1,17 @@
+from workspace_sync import WorkspaceSync
+from server_models import WorkspaceSyncStatusResponse
+
+
+def register_workspace_tools(mcp):
+    # Read sync status
+    @mcp.tool(
+        annotations={
+            'title': 'Read workspace sync status', 'readOnlyHint': True,
+            'openWorldHint': False
+        }
+    )
+    async def read_workspace_sync_status() -> WorkspaceSyncStatusResponse:
+        """Read the status of the automatic push of workspace edits, 
+        including the sync lag.
+        """
+        return WorkspaceSync.status()
@@ -0,0 +1,181 @@
+import asyncio
+import json
+import os
+from datetime import datetime, timezone
+
+from api_connection import post
+from models import ReadProjectRequest
+from organization_workspace import OrganizationWorkspace
+
+# Select where `read_file` reads the project files from when the
+# organization workspace is mounted:
+#   'local': Read the files from the disk.
+#   'verify': Read the files from the disk unless the project changed in
+#       QuantConnect Cloud after the files were written to the disk.
+#   'cloud': Always read the files with the API.
+READ_MODE = os.getenv('MOUNT_READ_MODE', 'local')
+
+# The files and directories that the LEAN CLI creates in the project
+# directories, which aren't project files in QuantConnect Cloud.
+LOCAL_ONLY_FILES = {'config.json'}
+LOCAL_ONLY_DIRECTORIES = {
+    'backtests', 'live', 'optimizations', 'storage', 'bin', 'obj',
+    '__pycache__'
+}
+# Larger files aren't source files, so don't load them in memory.
+MAX_FILE_SIZE = 4 * 1024 * 1024
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def project_directory(project_id):
+    """Return the path of a project in the organization workspace, or
+    None if the project isn't on the disk."""
+    if not OrganizationWorkspace.available:
+        return None
+    return OrganizationWorkspace.path_by_project_id.get(project_id)
+
+
+def is_project_file(name):
+    """Check if a path relative to a project directory is a project
+    file."""
+    parts = name.split('/')
+    if any(part.startswith('.') or part == '__pycache__' for part in parts):
+        return False
+    if len(parts) > 1 and parts[0] in LOCAL_ONLY_DIRECTORIES:
+        return False
+    return name not in LOCAL_ONLY_FILES and not name.endswith('.pyc')
+
+
+def find_project_file(path):
+    """Return the project Id, project directory, and file name of a path
+    in the organization workspace, or None if the path isn't a project
+    file."""
+    directory = os.path.dirname(path)
+    while directory not in OrganizationWorkspace.project_id_by_path:
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return None
+        directory = parent
+    name = os.path.relpath(path, directory).replace(os.sep, '/')
+    if not is_project_file(name):
+        return None
+    return OrganizationWorkspace.project_id_by_path[directory], directory, name
+
+
+def list_file_names(directory):
+    """Return the names of the project files in a project directory."""
+    names = []
+    for root, dir_names, file_names in os.walk(directory):
+        top_level = root == directory
+        dir_names[:] = [
+            d for d in dir_names
+            if not d.startswith('.') and d != '__pycache__' and
+            not (top_level and d in LOCAL_ONLY_DIRECTORIES)
+        ]
+        for file_name in file_names:
+            path = os.path.join(root, file_name)
+            name = os.path.relpath(path, directory).replace(os.sep, '/')
+            if is_project_file(name):
+                names.append(name)
+    return sorted(names)
+
+
+def file_versions(directory):
+    """Return the modification time and size of each project file in a
+    project directory, by name, without reading the files."""
+    versions = {}
+    for name in list_file_names(directory):
+        try:
+            stat = os.stat(os.path.join(directory, name))
+        except OSError:
+            continue
+        versions[name] = (stat.st_mtime_ns, stat.st_size)
+    return versions
+
+
+def _read_file(project_id, directory, name):
+    # Return the `ProjectFile` of a file on the disk, or None if the file
+    # isn't a readable source file.
+    path = os.path.realpath(os.path.join(directory, name))
+    directory = os.path.realpath(directory)
+    if os.path.commonpath([directory, path]) != directory:
+        return None
+    try:
+        stat = os.stat(path)
+        if stat.st_size > MAX_FILE_SIZE:
+            return None
+        with open(path, 'r', encoding='utf-8', newline='') as file:
+            content = file.read()
+    except (OSError, UnicodeDecodeError):
+        return None
+    modified = datetime.fromtimestamp(stat.st_mtime, timezone.utc)
+    return {
+        'projectId': project_id,
+        'name': name,
+        'content': content,
+        'modified': modified.strftime(TIME_FORMAT),
+        'isLibrary': False
+    }
+
+
+def _has_libraries(directory):
+    # The LEAN CLI saves the libraries of a project outside of the
+    # project directory, but the API returns their files too.
+    try:
+        with open(os.path.join(directory, 'config.json'), 'r') as f:
+            return bool(json.load(f).get('libraries'))
+    except (OSError, ValueError, AttributeError):
+        return False
+
+
+def _read_files(project_id, directory, name):
+    if name is not None:
+        file = _read_file(project_id, directory, name)
+        return None if file is None else [file]
+    if _has_libraries(directory):
+        return None
+    files = []
+    for file_name in list_file_names(directory):
+        file = _read_file(project_id, directory, file_name)
+        if file is not None:
+            files.append(file)
+    return files
+
+
+async def _is_fresh(project_id, files):
+    # Check if the project changed in QuantConnect Cloud after the files
+    # on the disk were written.
+    response = await post(
+        '/projects/read', ReadProjectRequest(projectId=project_id)
+    )
+    projects = response.get('projects') or []
+    if not response.get('success') or not projects:
+        return False
+    cloud_modified = datetime.fromisoformat(str(projects[0]['modified']))
+    if cloud_modified.tzinfo is not None:
+        cloud_modified = cloud_modified.astimezone(timezone.utc)
+    local_modified = max(
+        datetime.strptime(file['modified'], TIME_FORMAT) for file in files
+    )
+    return cloud_modified.replace(tzinfo=None) <= local_modified
+
+
+async def read_workspace_files(project_id, name=None):
+    """Read the files of a project from the organization workspace.
+
+    Returns:
+        A dictionary that respects the `ProjectFilesResponse` model, or
+        None if the files must be read with the API instead (ex: the
+        project or the file isn't on the disk).
+    """
+    if READ_MODE == 'cloud':
+        return None
+    directory = project_directory(project_id)
+    if directory is None:
+        return None
+    files = await asyncio.to_thread(_read_files, project_id, directory, name)
+    if not files:
+        return None
+    if READ_MODE == 'verify' and not await _is_fresh(project_id, files):
+        return None
+    return {'files': files, 'success': True}
@@ -0,0 +1,250 @@
+import asyncio
+import os
+import threading
+from datetime import datetime, timezone
+from time import time
+
+from api_connection import httpx
+from collaboration_leases import CollaborationLeases
+from file_content_cache import FileContentCache
+from file_writes import write_file
+from organization_workspace import OrganizationWorkspace
+from project_locks import ProjectLocks
+from workspace_files import find_project_file, list_file_names, MAX_FILE_SIZE
+from workspace_watcher import WorkspaceWatcher
+
+
+def _read_text(path):
+    with open(path, 'r', encoding='utf-8', newline='') as file:
+        return file.read()
+
+
+class WorkspaceSync:
+    """Push the edits of the project files in the organization workspace
+    to QuantConnect Cloud, so compiles always see the current code.
+
+    Set the MOUNT_AUTO_PUSH environment variable to 'true' to enable the
+    sync. It relies on the `WorkspaceWatcher` to detect the edits (so it
+    doesn't start if the watcher isn't running), waits
+    until the files stop changing for MOUNT_PUSH_DEBOUNCE seconds, and
+    then pushes the files that changed concurrently. The pushes run on
+    the event loop of the server inside `ProjectLocks.write`, like the
+    tools that edit the files. Deleting a file in the workspace doesn't
+    delete it in QuantConnect Cloud.
+    """
+
+    ENABLED = os.getenv('MOUNT_AUTO_PUSH', 'false').lower() == 'true'
+    DEBOUNCE_DELAY = float(os.getenv('MOUNT_PUSH_DEBOUNCE', '1'))
+    MAX_CONCURRENCY = 4
+    MAX_ERRORS = 10
+
+    _running = False
+    # The reason the sync isn't running, for the status.
+    _disabled_reason = (
+        'Set the MOUNT_AUTO_PUSH environment variable to true to push the '
+        'workspace edits automatically.'
+    )
+    _loop = None
+    # Guard the pending paths, the timer, and the state of the pushes,
+    # which the threads of the watcher and the event loop both use.
+    _lock = threading.Lock()
+    _push_lock = threading.Lock()
+    _timer = None
+    _pending_paths = set()
+    # The (mtime, size) and the content of each file when it was last
+    # pushed, keyed by (project Id, file name).
+    _signature_by_file = {}
+    _content_by_file = {}
+    _status = {
+        'pushedFiles': 0, 'patchedFiles': 0, 'failedFiles': 0,
+        'lastPushAt': None, 'lastLag': None, 'maxLag': None, 'errors': []
+    }
+
+    @classmethod
+    def start(cls, loop):
+        """Start pushing the edits on `loop`, the event loop of the
+        server."""
+        if not cls.ENABLED or cls._running:
+            return
+        if not OrganizationWorkspace.available:
+            cls._disabled_reason = "The organization workspace isn't mounted."
+            return
+        if not WorkspaceWatcher.is_running():
+            cls._disabled_reason = (
+                "The workspace watcher isn't running (ex: MOUNT_WATCH is "
+                "'off'), so the edits can't be detected."
+            )
+            return
+        cls._loop = loop
+        cls._running = True
+        threading.Thread(target=cls._start, daemon=True).start()
+
+    @classmethod
+    def stop(cls):
+        if cls.notify in WorkspaceWatcher.file_listeners:
+            WorkspaceWatcher.file_listeners.remove(cls.notify)
+        with cls._lock:
+            if cls._timer:
+                cls._timer.cancel()
+                cls._timer = None
+            cls._pending_paths = set()
+        cls._running = False
+
+    @classmethod
+    def status(cls):
+        """Return a dictionary that respects the
+        `WorkspaceSyncStatusResponse` model."""
+        with cls._lock:
+            pending = len(cls._pending_paths)
+            status = dict(cls._status)
+        return status | {
+            'enabled': cls._running, 'pendingChanges': pending,
+            'disabledReason': None if cls._running else cls._disabled_reason,
+            'success': True
+        }
+
+    @classmethod
+    def notify(cls, path):
+        # Queue a file (or a directory to check for changes) and restart
+        # the debounce timer.
+        with cls._lock:
+            cls._pending_paths.add(path)
+            if cls._timer:
+                cls._timer.cancel()
+            cls._timer = threading.Timer(cls.DEBOUNCE_DELAY, cls.flush)
+            cls._timer.daemon = True
+            cls._timer.start()
+
+    @classmethod
+    def flush(cls):
+        with cls._lock:
+            paths, cls._pending_paths = cls._pending_paths, set()
+            cls._timer = None
+        # Don't push the same file from two batches at the same time.
+        with cls._push_lock:
+            changes = cls._find_changes(paths)
+            if not changes:
+                return
+            try:
+                future = asyncio.run_coroutine_threadsafe(
+                    cls._push(changes), cls._loop
+                )
+            except RuntimeError:
+                # The server stopped.
+                return
+            future.result()
+
+    @classmethod
+    def _start(cls):
+        # Record the current state of the files, so only the files that
+        # change after the server starts are pushed.
+        for directory, project_id in list(
+                OrganizationWorkspace.project_id_by_path.items()):
+            for name in list_file_names(directory):
+                signature = cls._signature(os.path.join(directory, name))
+                if signature:
+                    with cls._lock:
+                        cls._signature_by_file[(project_id, name)] = signature
+        WorkspaceWatcher.file_listeners.append(cls.notify)
+
+    @staticmethod
+    def _signature(path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    @classmethod
+    def _find_changes(cls, paths):
+        # Return the project files that changed since they were last
+        # pushed, as (key, path, signature) tuples.
+        path_by_file = {}
+        for path in paths:
+            if os.path.isdir(path):
+                root = path.rstrip(os.sep) + os.sep
+                for directory, project_id in list(
+                        OrganizationWorkspace.project_id_by_path.items()):
+                    if directory == path or directory.startswith(root):
+                        for name in list_file_names(directory):
+                            path_by_file[(project_id, name)] = \
+                                os.path.join(directory, name)
+            elif project_file := find_project_file(path):
+                project_id, _, name = project_file
+                path_by_file[(project_id, name)] = path
+        changes = []
+        for key, path in path_by_file.items():
+            signature = cls._signature(path)
+            # Skip the deleted files and the files that aren't source
+            # files.
+            if signature is None or signature[1] > MAX_FILE_SIZE:
+                continue
+            with cls._lock:
+                pushed_signature = cls._signature_by_file.get(key)
+            if signature != pushed_signature:
+                changes.append((key, path, signature))
+        return changes
+
+    @classmethod
+    async def _push(cls, changes):
+        semaphore = asyncio.Semaphore(cls.MAX_CONCURRENCY)
+
+        async def push(key, path, signature):
+            project_id, name = key
+            async with semaphore:
+                try:
+                    content = await asyncio.to_thread(_read_text, path)
+                except (OSError, UnicodeDecodeError):
+                    return
+                # Wait for the tool calls that edit the project, so the
+                # previous content includes their writes.
+                async with ProjectLocks.write(project_id):
+                    previous_content = FileContentCache.content(
+                        project_id, name
+                    )
+                    with cls._lock:
+                        if previous_content is None:
+                            previous_content = cls._content_by_file.get(key)
+                    if content != previous_content:
+                        await CollaborationLeases.acquire(project_id)
+                        try:
+                            response, method = await write_file(
+                                project_id, name, content, previous_content,
+                                create=True
+                            )
+                        except httpx.HTTPError as e:
+                            response = {
+                                'errors': [f'{type(e).__name__}: {e}']
+                            }
+                            method = None
+                        if not response.get('success'):
+                            cls._record_failure(key, response)
+                            return
+                        cls._record_push(signature, method)
+                with cls._lock:
+                    cls._content_by_file[key] = content
+                    cls._signature_by_file[key] = signature
+
+        await asyncio.gather(*[push(*change) for change in changes])
+
+    @classmethod
+    def _record_push(cls, signature, method):
+        # The lag is the time between the last edit and the push.
+        lag = round(max(0, time() - signature[0] / 1e9), 3)
+        with cls._lock:
+            cls._status['pushedFiles'] += 1
+            if method == 'patch':
+                cls._status['patchedFiles'] += 1
+            cls._status['lastPushAt'] = datetime.now(timezone.utc).isoformat()
+            cls._status['lastLag'] = lag
+            cls._status['maxLag'] = max(lag, cls._status['maxLag'] or 0)
+
+    @classmethod
+    def _record_failure(cls, key, response):
+        errors = response.get('errors') or ['The API rejected the file.']
+        with cls._lock:
+            cls._status['failedFiles'] += 1
+            cls._status['errors'] = (
+                cls._status['errors']
+                + [f'{key[0]}/{key[1]}: {e}' for e in errors]
+            )[-cls.MAX_ERRORS:]
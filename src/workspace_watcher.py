@@ -0,0 +1,140 @@
+import os
+import threading
+
+from organization_workspace import OrganizationWorkspace
+
+# watchdog is optional. Without it, the watcher polls the workspace.
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:
+    Observer = None
+    FileSystemEventHandler = object
+
+
+class _EventHandler(FileSystemEventHandler):
+
+    def on_any_event(self, event):
+        # Only the directories and the config.json files define the
+        # projects. A directory is "modified" whenever its content 
+        # changes, so ignore those events.
+        if event.event_type in ['opened', 'closed_no_write']:
+            return
+        if event.is_directory and event.event_type == 'modified':
+            return
+        for path in [event.src_path, getattr(event, 'dest_path', '')]:
+            if not path:
+                continue
+            path = os.fsdecode(path)
+            if event.is_directory or os.path.basename(path) == 'config.json':
+                if event.event_type != 'closed':
+                    WorkspaceWatcher.notify(os.path.dirname(path))
+            else:
+                for listener in WorkspaceWatcher.file_listeners:
+                    listener(path)
+
+
+class WorkspaceWatcher:
+    """Keep the project index of `OrganizationWorkspace` current while
+    the server runs.
+
+    The watcher uses the native file system events (ex: inotify) when
+    watchdog is installed and polls the workspace otherwise. Set the
+    MOUNT_WATCH environment variable to 'poll' to always poll (ex: for
+    Docker Desktop mounts, which don't forward the events) or to 'off'
+    to disable the watcher.
+    """
+
+    MODE = os.getenv('MOUNT_WATCH', 'auto')
+    # Wait for this many seconds without events before rescanning, so a
+    # burst of events (ex: `lean cloud pull`) only triggers one rescan.
+    DEBOUNCE_DELAY = float(os.getenv('MOUNT_WATCH_DEBOUNCE', '0.5'))
+    POLL_INTERVAL = float(os.getenv('MOUNT_POLL_INTERVAL', '5'))
+
+    # Functions that are called with the path of each file that changes.
+    # When the watcher polls, they're called with the path of the 
+    # workspace instead.
+    file_listeners = []
+
+    _observer = None
+    _poller = None
+    _stopped = threading.Event()
+    _timer = None
+    _pending_paths = set()
+    _lock = threading.Lock()
+
+    @classmethod
+    def start(cls):
+        if cls.MODE == 'off' or not OrganizationWorkspace.available:
+            return
+        if cls._observer or cls._poller:
+            return
+        cls._stopped.clear()
+        if Observer is not None and cls.MODE != 'poll':
+            observer = Observer()
+            observer.daemon = True
+            try:
+                observer.schedule(
+                    _EventHandler(), OrganizationWorkspace.MOUNT_DESTINATION,
+                    recursive=True
+                )
+                observer.start()
+                cls._observer = observer
+                return
+            except OSError:
+                # Ex: the inotify watch limit is reached.
+                pass
+        cls._poller = threading.Thread(target=cls._poll, daemon=True)
+        cls._poller.start()
+
+    @classmethod
+    def is_running(cls):
+        return bool(cls._observer or cls._poller)
+
+    @classmethod
+    def stop(cls):
+        cls._stopped.set()
+        if cls._observer:
+            cls._observer.stop()
+            cls._observer.join()
+            cls._observer = None
+        if cls._poller:
+            cls._poller.join()
+            cls._poller = None
+        with cls._lock:
+            if cls._timer:
+                cls._timer.cancel()
+                cls._timer = None
+            cls._pending_paths = set()
+
+    @classmethod
+    def notify(cls, path):
+        # Queue a directory to rescan and restart the debounce timer.
+        with cls._lock:
+            cls._pending_paths.add(path)
+            if cls._timer:
+                cls._timer.cancel()
+            cls._timer = threading.Timer(cls.DEBOUNCE_DELAY, cls.flush)
+            cls._timer.daemon = True
+            cls._timer.start()
+
+    @classmethod
+    def flush(cls):
+        # Rescan the queued directories. Skip the directories that are
+        # inside another queued directory since rescanning the outer one
+        # covers them.
+        with cls._lock:
+            paths, cls._pending_paths = cls._pending_paths, set()
+            cls._timer = None
+        for path in sorted(paths):
+            if not any(
+                    path.startswith(other.rstrip(os.sep) + os.sep)
+                    for other in paths):
+                OrganizationWorkspace.refresh(path)
+
+    @classmethod
+    def _poll(cls):
+        while not cls._stopped.wait(cls.POLL_INTERVAL):
+            OrganizationWorkspace.refresh(OrganizationWorkspace.MOUNT_DESTINATION)
+            for listener in cls.file_listeners:
+                listener(OrganizationWorkspace.MOUNT_DESTINATION)
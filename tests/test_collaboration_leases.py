@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+
+from collaboration_leases import CollaborationLeases
+from code_source_id import AGENT_NAME
+from models import LockCollaboratorRequest
+from project_locks import ProjectLocks
+
+
+@pytest.fixture
+def requests(monkeypatch):
+    # Record the lock requests instead of sending them.
+    requests = []
+
+    async def post(endpoint, model):
+        requests.append(model)
+        return {'success': True, 'ttl': 0.1}
+
+    monkeypatch.setattr('collaboration_leases.post', post)
+    monkeypatch.setattr(CollaborationLeases, '_lease_by_project', {})
+    yield requests
+    for project_id in list(CollaborationLeases._lease_by_project):
+        CollaborationLeases.release(project_id)
+
+
+@pytest.mark.asyncio
+async def test_collaboration_leases(requests):
+    # The first edit acquires the lock and the next edits reuse it.
+    for _ in range(2):
+        assert (await CollaborationLeases.acquire(1))['success']
+    assert [(m.projectId, m.codeSourceId) for m in requests] == \
+        [(1, AGENT_NAME)]
+    # An explicit lock always reaches the API, with its code source Id,
+    # and the lock is then renewed with that code source Id.
+    model = LockCollaboratorRequest(projectId=1, codeSourceId='IDE')
+    assert (await CollaborationLeases.lock(model))['success']
+    assert requests[-1] is model
+    assert CollaborationLeases._lease_by_project[1]['model'] is model
+
+
+@pytest.mark.asyncio
+async def test_collaboration_lease_renewals(requests, monkeypatch):
+    monkeypatch.setattr(CollaborationLeases, 'IDLE_TIMEOUT', 0.25)
+    await CollaborationLeases.acquire(1)
+    # The lock lasts for the TTL of the response, so it's renewed after
+    # 0.08 seconds, once the calls that modify the project finish.
+    async with ProjectLocks.write(1):
+        await asyncio.sleep(0.15)
+        assert len(requests) == 1
+    await asyncio.sleep(0.01)
+    assert len(requests) == 2
+    # The renewals stop once the project is idle.
+    await asyncio.sleep(0.4)
+    assert 1 not in CollaborationLeases._lease_by_project
+    renewals = len(requests)
+    await asyncio.sleep(0.2)
+    assert len(requests) == renewals
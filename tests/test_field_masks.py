@@ -0,0 +1,94 @@
+import pytest
+from mcp.server.fastmcp import FastMCP
+
+from field_masks import field_mask, parse_fields, project_response
+from models import BacktestResponse, ProjectListResponse
+
+BACKTEST_RESPONSE = {
+    'success': True,
+    'errors': [],
+    'backtest': {
+        'backtestId': 'abc',
+        'status': 'Completed.',
+        'statistics': {'Total Orders': '10', 'Net Profit': '5%'},
+        'runtimeStatistics': {'Equity': '$100', 'Fees': '-$1'},
+        'rollingWindow': {
+            'M1_2020': {'portfolioStatistics': {'sharpeRatio': 1.2, 'drawdown': 0.1}}
+        }
+    }
+}
+
+
+def test_parse_fields():
+    assert parse_fields(['a.b', 'a.c.d', 'e', 'a.c']) == {
+        'a': {'b': {}, 'c': {}}, 'e': {}
+    }
+    with pytest.raises(ValueError):
+        parse_fields(['a..b'])
+
+
+def test_project_response():
+    # The paths accept the field names and the API aliases.
+    assert project_response(
+        BACKTEST_RESPONSE,
+        ['backtest.statistics.Total_Orders', 'backtest.runtimeStatistics.Equity'],
+        BacktestResponse
+    ) == {
+        'success': True,
+        'errors': [],
+        'backtest': {
+            'statistics': {'Total Orders': '10'},
+            'runtimeStatistics': {'Equity': '$100'}
+        }
+    }
+    # '*' selects all the keys of a map.
+    projected = project_response(
+        BACKTEST_RESPONSE,
+        ['backtest.rollingWindow.*.portfolioStatistics.sharpeRatio'],
+        BacktestResponse
+    )
+    assert projected['backtest'] == {
+        'rollingWindow': {'M1_2020': {'portfolioStatistics': {'sharpeRatio': 1.2}}}
+    }
+    # Unknown fields are errors.
+    projected = project_response(
+        BACKTEST_RESPONSE, ['backtest.sharpe'], BacktestResponse
+    )
+    assert not projected['success']
+    # Unsuccessful responses are returned unchanged.
+    failure = {'success': False, 'errors': ['Backtest not found.']}
+    assert project_response(failure, ['backtest'], BacktestResponse) == failure
+
+
+def test_project_response_keeps_required_fields():
+    project = {
+        'projectId': 1, 'organizationId': 'abc', 'name': 'Project',
+        'modified': '2024-01-01 00:00:00', 'created': '2024-01-01 00:00:00',
+        'ownerId': 2, 'language': 'Py', 'description': 'A long description.'
+    }
+    projected = project_response(
+        {'success': True, 'projects': [project]}, ['projects.name'],
+        ProjectListResponse
+    )
+    assert 'description' not in projected['projects'][0]
+    ProjectListResponse.model_validate(projected)
+
+
+@pytest.mark.asyncio
+async def test_field_mask():
+    mcp = FastMCP('test')
+
+    @mcp.tool()
+    @field_mask
+    async def read_backtest() -> BacktestResponse:
+        return BACKTEST_RESPONSE
+
+    tool = mcp._tool_manager.get_tool('read_backtest')
+    assert 'fields' in tool.parameters['properties']
+    _, structured_response = await mcp.call_tool(
+        'read_backtest', {'fields': ['backtest.status']}
+    )
+    assert structured_response['backtest']['status'] == 'Completed.'
+    assert structured_response['backtest']['statistics'] is None
+    _, structured_response = await mcp.call_tool('read_backtest', {})
+    assert structured_response['backtest']['statistics'] is not None
@@ -1,7 +1,14 @@
 import pytest
 import json
+import os
 
 from main import mcp
+import organization_code_search
+import workspace_files
+from code_search import ProjectCodeSearch, TrigramIndex
+from file_content_cache import FileContentCache
+from organization_code_search import OrganizationCodeSearch
+from organization_workspace import OrganizationWorkspace
 from test_project import Project
 from test_compile import Compile
 from test_project_collaboration import ProjectCollaboration, COLLABORATOR_ID
@@ -21,6 +28,11 @@ from models import (
     RestResponse,
     ProjectFilesResponse
 )
+from server_models import (
+    SearchProjectFilesRequest,
+    FileWriteStatisticsResponse,
+    CodeSearchResponse
+)
 
 # Static helpers for common operations:
 class Files:
@@ -68,6 +80,28 @@ class Files:
             RestResponse
         )
 
+    @staticmethod
+    async def read_write_statistics():
+        return await validate_models(
+            mcp, 'read_file_write_statistics', 
+            output_class=FileWriteStatisticsResponse
+        )
+
+    @staticmethod
+    async def search(project_id, query, **kwargs):
+        return await validate_models(
+            mcp, 'search_project_files', 
+            {'projectId': project_id, 'query': query} | kwargs,
+            CodeSearchResponse
+        )
+
+    @staticmethod
+    async def search_organization(query, **kwargs):
+        return await validate_models(
+            mcp, 'search_organization_files', {'query': query} | kwargs,
+            CodeSearchResponse
+        )
+
     @staticmethod
     async def setup_project(language, algorithm=None):
         # Create a project.
@@ -263,6 +297,25 @@ class TestFiles:
         await ProjectCollaboration.delete(project_id, COLLABORATOR_ID)
         await Project.delete(project_id)
 
+    @pytest.mark.asyncio
+    async def test_edit_files_during_project_collaboration_without_lock(self):
+        # Create a project and add a collaborator.
+        project_id = (await Project.create()).projectId
+        await ProjectCollaboration.create(
+            project_id, COLLABORATOR_ID, True, True
+        )
+        await Files.read(project_id)
+        # The first edit acquires the lock, so the edits succeed without
+        # calling `lock_project_with_collaborators`.
+        await Files.create(project_id, 'test_file_1.py')
+        await Files.update(
+            project_id, name='test_file_1.py', content='x = 1\n'
+        )
+        await Files.delete(project_id, 'test_file_1.py')
+        # Remove the collaborator and delete the project to clean up.
+        await ProjectCollaboration.delete(project_id, COLLABORATOR_ID)
+        await Project.delete(project_id)
+
     @pytest.mark.asyncio
     @pytest.mark.parametrize('language', ['Py', 'C#'])
     async def test_create_file_on_with_invalid_args(self, language):
@@ -348,6 +401,208 @@ class TestFiles:
         # Delete the project to clean up.
         await Project.delete(id_)
 
+    @pytest.mark.asyncio
+    async def test_read_file_from_workspace(self, tmp_path, monkeypatch):
+        # Mount a workspace with a project that only exists on the disk.
+        id_ = 1
+        (tmp_path / 'utils').mkdir()
+        (tmp_path / 'backtests').mkdir()
+        (tmp_path / 'main.py').write_text('a = 1\n')
+        (tmp_path / 'utils' / 'helpers.py').write_text('b = 2\n')
+        (tmp_path / 'backtests' / 'result.json').write_text('{}')
+        (tmp_path / 'config.json').write_text(json.dumps({'cloud-id': id_}))
+        monkeypatch.setattr(OrganizationWorkspace, 'available', True)
+        monkeypatch.setattr(
+            OrganizationWorkspace, 'path_by_project_id', {id_: str(tmp_path)}
+        )
+        # Try to read a file.
+        files = (await Files.read(id_, name='main.py')).files
+        assert len(files) == 1
+        assert files[0].projectId == id_
+        assert files[0].content == 'a = 1\n'
+        # Try to read all the files. The files that the LEAN CLI creates
+        # aren't project files.
+        files = (await Files.read(id_)).files
+        assert [f.name for f in files] == ['main.py', 'utils/helpers.py']
+
+    @pytest.mark.asyncio
+    async def test_read_file_subset_from_workspace(self, tmp_path, monkeypatch):
+        # Mount a workspace with a project that only exists on the disk.
+        id_ = 3
+        (tmp_path / 'alpha').mkdir()
+        (tmp_path / 'main.py').write_text('a = 1\nb = 2\nc = 3\n')
+        (tmp_path / 'alpha' / 'momentum.py').write_text('d = 4\ne = 5\n')
+        (tmp_path / 'alpha' / 'notes.txt').write_text('f\n')
+        (tmp_path / 'config.json').write_text(json.dumps({'cloud-id': id_}))
+        monkeypatch.setattr(OrganizationWorkspace, 'available', True)
+        monkeypatch.setattr(
+            OrganizationWorkspace, 'path_by_project_id', {id_: str(tmp_path)}
+        )
+        # Read a few files and a glob pattern.
+        files = (await Files.read(id_, names=['main.py', 'alpha/*.py'])).files
+        assert [f.name for f in files] == ['alpha/momentum.py', 'main.py']
+        # Read a range of lines.
+        files = (await Files.read(id_, name='main.py', startLine=2)).files
+        assert files[0].content == 'b = 2\nc = 3\n'
+        files = (
+            await Files.read(id_, names=['*.py'], startLine=1, endLine=1)
+        ).files
+        assert [f.content for f in files] == ['d = 4\n', 'a = 1\n']
+        # Try to read a file that doesn't exist and an invalid range.
+        await validate_models(
+            mcp, 'read_file', 
+            {'projectId': id_, 'names': ['main.py', 'missing.py']}, 
+            success_expected=False
+        )
+        await validate_models(
+            mcp, 'read_file', 
+            {'projectId': id_, 'name': 'main.py', 'startLine': 3, 'endLine': 2},
+            success_expected=False
+        )
+
+    @pytest.mark.asyncio
+    async def test_read_file_subset_has_the_same_fields(self):
+        # Create a project and read all its files, which caches them.
+        id_ = (await Project.create(language='Py')).projectId
+        all_files = (await Files.read(id_)).files
+        # Ensure a glob pattern returns the same files and fields.
+        files = (await Files.read(id_, names=['*'])).files
+        assert files == all_files
+        # Delete the project to clean up.
+        await Project.delete(id_)
+
+    @pytest.mark.asyncio
+    async def test_search_project_files_in_workspace(
+            self, tmp_path, monkeypatch):
+        # Mount a workspace with a project that only exists on the disk.
+        id_ = 2
+        (tmp_path / 'utils').mkdir()
+        (tmp_path / 'main.py').write_text(
+            'class Algo:\n    def initialize(self):\n'
+            '        self.sma = self.SMA("SPY", 20)\n'
+        )
+        (tmp_path / 'utils' / 'helpers.py').write_text('def sma(x):\n    pass\n')
+        (tmp_path / 'config.json').write_text(json.dumps({'cloud-id': id_}))
+        monkeypatch.setattr(OrganizationWorkspace, 'available', True)
+        monkeypatch.setattr(
+            OrganizationWorkspace, 'path_by_project_id', {id_: str(tmp_path)}
+        )
+        # Search for a string.
+        response = await Files.search(id_, 'sma', contextLines=1)
+        assert response.total == 2
+        assert response.filesSearched == 2
+        match = response.matches[0]
+        assert (match.name, match.line) == ('main.py', 3)
+        assert match.before == ['    def initialize(self):']
+        assert match.after == []
+        # Search for a case-sensitive regular expression.
+        response = await Files.search(
+            id_, r'self\.SMA\(', regex=True, caseSensitive=True
+        )
+        assert [(m.name, m.line) for m in response.matches] == [('main.py', 3)]
+        # Apply the limit.
+        response = await Files.search(id_, 'sma', limit=1)
+        assert len(response.matches) == 1
+        assert response.total == 2
+        # Search the file after an edit.
+        (tmp_path / 'main.py').write_text('x = 1\n')
+        response = await Files.search(id_, 'sma')
+        assert [m.name for m in response.matches] == ['utils/helpers.py']
+        # Try to search for an invalid regular expression.
+        await validate_models(
+            mcp, 'search_project_files', 
+            {'projectId': id_, 'query': '(', 'regex': True}, 
+            success_expected=False
+        )
+        # Try to search with an invalid limit.
+        await ensure_request_raises_validation_error(
+            'search_project_files', SearchProjectFilesRequest,
+            {'projectId': id_, 'query': 'sma', 'limit': 0}
+        )
+
+    def test_project_search_indexes_are_bounded(self, monkeypatch):
+        monkeypatch.setattr(ProjectCodeSearch, 'MAX_FILES', 2)
+        monkeypatch.setattr(ProjectCodeSearch, '_index_by_project', {})
+        for id_ in (1, 2, 1, 3):
+            ProjectCodeSearch.search(id_, {'main.py': 'x = 1\n'}, 'x')
+        # The index of the least recently searched project is dropped.
+        assert list(ProjectCodeSearch._index_by_project) == [1, 3]
+        ProjectCodeSearch.remove(1)
+        assert list(ProjectCodeSearch._index_by_project) == [3]
+
+    @pytest.mark.asyncio
+    async def test_search_organization_files(self):
+        # Create a project with a file that contains unique tokens.
+        id_ = (await Project.create()).projectId
+        token = f'SearchToken{id_}'
+        await Files.create(
+            id_, 'search_test.py', content=f'# {token}\nx = 1  # Other{token}\n'
+        )
+        # Search for the tokens. The files must contain all the tokens.
+        response = await Files.search_organization(f'{token} Other{token}')
+        assert [(m.projectId, m.line) for m in response.matches] == \
+            [(id_, 1), (id_, 2)]
+        assert response.matches[0].score > 0
+        response = await Files.search_organization(f'{token} Missing{token}')
+        assert response.total == 0
+        # Search for a regular expression.
+        response = await Files.search_organization(
+            f'x = \\d +# Other{token}', regex=True
+        )
+        assert [(m.projectId, m.line) for m in response.matches] == [(id_, 2)]
+        # Update the file. The next search reads the project again.
+        await Files.update(id_, name='search_test.py', content='x = 1\n')
+        response = await Files.search_organization(token)
+        assert response.total == 0
+        # Delete the project to clean up.
+        await Project.delete(id_)
+
+    @pytest.mark.asyncio
+    async def test_search_organization_files_in_workspace(
+            self, tmp_path, monkeypatch):
+        # Mount a workspace with a project that only exists on the disk.
+        id_ = 4
+        (tmp_path / 'main.py').write_text('sma = 1\n')
+        (tmp_path / 'config.json').write_text(json.dumps({'cloud-id': id_}))
+        monkeypatch.setattr(OrganizationWorkspace, 'available', True)
+        monkeypatch.setattr(
+            OrganizationWorkspace, 'path_by_project_id', {id_: str(tmp_path)}
+        )
+        for name in ('_index', '_modified_by_project', '_versions_by_project'):
+            value = TrigramIndex() if name == '_index' else {}
+            monkeypatch.setattr(OrganizationCodeSearch, name, value)
+
+        async def post(endpoint, model=None):
+            project = {
+                'projectId': id_, 'name': 'Project',
+                'modified': '2024-01-01 00:00:00'
+            }
+            return {'projects': [project], 'success': True}
+
+        reads = []
+
+        async def read_workspace_files(project_id, name=None):
+            reads.append(project_id)
+            return await workspace_files.read_workspace_files(project_id, name)
+
+        monkeypatch.setattr(organization_code_search, 'post', post)
+        monkeypatch.setattr(
+            organization_code_search, 'read_workspace_files',
+            read_workspace_files
+        )
+        cached_files = FileContentCache.cached_files()
+        response = await OrganizationCodeSearch.search('sma')
+        assert response['total'] == 1
+        # The project is only read again when one of its files changes.
+        await OrganizationCodeSearch.search('sma')
+        assert reads == [id_]
+        (tmp_path / 'main.py').write_text('ema = 1\n')
+        os.utime(tmp_path / 'main.py', ns=(0, 0))
+        response = await OrganizationCodeSearch.search('sma')
+        assert response['total'] == 0
+        assert reads == [id_, id_]
+        # The search doesn't fill the cache of the file edits.
+        assert FileContentCache.cached_files() == cached_files
 
     @pytest.mark.asyncio
     @pytest.mark.parametrize('language', ['Py', 'C#'])
@@ -415,6 +670,51 @@ class TestFiles:
         # Delete the project to clean up.
         await Project.delete(id_)
 
+    @pytest.mark.asyncio
+    async def test_update_contents_skips_unchanged_content(self):
+        # Create a project and read the default code file.
+        id_ = (await Project.create(language='Py')).projectId
+        name = self._default_file_names['Py'][0]
+        content = (await Files.read(id_, name=name)).files[0].content
+        skipped_writes = (await Files.read_write_statistics()).skippedWrites
+        # Try to update the file with the content it already has.
+        response = await Files.update(id_, name=name, content=content)
+        statistics = await Files.read_write_statistics()
+        assert statistics.skippedWrites == skipped_writes + 1
+        # Ensure the response still has the file.
+        assert response.files[0].content == content
+        # Ensure the updates that change the file aren't skipped.
+        new_content = self._basic_code_file['Py']
+        await Files.update(id_, name=name, content=new_content)
+        statistics = await Files.read_write_statistics()
+        assert statistics.skippedWrites == skipped_writes + 1
+        file = (await Files.read(id_, name=name)).files[0]
+        assert file.content == new_content
+        # Delete the project to clean up.
+        await Project.delete(id_)
+
+    @pytest.mark.asyncio
+    async def test_update_contents_sends_small_changes_as_patch(self):
+        # Create a project with a large code file.
+        id_ = (await Project.create(language='Py')).projectId
+        name = 'test_file.py'
+        lines = [f'a_{i} = {i}\n' for i in range(200)]
+        await Files.create(id_, name, content=''.join(lines))
+        statistics = await Files.read_write_statistics()
+        # Try to change one line of the file.
+        lines[100] = 'a_100 = -1\n'
+        response = await Files.update(id_, name=name, content=''.join(lines))
+        new_statistics = await Files.read_write_statistics()
+        assert new_statistics.patchedWrites == statistics.patchedWrites + 1
+        # Ensure the response has the file, like a full update.
+        assert response.files[0].content == ''.join(lines)
+        assert new_statistics.bytesSaved > statistics.bytesSaved
+        # Ensure the file has the new content.
+        file = (await Files.read(id_, name=name)).files[0]
+        assert file.content == ''.join(lines)
+        # Delete the project to clean up.
+        await Project.delete(id_)
+
     @pytest.mark.asyncio
     @pytest.mark.parametrize('language', ['Py', 'C#'])
     async def test_update_file_contents_with_invalid_args(self, language):
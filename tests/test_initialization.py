@@ -1,6 +1,12 @@
 import pytest
+from mcp.server.fastmcp import FastMCP
 
+import local_cache
 from main import mcp
+from schema_compaction import compact_schema, compact_tools, first_sentence
+from tool_profiles import ToolProfiles
+from tool_schema_cache import ToolSchemaCache, CachedSchemaTool
+from tools.files import register_file_tools
 
 
 class TestInitialization:
@@ -8,3 +14,93 @@ class TestInitialization:
     @pytest.mark.asyncio
     async def test_instructions(self):
         assert True #mcp.instructions
+
+    @pytest.mark.asyncio
+    async def test_tool_schema_cache(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(local_cache, 'CACHE_DIRECTORY', str(tmp_path))
+        monkeypatch.setattr(ToolSchemaCache, 'ENABLED', True)
+        tools_by_start = []
+        for _ in range(2):
+            # Start a server and register some tools.
+            server = FastMCP('test')
+            ToolSchemaCache.install(server)
+            register_file_tools(server)
+            ToolSchemaCache.save()
+            tools_by_start.append(await server.list_tools())
+        # The second start reuses the schemas of the first one.
+        assert tools_by_start[0] == tools_by_start[1]
+        tool = server._tool_manager.get_tool('read_file_write_statistics')
+        assert isinstance(tool, CachedSchemaTool)
+        # The metadata is built when it's first read.
+        assert tool.__dict__['fn_metadata'] is None
+        assert tool.fn_metadata.output_schema == tool.output_schema
+        # The tools still validate their results when they're called.
+        _, structured_response = await server.call_tool(
+            'read_file_write_statistics', {}
+        )
+        assert structured_response['success']
+        # A change to the code regenerates the schemas.
+        monkeypatch.setattr(ToolSchemaCache, 'key', lambda: 'changed')
+        server = FastMCP('test')
+        ToolSchemaCache.install(server)
+        register_file_tools(server)
+        tool = server._tool_manager.get_tool('read_file_write_statistics')
+        assert not isinstance(tool, CachedSchemaTool)
+
+    @pytest.mark.asyncio
+    async def test_schema_compaction(self):
+        assert first_sentence('Read a file (e.g. main.py). Then...') == \
+            'Read a file (e.g. main.py).'
+        assert first_sentence('Use version 2.0\nof the API') == \
+            'Use version 2.0 of the API'
+        # Identical definitions are merged.
+        schema = compact_schema({
+            '$defs': {
+                'A': {'enum': ['x'], 'title': 'A'},
+                'B': {'enum': ['x'], 'title': 'B'}
+            },
+            'properties': {
+                'a': {'$ref': '#/$defs/A'}, 'b': {'$ref': '#/$defs/B'}
+            }
+        })
+        assert schema == {
+            '$defs': {'A': {'enum': ['x']}},
+            'properties': {
+                'a': {'$ref': '#/$defs/A'}, 'b': {'$ref': '#/$defs/A'}
+            }
+        }
+        server = FastMCP('test')
+        register_file_tools(server)
+        sizes = compact_tools(server, compact=True, output_schemas=False)
+        assert all(size['after'] < size['before'] for size in sizes)
+        tools = {tool.name: tool for tool in await server.list_tools()}
+        assert tools['read_file'].outputSchema is None
+        # The tools still return structured content.
+        _, structured_response = await server.call_tool(
+            'read_file_write_statistics', {}
+        )
+        assert structured_response['success']
+
+    @pytest.mark.asyncio
+    async def test_tool_profiles(self, monkeypatch):
+        monkeypatch.setenv('MCP_TOOL_PROFILE', 'minimal')
+        assert ToolProfiles.resolve() == 'minimal'
+        assert ToolProfiles.resolve(['--profile', 'full']) == 'full'
+        server = FastMCP('test')
+        assert ToolProfiles.register(server, 'minimal') == 9
+        tool_names = {tool.name for tool in await server.list_tools()}
+        assert tool_names == {
+            name for names in ToolProfiles.PROFILES['minimal']['tools'].values()
+            for name in names
+        }
+        # The full profile registers all the tools of the main server.
+        server = FastMCP('test')
+        ToolProfiles.register(server, 'full')
+        assert len(await server.list_tools()) == len(await mcp.list_tools())
+        # A profile can't reference a tool that doesn't exist.
+        monkeypatch.setitem(ToolProfiles.PROFILES, 'test', {
+            'name': 'test', 'instructions': 'instructions.md',
+            'tools': {'tools.files': ['read_file', 'read_files']}
+        })
+        with pytest.raises(ValueError):
+            ToolProfiles.register(FastMCP('test'), 'test')
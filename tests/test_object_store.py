@@ -6,6 +6,7 @@ from zipfile import ZipFile
 from io import BytesIO
 
 from main import mcp
+from organization_workspace import OrganizationWorkspace
 from utils import (
     validate_models, 
     ensure_request_fails, 
@@ -14,7 +15,6 @@ from utils import (
     create_timestamp,
 )
 from models import (
-    ObjectStoreBinaryFile,
     GetObjectStorePropertiesRequest,
     GetObjectStoreJobIdRequest,
     GetObjectStoreURLRequest,
@@ -25,6 +25,18 @@ from models import (
     ListObjectStoreResponse,
     RestResponse
 )
+from server_models import (
+    UploadObjectStoreFileRequest,
+    UploadObjectStoreFilesRequest,
+    SyncObjectStoreDirectoryRequest,
+    DownloadObjectStoreFilesRequest,
+    SearchObjectStoreIndexRequest,
+    ObjectStoreTransferResponse,
+    ObjectStoreSyncResponse,
+    RefreshObjectStoreIndexResponse,
+    ObjectStoreIndexResponse,
+    ObjectStoreUsageResponse
+)
 
 # Load the organization Id from the environment variables.
 ORGANIZATION_ID = os.getenv('QUANTCONNECT_ORGANIZATION_ID')
@@ -45,6 +57,55 @@ class ObjectStore:
             RestResponse
         )
 
+    @staticmethod
+    async def upload_files(organization_id, files, **kwargs):
+        return await validate_models(
+            mcp, 'upload_object_files', 
+            {'organizationId': organization_id, 'files': files} | kwargs,
+            ObjectStoreTransferResponse
+        )
+
+    @staticmethod
+    async def sync(organization_id, path, **kwargs):
+        return await validate_models(
+            mcp, 'sync_object_store_directory', 
+            {'organizationId': organization_id, 'path': path} | kwargs,
+            ObjectStoreSyncResponse
+        )
+
+    @staticmethod
+    async def download_files(organization_id, keys, path, **kwargs):
+        return await validate_models(
+            mcp, 'download_object_files', 
+            {'organizationId': organization_id, 'keys': keys, 'path': path} 
+            | kwargs,
+            ObjectStoreTransferResponse
+        )
+
+    @staticmethod
+    async def refresh_index(organization_id, **kwargs):
+        return await validate_models(
+            mcp, 'refresh_object_store_index', 
+            {'organizationId': organization_id} | kwargs,
+            RefreshObjectStoreIndexResponse
+        )
+
+    @staticmethod
+    async def search_index(organization_id, **kwargs):
+        return await validate_models(
+            mcp, 'search_object_store_index', 
+            {'organizationId': organization_id} | kwargs,
+            ObjectStoreIndexResponse
+        )
+
+    @staticmethod
+    async def read_usage(organization_id, **kwargs):
+        return await validate_models(
+            mcp, 'read_object_store_usage', 
+            {'organizationId': organization_id} | kwargs,
+            ObjectStoreUsageResponse
+        )
+
     @staticmethod
     async def read_properties(organization_id, key):
         output_model = await validate_models(
@@ -135,7 +196,7 @@ class TestObjectStore:
     async def test_upload_with_invalid_args(self):
         # Test the invalid requests.
         tool_name = 'upload_object'
-        class_ = ObjectStoreBinaryFile
+        class_ = UploadObjectStoreFileRequest
         minimal_payload = {
             'organizationId': ORGANIZATION_ID, 
             'key': await self._create_key(), 
@@ -151,6 +212,126 @@ class TestObjectStore:
             mcp, tool_name, minimal_payload | {'organizationId': ' '}
         )
 
+    @pytest.mark.asyncio
+    async def test_upload_files(self, tmp_path, monkeypatch):
+        # Mount a temporary workspace with a few files.
+        monkeypatch.setattr(
+            OrganizationWorkspace, 'MOUNT_DESTINATION', str(tmp_path)
+        )
+        sizes = {'small.txt': 13, 'large.bin': 3 * 1024 * 1024 + 7}
+        for name, size in sizes.items():
+            (tmp_path / name).write_bytes(os.urandom(size))
+        root_dir = await self._create_key()
+        files = [
+            {'key': f'{root_dir}/{name}', 'path': name} for name in sizes
+        ]
+        # Try to upload the files.
+        output_model = await ObjectStore.upload_files(
+            ORGANIZATION_ID, files, maxConcurrency=2
+        )
+        assert output_model.bytesTransferred == sum(sizes.values())
+        assert all(result.success for result in output_model.results)
+        # Ensure the Object Store has the complete files.
+        for name, size in sizes.items():
+            properties = await ObjectStore.read_properties(
+                ORGANIZATION_ID, f'{root_dir}/{name}'
+            )
+            assert properties.size == size
+        # Delete the files to clean up.
+        await ObjectStore.delete(ORGANIZATION_ID, root_dir)
+
+    @pytest.mark.asyncio
+    async def test_upload_files_with_invalid_args(self, tmp_path, monkeypatch):
+        tool_name = 'upload_object_files'
+        monkeypatch.setattr(
+            OrganizationWorkspace, 'MOUNT_DESTINATION', str(tmp_path)
+        )
+        (tmp_path / 'file.txt').write_text('Hello, world!')
+        minimal_payload = {
+            'organizationId': ORGANIZATION_ID,
+            'files': [{'key': await self._create_key(), 'path': 'file.txt'}]
+        }
+        # Try to upload the files without providing all the required 
+        # data.
+        await ensure_request_raises_validation_error_when_omitting_an_arg(
+            tool_name, UploadObjectStoreFilesRequest, minimal_payload
+        )
+        # Try to upload the files without a concurrency limit.
+        await ensure_request_raises_validation_error(
+            tool_name, UploadObjectStoreFilesRequest,
+            minimal_payload | {'maxConcurrency': None}
+        )
+        # Try to upload files that aren't in the workspace.
+        for path in ['missing.txt', '../file.txt']:
+            await ensure_request_fails(
+                mcp, tool_name, 
+                minimal_payload | {
+                    'files': [{'key': await self._create_key(), 'path': path}]
+                }
+            )
+
+    @pytest.mark.asyncio
+    async def test_sync_directory(self, tmp_path, monkeypatch):
+        # Mount a temporary workspace with a directory of files.
+        monkeypatch.setattr(
+            OrganizationWorkspace, 'MOUNT_DESTINATION', str(tmp_path)
+        )
+        directory = tmp_path / 'models'
+        (directory / 'nested').mkdir(parents=True)
+        (directory / 'a.txt').write_text('a')
+        (directory / 'nested' / 'b.txt').write_text('b')
+        prefix = await self._create_key()
+        # Try to sync the directory for the first time.
+        output_model = await ObjectStore.sync(
+            ORGANIZATION_ID, 'models', prefix=prefix
+        )
+        assert output_model.uploaded == [f'{prefix}/a.txt', f'{prefix}/nested/b.txt']
+        assert output_model.unchanged == 0
+        # Sync again without changes.
+        output_model = await ObjectStore.sync(
+            ORGANIZATION_ID, 'models', prefix=prefix
+        )
+        assert output_model.uploaded == []
+        assert output_model.unchanged == 2
+        # Change a file (same size, different hash), delete the other 
+        # one, and then sync with orphan deletion.
+        (directory / 'a.txt').write_text('c')
+        (directory / 'nested' / 'b.txt').unlink()
+        output_model = await ObjectStore.sync(
+            ORGANIZATION_ID, 'models', prefix=prefix, deleteOrphans=True
+        )
+        assert output_model.uploaded == [f'{prefix}/a.txt']
+        assert output_model.deleted == [f'{prefix}/nested/b.txt']
+        # Delete the files to clean up.
+        await ObjectStore.delete(ORGANIZATION_ID, prefix)
+
+    @pytest.mark.asyncio
+    async def test_sync_directory_with_invalid_args(self, tmp_path, monkeypatch):
+        tool_name = 'sync_object_store_directory'
+        monkeypatch.setattr(
+            OrganizationWorkspace, 'MOUNT_DESTINATION', str(tmp_path)
+        )
+        (tmp_path / 'models').mkdir()
+        minimal_payload = {'organizationId': ORGANIZATION_ID, 'path': 'models'}
+        # Try to sync without providing all the required data.
+        await ensure_request_raises_validation_error_when_omitting_an_arg(
+            tool_name, SyncObjectStoreDirectoryRequest, minimal_payload
+        )
+        # Try to sync a directory that isn't in the workspace.
+        for path in ['missing', '..']:
+            await ensure_request_fails(
+                mcp, tool_name, minimal_payload | {'path': path}
+            )
+        # Try to delete the orphans without a prefix.
+        await ensure_request_fails(
+            mcp, tool_name, minimal_payload | {'deleteOrphans': True}
+        )
+        # Try to sync without a concurrency limit.
+        await ensure_request_raises_validation_error(
+            tool_name, SyncObjectStoreDirectoryRequest,
+            minimal_payload | {'maxConcurrency': None}
+        )
+
     @pytest.mark.asyncio
     @pytest.mark.parametrize('type_', [str, bytes])
     async def test_read_metadata(self, type_):
@@ -331,3 +512,161 @@ class TestObjectStore:
                 )
         # Delete the file to clean up.
         await ObjectStore.delete(ORGANIZATION_ID, key)
+
+    @pytest.mark.asyncio
+    async def test_download_files(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(
+            OrganizationWorkspace, 'MOUNT_DESTINATION', str(tmp_path)
+        )
+        # Upload a few files.
+        root_dir = await self._create_key()
+        object_data = await self._create_object_data(bytes)
+        keys = [f'{root_dir}/file_{i}' for i in range(3)]
+        for key in keys:
+            await ObjectStore.upload(ORGANIZATION_ID, key, object_data)
+        # Try to download them with a job per 2 keys.
+        output_model = await ObjectStore.download_files(
+            ORGANIZATION_ID, keys, 'downloads', batchSize=2
+        )
+        assert output_model.bytesTransferred == len(keys) * len(object_data)
+        # Ensure the content in the downloaded files matches the 
+        # upload.
+        for key in keys:
+            assert (tmp_path / 'downloads' / key).read_bytes() == object_data
+        # Delete the files to clean up.
+        await ObjectStore.delete(ORGANIZATION_ID, root_dir)
+
+    @pytest.mark.asyncio
+    async def test_download_files_with_invalid_args(self, tmp_path, monkeypatch):
+        tool_name = 'download_object_files'
+        monkeypatch.setattr(
+            OrganizationWorkspace, 'MOUNT_DESTINATION', str(tmp_path)
+        )
+        minimal_payload = {
+            'organizationId': ORGANIZATION_ID,
+            'keys': [await self._create_key()],
+            'path': 'downloads'
+        }
+        # Try to download the files without providing all the required 
+        # data.
+        await ensure_request_raises_validation_error_when_omitting_an_arg(
+            tool_name, DownloadObjectStoreFilesRequest, minimal_payload
+        )
+        # Try to download a key that doesn't exist.
+        await ensure_request_fails(mcp, tool_name, minimal_payload)
+        # Try to download without a concurrency limit.
+        await ensure_request_raises_validation_error(
+            tool_name, DownloadObjectStoreFilesRequest,
+            minimal_payload | {'maxConcurrency': None}
+        )
+        # Try to download the files outside of the workspace.
+        await ensure_request_fails(
+            mcp, tool_name, minimal_payload | {'path': '..'}
+        )
+
+    @pytest.mark.asyncio
+    async def test_compressed_transfers(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(
+            OrganizationWorkspace, 'MOUNT_DESTINATION', str(tmp_path)
+        )
+        # Upload a compressible file with gzip compression.
+        content = b'time,price\n' + b'2024-01-01,100.0\n' * 10_000
+        (tmp_path / 'prices.csv').write_bytes(content)
+        root_dir = await self._create_key()
+        output_model = await ObjectStore.upload_files(
+            ORGANIZATION_ID,
+            [{'key': f'{root_dir}/prices.csv', 'path': 'prices.csv'}],
+            compression='gzip'
+        )
+        result = output_model.results[0]
+        assert result.success
+        assert result.codec == 'gzip'
+        assert result.key == f'{root_dir}/prices.csv.gz'
+        assert output_model.bytesTransferred < len(content)
+        # Ensure the download is decompressed under the original key.
+        output_model = await ObjectStore.download_files(
+            ORGANIZATION_ID, [result.key], 'downloads', decompress=True
+        )
+        assert output_model.success
+        downloaded = tmp_path / 'downloads' / root_dir / 'prices.csv'
+        assert downloaded.read_bytes() == content
+        # Ensure a file with a codec suffix that isn't compressed is saved
+        # as is.
+        await ObjectStore.upload(
+            ORGANIZATION_ID, f'{root_dir}/notes.gz', 'plain text'
+        )
+        output_model = await ObjectStore.download_files(
+            ORGANIZATION_ID, [f'{root_dir}/notes.gz'], 'downloads',
+            decompress=True
+        )
+        assert output_model.success
+        downloaded = tmp_path / 'downloads' / root_dir / 'notes.gz'
+        assert downloaded.read_bytes() == b'plain text'
+        # Delete the files to clean up.
+        await ObjectStore.delete(ORGANIZATION_ID, root_dir)
+
+    @pytest.mark.asyncio
+    async def test_object_store_index(self):
+        # Create a directory tree like this:
+        # 
+        #   root_directory/
+        #   ├── a.csv (13 bytes)
+        #   └── models/
+        #       └── b.pkl (26 bytes)
+        #
+        root_dir = await self._create_key()
+        object_data = await self._create_object_data()
+        await ObjectStore.upload(
+            ORGANIZATION_ID, f'{root_dir}/a.csv', object_data
+        )
+        await ObjectStore.upload(
+            ORGANIZATION_ID, f'{root_dir}/models/b.pkl', object_data * 2
+        )
+        # Try to refresh the index of the directory.
+        await ObjectStore.refresh_index(ORGANIZATION_ID, path=root_dir)
+        # Try to search the index.
+        output_model = await ObjectStore.search_index(
+            ORGANIZATION_ID, prefix=root_dir
+        )
+        assert [obj.key for obj in output_model.objects] == [
+            f'{root_dir}/a.csv', f'{root_dir}/models/b.pkl'
+        ]
+        assert output_model.totalSize == 3 * len(object_data)
+        output_model = await ObjectStore.search_index(
+            ORGANIZATION_ID, prefix=root_dir, pattern='*.pkl'
+        )
+        assert [obj.key for obj in output_model.objects] == [
+            f'{root_dir}/models/b.pkl'
+        ]
+        output_model = await ObjectStore.search_index(
+            ORGANIZATION_ID, prefix=root_dir, maxSize=len(object_data)
+        )
+        assert [obj.key for obj in output_model.objects] == [
+            f'{root_dir}/a.csv'
+        ]
+        # Try to read the usage of the directory.
+        output_model = await ObjectStore.read_usage(
+            ORGANIZATION_ID, prefix=root_dir
+        )
+        assert [(u.prefix, u.size) for u in output_model.usage] == [
+            (f'{root_dir}/models', 2 * len(object_data)),
+            (f'{root_dir}/a.csv', len(object_data))
+        ]
+        # Delete the directory tree and ensure the index forgets it.
+        await ObjectStore.delete(ORGANIZATION_ID, root_dir)
+        output_model = await ObjectStore.search_index(
+            ORGANIZATION_ID, prefix=root_dir
+        )
+        assert output_model.total == 0
+
+    @pytest.mark.asyncio
+    async def test_object_store_index_with_invalid_args(self):
+        tool_name = 'search_object_store_index'
+        # Try to search the index without providing all the required 
+        # data.
+        await ensure_request_raises_validation_error(
+            tool_name, SearchObjectStoreIndexRequest, {}
+        )
+        # Try to search the index of an organization that doesn't 
+        # exist.
+        await ensure_request_fails(mcp, tool_name, {'organizationId': ' '})
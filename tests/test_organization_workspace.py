@@ -1,8 +1,13 @@
 import pytest
+import json
+import os
+import shutil
 import time
 import docker
 
+import local_cache
 from organization_workspace import OrganizationWorkspace
+from workspace_watcher import WorkspaceWatcher
 from api_connection import USER_ID, API_TOKEN
 
 def test_organization_workspace_mount():
@@ -37,3 +42,91 @@ def test_organization_workspace_mount():
     )
     # Stop the container.
     container.stop()
+
+def _create_project(path, cloud_id):
+    path.mkdir(parents=True)
+    (path / 'config.json').write_text(json.dumps({'cloud-id': cloud_id}))
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    # Mount a temporary workspace and cache directory.
+    root = tmp_path / 'workspace'
+    root.mkdir()
+    monkeypatch.setattr(OrganizationWorkspace, 'MOUNT_SOURCE', str(root))
+    monkeypatch.setattr(OrganizationWorkspace, 'MOUNT_DESTINATION', str(root))
+    monkeypatch.setattr(OrganizationWorkspace, 'project_id_by_path', {})
+    monkeypatch.setattr(OrganizationWorkspace, 'path_by_project_id', {})
+    monkeypatch.setattr(OrganizationWorkspace, '_directories', {})
+    monkeypatch.setattr(OrganizationWorkspace, 'available', False)
+    monkeypatch.setattr(local_cache, 'CACHE_DIRECTORY', str(tmp_path / 'cache'))
+    return root
+
+def test_load(workspace):
+    _create_project(workspace / 'Project A', 1)
+    _create_project(workspace / 'Folder' / 'Project B', 2)
+    (workspace / 'Folder' / 'Empty').mkdir()
+    # Projects under the directories that are skipped aren't loaded.
+    _create_project(workspace / 'data' / 'Project C', 3)
+    _create_project(workspace / '.QuantConnect' / 'Project D', 4)
+    OrganizationWorkspace.load()
+    assert OrganizationWorkspace.available
+    assert OrganizationWorkspace.project_id_by_path == {
+        str(workspace / 'Project A'): 1,
+        str(workspace / 'Folder' / 'Project B'): 2
+    }
+
+def test_load_rescans_only_changes(workspace, monkeypatch):
+    _create_project(workspace / 'Project A', 1)
+    _create_project(workspace / 'Folder' / 'Project B', 2)
+    OrganizationWorkspace.load()
+    # Count the config files that the next scans parse.
+    parsed = []
+    read_cloud_id = OrganizationWorkspace._read_cloud_id
+    monkeypatch.setattr(
+        OrganizationWorkspace, '_read_cloud_id', 
+        lambda path: parsed.append(path) or read_cloud_id(path)
+    )
+    # Ensure an unchanged workspace isn't parsed again.
+    OrganizationWorkspace.load()
+    assert parsed == []
+    assert len(OrganizationWorkspace.project_id_by_path) == 2
+    # Change a project, add a project, and delete a project.
+    config_path = workspace / 'Folder' / 'Project B' / 'config.json'
+    config_path.write_text(json.dumps({'cloud-id': 5}))
+    os.utime(config_path, ns=(0, 0))
+    _create_project(workspace / 'Folder' / 'Project C', 3)
+    shutil.rmtree(workspace / 'Project A')
+    OrganizationWorkspace.load()
+    assert len(parsed) == 2
+    assert OrganizationWorkspace.project_id_by_path == {
+        str(workspace / 'Folder' / 'Project B'): 5,
+        str(workspace / 'Folder' / 'Project C'): 3
+    }
+
+def _wait_for(condition, timeout=10):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, 'Timed out waiting for the index.'
+        time.sleep(0.05)
+
+@pytest.mark.parametrize('mode', ['auto', 'poll'])
+def test_workspace_watcher(workspace, monkeypatch, mode):
+    monkeypatch.setattr(WorkspaceWatcher, 'MODE', mode)
+    monkeypatch.setattr(WorkspaceWatcher, 'DEBOUNCE_DELAY', 0.1)
+    monkeypatch.setattr(WorkspaceWatcher, 'POLL_INTERVAL', 0.1)
+    _create_project(workspace / 'Project A', 1)
+    OrganizationWorkspace.load()
+    WorkspaceWatcher.start()
+    try:
+        # Add a project.
+        _create_project(workspace / 'Folder' / 'Project B', 2)
+        _wait_for(lambda: 2 in OrganizationWorkspace.path_by_project_id)
+        assert OrganizationWorkspace.path_by_project_id[2] == \
+            str(workspace / 'Folder' / 'Project B')
+        # Delete a project.
+        shutil.rmtree(workspace / 'Project A')
+        _wait_for(lambda: 1 not in OrganizationWorkspace.path_by_project_id)
+        assert str(workspace / 'Project A') \
+            not in OrganizationWorkspace.project_id_by_path
+    finally:
+        WorkspaceWatcher.stop()
@@ -0,0 +1,62 @@
+import pytest
+import asyncio
+import threading
+
+from project_locks import ProjectLocks
+
+
+@pytest.mark.asyncio
+async def test_project_locks():
+    events = []
+
+    async def write(project_id, name, delay):
+        async with ProjectLocks.write(project_id):
+            events.append(f'start {name}')
+            await asyncio.sleep(delay)
+            events.append(f'end {name}')
+
+    # The calls for the same project run one at a time, in order. The
+    # calls for other projects don't wait.
+    await asyncio.gather(
+        write(1, 'update', 0.05), 
+        write(1, 'compile', 0), 
+        write(2, 'other', 0)
+    )
+    assert events == [
+        'start update', 'start other', 'end other', 'end update', 
+        'start compile', 'end compile'
+    ]
+    # The locks are removed once the calls finish.
+    assert not ProjectLocks._entry_by_project
+
+
+@pytest.mark.asyncio
+async def test_project_locks_across_threads():
+    events = []
+    started = threading.Event()
+
+    async def write(name, delay):
+        async with ProjectLocks.write(1):
+            events.append(f'start {name}')
+            if name == 'push':
+                started.set()
+            await asyncio.sleep(delay)
+            events.append(f'end {name}')
+
+    # A writer that runs its own event loop in another thread (ex: a
+    # background push) holds the lock of the project...
+    thread = threading.Thread(target=asyncio.run, args=(write('push', 0.1),))
+    thread.start()
+    await asyncio.to_thread(started.wait)
+    # ...so a tool call for the same project waits for it to finish.
+    await write('compile', 0)
+    await asyncio.to_thread(thread.join)
+    assert events == ['start push', 'end push', 'start compile', 'end compile']
+    # A cancelled call doesn't keep the lock.
+    async with ProjectLocks.write(1):
+        task = asyncio.create_task(write('cancelled', 0))
+        await asyncio.sleep(0)
+        task.cancel()
+    await write('update', 0)
+    assert events[-2:] == ['start update', 'end update']
+    assert not ProjectLocks._entry_by_project
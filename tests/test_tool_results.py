@@ -0,0 +1,187 @@
+import asyncio
+import json
+import threading
+
+import pytest
+from mcp import types
+from mcp.server.fastmcp import FastMCP
+
+import local_cache
+import tool_results
+from api_connection import ResponseSize
+from compact_responses import compact_value, parse_compact_tools
+from models import BacktestResponse
+from tool_results import ToolResults
+from tool_schema_cache import CachedSchemaTool, ToolSchemaCache
+from tools.files import register_file_tools
+
+
+async def call_tool(mcp, name):
+    handler = mcp._mcp_server.request_handlers[types.CallToolRequest]
+    result = await handler(types.CallToolRequest(
+        method='tools/call',
+        params=types.CallToolRequestParams(name=name, arguments={})
+    ))
+    return result.root
+
+
+@pytest.mark.asyncio
+async def test_trusted_results():
+    response = {
+        'success': True,
+        'backtest': {'backtestId': 'abc', 'status': 'Completed.', 'extra': 1}
+    }
+    results = []
+    for trusted in (False, True):
+        mcp = FastMCP('test')
+
+        @mcp.tool()
+        async def read_backtest() -> BacktestResponse:
+            return response
+
+        @mcp.tool()
+        async def read_version() -> str:
+            return '1.0.0'
+
+        ToolResults.install(mcp, trusted=trusted)
+        results.append(await call_tool(mcp, 'read_backtest'))
+        # The results that FastMCP wraps still use the default path.
+        version = await call_tool(mcp, 'read_version')
+        assert version.structuredContent == {'result': '1.0.0'}
+    validated, trusted = results
+    assert not validated.isError and not trusted.isError
+    # The default path dumps the whole model; the trusted path returns
+    # the result as is.
+    assert validated.structuredContent['backtest']['name'] is None
+    assert trusted.structuredContent == response
+    # The tools/list response still has the output schema.
+    tools = await mcp.list_tools()
+    assert all(tool.outputSchema for tool in tools)
+
+
+@pytest.mark.asyncio
+async def test_large_results_convert_in_worker_thread(monkeypatch):
+    threads = []
+    convert_result = ToolResults.convert_result.__func__
+
+    def record_thread(cls, *args):
+        threads.append(threading.get_ident())
+        return convert_result(cls, *args)
+
+    monkeypatch.setattr(
+        ToolResults, 'convert_result', classmethod(record_thread)
+    )
+    monkeypatch.setattr(tool_results, 'LARGE_RESPONSE_BYTES', 100)
+    mcp = FastMCP('test')
+
+    @mcp.tool()
+    async def read_backtest(size: int) -> BacktestResponse:
+        # Like `post` does for the responses of the API, in a task like
+        # the tools that send their requests concurrently.
+        async def post():
+            ResponseSize.record(size)
+        await asyncio.gather(post())
+        return {'success': True, 'backtest': {'status': 'Completed.'}}
+
+    ToolResults.install(mcp)
+    for size in (10, 1000):
+        _, structured_response = await mcp.call_tool(
+            'read_backtest', {'size': size}
+        )
+        assert structured_response['backtest']['status'] == 'Completed.'
+    # The small result is converted on the event loop, the large one in a
+    # worker thread.
+    assert threads[0] == threading.get_ident()
+    assert threads[1] != threading.get_ident()
+
+
+def test_compact_value():
+    assert compact_value({'a': 1.23456789, 'b': None, 'c': [None, 2]}, 3) == \
+        {'a': 1.23, 'c': [None, 2]}
+    assert compact_value(123456.789, 2) == 120000
+    # A list of objects with the same keys becomes a table. The columns
+    # that are null in every row are dropped.
+    rows = [
+        {'symbol': 'SPY', 'price': 320.123456, 'tag': None},
+        {'symbol': 'QQQ', 'price': None, 'tag': None}
+    ]
+    assert compact_value(rows, 4) == {
+        'columns': ['symbol', 'price'],
+        'rows': [['SPY', 320.1], ['QQQ', None]]
+    }
+    # Other lists stay lists.
+    assert compact_value([{'a': 1}, {'b': 2}]) == [{'a': 1}, {'b': 2}]
+    assert parse_compact_tools('read_backtest:4, list_backtests', 6) == {
+        'read_backtest': 4, 'list_backtests': 6
+    }
+
+
+@pytest.mark.asyncio
+async def test_compact_results():
+    mcp = FastMCP('test')
+
+    @mcp.tool()
+    async def read_backtest() -> BacktestResponse:
+        return {
+            'success': True,
+            'backtest': {'backtestId': 'abc', 'tradeableDates': 1258}
+        }
+
+    @mcp.tool()
+    async def read_version() -> str:
+        return '1.0.0'
+
+    ToolResults.install(mcp, compact={'*': 4})
+    result = await call_tool(mcp, 'read_backtest')
+    assert not result.isError and result.structuredContent is None
+    assert json.loads(result.content[0].text) == {
+        'success': True,
+        'backtest': {'backtestId': 'abc', 'tradeableDates': 1258}
+    }
+    # The compact tools don't list an output schema.
+    tools = {tool.name: tool for tool in await mcp.list_tools()}
+    assert tools['read_backtest'].outputSchema is None
+    assert 'compact JSON' in tools['read_backtest'].description
+    # The wrapped results are unchanged.
+    version = await call_tool(mcp, 'read_version')
+    assert version.structuredContent == {'result': '1.0.0'}
+
+
+@pytest.mark.asyncio
+async def test_compact_results_with_cached_schemas(tmp_path, monkeypatch):
+    monkeypatch.setattr(local_cache, 'CACHE_DIRECTORY', str(tmp_path))
+    monkeypatch.setattr(ToolSchemaCache, 'ENABLED', True)
+    for _ in range(2):
+        mcp = FastMCP('test')
+        ToolSchemaCache.install(mcp)
+        register_file_tools(mcp)
+        ToolSchemaCache.save()
+    # The second start registers the tools from the cache.
+    tool = mcp._tool_manager.get_tool('read_file_write_statistics')
+    assert isinstance(tool, CachedSchemaTool)
+    ToolResults.install(mcp, compact={'*': 4})
+    # Installing doesn't build the models of the cached tools.
+    assert tool.__dict__['fn_metadata'] is None
+    assert tool.output_schema is None
+    result = await call_tool(mcp, 'read_file_write_statistics')
+    assert not result.isError and result.structuredContent is None
+    assert json.loads(result.content[0].text)['success']
+
+
+@pytest.mark.asyncio
+async def test_unsupported_mcp_version(monkeypatch):
+    mcp = FastMCP('test')
+
+    @mcp.tool()
+    async def read_backtest() -> BacktestResponse:
+        return {'success': True, 'backtest': {'status': 'Completed.'}}
+
+    # Ex: an mcp version without the tool definition cache.
+    monkeypatch.delattr(
+        type(mcp._mcp_server), '_get_cached_tool_definition'
+    )
+    call_tool = mcp._tool_manager.call_tool
+    assert not ToolResults.install(mcp, compact={'*': 4})
+    assert mcp._tool_manager.call_tool == call_tool
+    tools = await mcp.list_tools()
+    assert tools[0].outputSchema is not None
@@ -0,0 +1,204 @@
+import asyncio
+import re
+import time
+
+import pytest
+
+import file_writes
+from collaboration_leases import CollaborationLeases
+from file_content_cache import FileContentCache
+from file_writes import make_patch, write_file
+from main import mcp
+from organization_workspace import OrganizationWorkspace
+from project_locks import ProjectLocks
+from utils import validate_models
+from server_models import WorkspaceSyncStatusResponse
+from workspace_sync import WorkspaceSync
+from workspace_watcher import WorkspaceWatcher
+
+_HUNK_HEADER = re.compile(r'@@ -(\d+)(?:,(\d+))? \+\d+(?:,\d+)? @@')
+
+
+def apply_patch(content, patch):
+    # Apply a patch from `make_patch` to the content of a file.
+    old_lines = content.splitlines(keepends=True)
+    new_lines = []
+    position = 0
+    lines = patch.splitlines(keepends=True)[4:]
+    for i, line in enumerate(lines):
+        if match := _HUNK_HEADER.match(line):
+            start = int(match.group(1)) - (match.group(2) != '0')
+            new_lines += old_lines[position:start]
+            position = start
+        elif line.startswith('\\'):
+            # Remove the newline of the previous line.
+            if lines[i - 1].startswith(('+', ' ')):
+                new_lines[-1] = new_lines[-1][:-1]
+        elif line.startswith('-'):
+            position += 1
+        else:
+            new_lines.append(line[1:])
+            position += line.startswith(' ')
+    return ''.join(new_lines + old_lines[position:])
+
+
+class FakeAPI:
+    # Replace `post` with scripted responses, by endpoint.
+
+    def __init__(self, monkeypatch, **success_by_endpoint):
+        self.requests = []
+        self._success_by_endpoint = success_by_endpoint
+        monkeypatch.setattr(file_writes, 'post', self.post)
+
+    async def post(self, endpoint, model=None):
+        self.requests.append((endpoint, model))
+        name = endpoint.split('/')[-1]
+        return {'success': self._success_by_endpoint.get(name, True)}
+
+    @property
+    def endpoints(self):
+        return [endpoint for endpoint, _ in self.requests]
+
+
+class TestWorkspace:
+
+    @pytest.mark.asyncio
+    async def test_read_workspace_sync_status(self):
+        # The sync is disabled unless the workspace is mounted and
+        # MOUNT_AUTO_PUSH is true.
+        output_model = await validate_models(
+            mcp, 'read_workspace_sync_status', 
+            output_class=WorkspaceSyncStatusResponse
+        )
+        assert output_model.enabled is False
+        assert 'MOUNT_AUTO_PUSH' in output_model.disabledReason
+        assert output_model.pushedFiles == 0
+
+    def test_workspace_sync_requires_watcher(self, monkeypatch):
+        # Without the watcher, no edit would be pushed, so the sync
+        # doesn't start.
+        monkeypatch.setattr(WorkspaceSync, 'ENABLED', True)
+        monkeypatch.setattr(WorkspaceSync, '_disabled_reason', None)
+        monkeypatch.setattr(OrganizationWorkspace, 'available', True)
+        monkeypatch.setattr(WorkspaceWatcher, 'MODE', 'off')
+        WorkspaceWatcher.start()
+        WorkspaceSync.start(None)
+        status = WorkspaceSync.status()
+        assert status['enabled'] is False
+        assert 'MOUNT_WATCH' in status['disabledReason']
+
+    @pytest.mark.parametrize('old_content, new_content', [
+        ('a\nb\nc\n', 'a\nB\nc\n'),
+        ('a\nb\nc\n', 'a\nb\nc\nd\n'),
+        ('a\nb\nc\n', 'b\nc\n'),
+        ('a\nb', 'a\nb\n'),
+        ('a\nb\n', 'a\nc'),
+        ('', 'a\n'),
+        (''.join(f'{i}\n' for i in range(100)),
+         ''.join(f'{i}\n' for i in range(100) if i % 30))
+    ])
+    def test_make_patch_in_workspace(self, old_content, new_content):
+        patch = make_patch('main.py', old_content, new_content)
+        assert patch.startswith('diff --git a/main.py b/main.py\n')
+        assert apply_patch(old_content, patch) == new_content
+        # The same content doesn't need a patch.
+        assert make_patch('main.py', new_content, new_content) == ''
+
+    @pytest.mark.asyncio
+    async def test_write_file_fallbacks_in_workspace(self, monkeypatch):
+        monkeypatch.setattr(FileContentCache, '_entry_by_file', {})
+        content = ''.join(f'a_{i} = {i}\n' for i in range(100))
+        new_content = content.replace('a_50 = 50', 'a_50 = -1')
+        # A small change is sent as a patch.
+        api = FakeAPI(monkeypatch)
+        response, method = await write_file(1, 'main.py', new_content, content)
+        assert (response['success'], method) == (True, 'patch')
+        assert api.endpoints == ['/files/patch']
+        assert FileContentCache.content(1, 'main.py') == new_content
+        # A rejected patch falls back to sending the whole file.
+        api = FakeAPI(monkeypatch, patch=False)
+        response, method = await write_file(1, 'main.py', new_content, content)
+        assert (response['success'], method) == (True, 'update')
+        assert api.endpoints == ['/files/patch', '/files/update']
+        # A large change or an unknown previous content is sent whole.
+        api = FakeAPI(monkeypatch)
+        await write_file(1, 'main.py', 'x = 1\n', content)
+        await write_file(1, 'main.py', new_content)
+        assert api.endpoints == ['/files/update', '/files/update']
+        # The file is created if it doesn't exist and `create` is True.
+        api = FakeAPI(monkeypatch, update=False)
+        response, method = await write_file(
+            1, 'new.py', content, create=True
+        )
+        assert (response['success'], method) == (True, 'create')
+        assert api.endpoints == ['/files/update', '/files/create']
+        # Otherwise, the failed update is returned.
+        api = FakeAPI(monkeypatch, update=False)
+        response, method = await write_file(2, 'new.py', content)
+        assert (response['success'], method) == (False, 'update')
+        assert FileContentCache.content(2, 'new.py') is None
+
+    def test_workspace_sync_debounce(self, monkeypatch):
+        monkeypatch.setattr(WorkspaceSync, 'DEBOUNCE_DELAY', 0.05)
+        monkeypatch.setattr(WorkspaceSync, '_pending_paths', set())
+        batches = []
+        monkeypatch.setattr(
+            WorkspaceSync, '_find_changes',
+            classmethod(lambda cls, paths: batches.append(paths) or [])
+        )
+        # The edits in quick succession are pushed in one batch.
+        for path in ('/a.py', '/b.py', '/a.py'):
+            WorkspaceSync.notify(path)
+        time.sleep(0.3)
+        assert batches == [{'/a.py', '/b.py'}]
+
+    @pytest.mark.asyncio
+    async def test_workspace_sync_push(self, tmp_path, monkeypatch):
+        # Mount a workspace with a project.
+        project_id = 5
+        monkeypatch.setattr(
+            OrganizationWorkspace, 'project_id_by_path',
+            {str(tmp_path): project_id}
+        )
+        monkeypatch.setattr(FileContentCache, '_entry_by_file', {})
+        monkeypatch.setattr(WorkspaceSync, '_signature_by_file', {})
+        monkeypatch.setattr(WorkspaceSync, '_content_by_file', {})
+        monkeypatch.setattr(
+            WorkspaceSync, '_status', WorkspaceSync._status | {'pushedFiles': 0}
+        )
+        monkeypatch.setattr(
+            'workspace_sync.WorkspaceWatcher.file_listeners', []
+        )
+        # The pushes run on the event loop of the server.
+        monkeypatch.setattr(
+            WorkspaceSync, '_loop', asyncio.get_running_loop()
+        )
+
+        async def acquire(project_id):
+            return {'success': True}
+
+        monkeypatch.setattr(CollaborationLeases, 'acquire', acquire)
+        path = tmp_path / 'main.py'
+        path.write_text('x = 1\n')
+        (tmp_path / 'backtests').mkdir()
+        WorkspaceSync._start()
+        # The files that didn't change since the start aren't pushed.
+        api = FakeAPI(monkeypatch)
+        WorkspaceSync._pending_paths = {str(path)}
+        await asyncio.to_thread(WorkspaceSync.flush)
+        assert api.requests == []
+        # Edit the file and a file that isn't a project file.
+        path.write_text('x = 2\n')
+        (tmp_path / 'backtests' / 'result.json').write_text('{}')
+        WorkspaceSync._pending_paths = {str(tmp_path)}
+        # The push waits for the tool calls that edit the project.
+        async with ProjectLocks.write(project_id):
+            flush = asyncio.create_task(asyncio.to_thread(WorkspaceSync.flush))
+            await asyncio.sleep(0.1)
+            assert api.requests == []
+        await flush
+        assert api.endpoints == ['/files/update']
+        model = api.requests[0][1]
+        assert (model.projectId, model.name, model.content) == \
+            (project_id, 'main.py', 'x = 2\n')
+        assert WorkspaceSync.status()['pushedFiles'] == 1